@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:41
+# User 모델에는 있었지만 마이그레이션이 없던 레이팅/전적 필드 (게임 종료 처리에서 갱신)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='games_draw',
+            field=models.IntegerField(default=0, help_text='무승부 횟수'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='games_lost',
+            field=models.IntegerField(default=0, help_text='패배 횟수'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='games_played',
+            field=models.IntegerField(default=0, help_text='총 게임 수'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='games_won',
+            field=models.IntegerField(default=0, help_text='승리 횟수'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='highest_rating',
+            field=models.IntegerField(default=1000, help_text='최고 레이팅'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='mvp_count',
+            field=models.IntegerField(default=0, help_text='MVP 횟수'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating',
+            field=models.IntegerField(default=1000, help_text='ELO 레이팅'),
+        ),
+    ]
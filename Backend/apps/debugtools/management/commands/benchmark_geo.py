@@ -0,0 +1,84 @@
+"""
+Management command for benchmarking geo kernels
+트랙 길이를 늘려가며 점마다 Python 루프로 계산하는 haversine과 apps.hexmap.geo의 배열 계산 비교
+"""
+import math
+import random
+import statistics
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from apps.hexmap.geo import haversine, destination, path_length
+
+
+def _scalar_path_length(lats, lngs):
+    """기존 방식: 구간마다 math haversine"""
+    total = 0.0
+    for i in range(len(lats) - 1):
+        total += haversine(lats[i], lngs[i], lats[i + 1], lngs[i + 1])
+    return total
+
+
+class Command(BaseCommand):
+    help = 'Benchmark scalar vs vectorized haversine path length and destination points'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='100,1000,10000,100000', help='Comma separated track sizes (points)')
+        parser.add_argument('--iterations', type=int, default=10, help='Iterations per scenario')
+        parser.add_argument('--lat', type=float, default=37.5665, help='Track start latitude')
+        parser.add_argument('--lng', type=float, default=126.9780, help='Track start longitude')
+        parser.add_argument('--step_m', type=float, default=3.0, help='Distance between points (meters)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the track')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        iterations = options['iterations']
+        random.seed(options['seed'])
+
+        self.stdout.write(f'[Benchmark] step={options["step_m"]}m iterations={iterations}')
+        self.stdout.write(
+            f'{"points":>8} {"scalar_ms":>10} {"vector_ms":>10} {"speedup":>8} '
+            f'{"dest_ms":>9} {"length_m":>12} {"diff_m":>9}'
+        )
+
+        for size in sizes:
+            lats, lngs = self._build_track(options['lat'], options['lng'], size, options['step_m'])
+            lat_list, lng_list = lats.tolist(), lngs.tolist()
+
+            scalar_times, scalar_length = self._measure(
+                lambda: _scalar_path_length(lat_list, lng_list), iterations
+            )
+            vector_times, vector_length = self._measure(lambda: path_length(lats, lngs), iterations)
+            bearings = np.random.default_rng(options['seed']).uniform(-math.pi, math.pi, size)
+            dest_times, _ = self._measure(
+                lambda: destination(lats, lngs, bearings, options['step_m']), iterations
+            )
+
+            scalar_ms = statistics.median(scalar_times)
+            vector_ms = statistics.median(vector_times)
+            self.stdout.write(
+                f'{size:>8} {scalar_ms:>10.3f} {vector_ms:>10.3f} '
+                f'{scalar_ms / vector_ms if vector_ms else 0:>7.1f}x '
+                f'{statistics.median(dest_times):>9.3f} {vector_length:>12.1f} '
+                f'{abs(vector_length - scalar_length):>9.6f}'
+            )
+
+    def _build_track(self, lat, lng, size, step_m):
+        """방향을 조금씩 바꾸며 step_m 간격으로 이어지는 트랙"""
+        heading = random.uniform(-math.pi, math.pi)
+        headings = np.cumsum(np.random.default_rng(size).normal(0, 0.2, size - 1)) + heading
+        lats = np.empty(size)
+        lngs = np.empty(size)
+        lats[0], lngs[0] = lat, lng
+        for i in range(1, size):
+            lats[i], lngs[i] = destination(lats[i - 1], lngs[i - 1], headings[i - 1], step_m)
+        return lats, lngs
+
+    def _measure(self, func, iterations):
+        times = []
+        result = None
+        for _ in range(iterations):
+            started = time.perf_counter()
+            result = func()
+            times.append((time.perf_counter() - started) * 1000)
+        return times, result
@@ -0,0 +1,103 @@
+"""
+Management command for benchmarking loop detection
+팀 영역 크기를 늘려가며 LoopDetector.detect_loop 지연 시간 측정
+"""
+import statistics
+import time
+import h3
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.hexmap.loop_detector import LoopDetector
+from apps.hexmap.team_graph import TeamGraph
+from apps.hexmap.h3_utils import h3_str_to_int
+
+
+class Command(BaseCommand):
+    help = 'Benchmark LoopDetector latency as team territory grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='100,1000,5000,10000', help='Comma separated territory sizes (hexes)')
+        parser.add_argument('--iterations', type=int, default=20, help='Iterations per scenario')
+        parser.add_argument('--lat', type=float, default=37.5665, help='Territory center latitude')
+        parser.add_argument('--lng', type=float, default=126.9780, help='Territory center longitude')
+        parser.add_argument('--res', type=int, default=None, help='H3 resolution')
+        parser.add_argument('--max_radius', type=int, default=None, help='Flood fill radius (defaults to H3_LOOP_MAX_RADIUS)')
+        parser.add_argument('--no_graph', action='store_true', help='Detect from the ownership dict without a TeamGraph')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        iterations = options['iterations']
+        res = options['res'] or settings.H3_DEFAULT_RESOLUTION
+        center = h3.geo_to_h3(options['lat'], options['lng'], res)
+        detector = LoopDetector('benchmark', max_radius=options['max_radius'])
+        use_graph = not options['no_graph']
+
+        self.stdout.write(
+            f'[Benchmark] res={res} max_radius={detector.max_radius} '
+            f'iterations={iterations} team_graph={use_graph}'
+        )
+        self.stdout.write(f'{"hexes":>8} {"close_ms":>10} {"edge_ms":>10} {"interior":>9}')
+
+        for size in sizes:
+            ownerships, closing_hex, edge_hex = self._build_territory(center, size)
+            team_graph = TeamGraph(h3_str_to_int(h3_id) for h3_id in ownerships) if use_graph else None
+
+            close_times, interior_count = self._measure(
+                detector, ownerships, team_graph, closing_hex, iterations
+            )
+            edge_times, _ = self._measure(detector, ownerships, team_graph, edge_hex, iterations)
+
+            self.stdout.write(
+                f'{len(ownerships):>8} {statistics.median(close_times):>10.3f} '
+                f'{statistics.median(edge_times):>10.3f} {interior_count:>9}'
+            )
+
+    def _build_territory(self, center, size):
+        """
+        center 주변을 채운 팀 영역 + 영역 가장자리에 한 칸만 비어 있는 고리
+
+        Returns:
+            (ownerships, closing_hex, edge_hex)
+            closing_hex: 점령하면 고리가 닫혀 내부가 생기는 hex
+            edge_hex: 점령해도 내부가 생기지 않는 영역 가장자리 hex
+        """
+        ownerships = {}
+        radius = 0
+        while True:
+            for h3_id in h3.hex_ring(center, radius):
+                ownerships[h3_id] = {'team': 'A', 'user_id': None}
+                if len(ownerships) >= size:
+                    break
+            if len(ownerships) >= size:
+                break
+            radius += 1
+
+        # 영역 바깥 (2칸 떨어진 곳)에 반지름 2 고리를 만들고 한 칸을 비워 둠
+        ring_center = sorted(h3.hex_ring(center, radius + 4))[0]
+        ring = sorted(h3.hex_ring(ring_center, 2))
+        closing_hex = ring[0]
+        for h3_id in ring[1:]:
+            ownerships[h3_id] = {'team': 'A', 'user_id': None}
+
+        edge_hex = next(
+            h3_id for h3_id in sorted(h3.hex_ring(center, radius + 1))
+            if h3_id not in ownerships and h3.h3_distance(h3_id, ring_center) > 4
+        )
+        return ownerships, closing_hex, edge_hex
+
+    def _measure(self, detector, ownerships, team_graph, new_hex_id, iterations):
+        """점령 반영(그래프 갱신 포함) + 루프 감지 시간 측정"""
+        times = []
+        interior_count = 0
+        for _ in range(iterations):
+            started = time.perf_counter()
+            ownerships[new_hex_id] = {'team': 'A', 'user_id': None}
+            if team_graph is not None:
+                team_graph.add(h3_str_to_int(new_hex_id))
+            result = detector.detect_loop('A', ownerships, new_hex_id, team_graph=team_graph)
+            times.append((time.perf_counter() - started) * 1000)
+            del ownerships[new_hex_id]
+            if team_graph is not None:
+                team_graph.remove(h3_str_to_int(new_hex_id))
+            interior_count = len(result['interior_h3_ids']) if result else 0
+        return times, interior_count
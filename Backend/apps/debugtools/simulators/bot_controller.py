@@ -6,7 +6,9 @@ import random
 import math
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from math import radians, cos, sin, asin, sqrt, atan2, degrees
+from math import radians, cos
+import numpy as np
+from apps.hexmap.geo import haversine, bearing, destination
 from .websocket_client import SimulatorWebSocketClient
 from .route_parser import RouteParser
 
@@ -66,43 +68,18 @@ class BotController:
     
     async def move_to_waypoint(self, start: Dict, end: Dict):
         """Move from start to end waypoint"""
-        def haversine_distance(lat1, lng1, lat2, lng2):
-            R = 6371000
-            dlat = radians(lat2 - lat1)
-            dlng = radians(lng2 - lng1)
-            a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng/2)**2
-            c = 2 * asin(sqrt(a))
-            return R * c
-        
-        def bearing(lat1, lng1, lat2, lng2):
-            dlat = radians(lat2 - lat1)
-            dlng = radians(lng2 - lng1)
-            y = sin(dlng) * cos(radians(lat2))
-            x = cos(radians(lat1)) * sin(radians(lat2)) - sin(radians(lat1)) * cos(radians(lat2)) * cos(dlng)
-            return atan2(y, x)
-        
-        total_distance = haversine_distance(start['lat'], start['lng'], end['lat'], end['lng'])
+        total_distance = haversine(start['lat'], start['lng'], end['lat'], end['lng'])
         distance_per_tick = self.speed_mps * self.tick_interval_sec
         
-        current_lat, current_lng = start['lat'], start['lng']
+        # 구간의 tick 위치를 한 번에 계산 (시작점에서 같은 방위로 tick마다 distance_per_tick씩)
+        tick_count = max(0, math.ceil(total_distance / distance_per_tick) - 1)
         brng = bearing(start['lat'], start['lng'], end['lat'], end['lng'])
+        tick_lats, tick_lngs = destination(
+            start['lat'], start['lng'], brng,
+            distance_per_tick * np.arange(1, tick_count + 1)
+        )
         
-        distance_remaining = total_distance
-        
-        while distance_remaining > distance_per_tick:
-            # Move one tick
-            R = 6371000
-            d = distance_per_tick
-            
-            lat1 = radians(current_lat)
-            lng1 = radians(current_lng)
-            
-            lat2 = asin(sin(lat1) * cos(d/R) + cos(lat1) * sin(d/R) * cos(brng))
-            lng2 = lng1 + atan2(sin(brng) * sin(d/R) * cos(lat1), cos(d/R) - sin(lat1) * sin(lat2))
-            
-            current_lat = degrees(lat2)
-            current_lng = degrees(lng2)
-            
+        for current_lat, current_lng in zip(tick_lats.tolist(), tick_lngs.tolist()):
             # Add GPS jitter
             jitter_lat = random.uniform(-self.jitter_m / 111000, self.jitter_m / 111000)
             jitter_lng = random.uniform(-self.jitter_m / (111000 * cos(radians(current_lat))), 
@@ -124,8 +101,6 @@ class BotController:
             
             # Wait for next tick
             await asyncio.sleep(self.tick_interval_sec)
-            
-            distance_remaining -= distance_per_tick
         
         # Final position
         self.current_position = end.copy()
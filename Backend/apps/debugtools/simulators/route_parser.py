@@ -2,6 +2,8 @@
 Route parser for simulation
 """
 import json
+import numpy as np
+from apps.hexmap.geo import segment_distances
 from typing import List, Dict, Tuple
 
 
@@ -82,46 +84,32 @@ class RouteParser:
         Returns:
             Interpolated waypoints
         """
-        from math import radians, cos, sin, asin, sqrt
-        
-        def haversine_distance(lat1, lng1, lat2, lng2):
-            """Calculate distance between two points in meters"""
-            R = 6371000  # Earth radius in meters
-            dlat = radians(lat2 - lat1)
-            dlng = radians(lng2 - lng1)
-            a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng/2)**2
-            c = 2 * asin(sqrt(a))
-            return R * c
-        
-        def interpolate_point(lat1, lng1, lat2, lng2, fraction):
-            """Interpolate between two points"""
-            return {
-                'lat': lat1 + (lat2 - lat1) * fraction,
-                'lng': lng1 + (lng2 - lng1) * fraction
-            }
-        
         if len(waypoints) < 2:
             return waypoints
         
-        interpolated = [waypoints[0]]
-        
-        for i in range(len(waypoints) - 1):
-            p1 = waypoints[i]
-            p2 = waypoints[i + 1]
-            
-            distance = haversine_distance(p1['lat'], p1['lng'], p2['lat'], p2['lng'])
-            num_segments = int(distance / interval_m)
-            
-            if num_segments > 0:
-                for j in range(1, num_segments + 1):
-                    fraction = j / (num_segments + 1)
-                    interpolated.append(interpolate_point(
-                        p1['lat'], p1['lng'],
-                        p2['lat'], p2['lng'],
-                        fraction
-                    ))
-            
-            interpolated.append(p2)
+        lats = np.array([p['lat'] for p in waypoints], dtype=np.float64)
+        lngs = np.array([p['lng'] for p in waypoints], dtype=np.float64)
+        
+        # 구간마다 interval_m 간격으로 넣을 점 수 (구간 거리는 한 번에 계산)
+        num_segments = (segment_distances(lats, lngs) // interval_m).astype(np.int64)
+        
+        # 구간 i의 점들: 시작점 + 사이 점 num_segments[i]개 (분수 j / (n + 1)), 마지막에 끝점
+        counts = num_segments + 1
+        segment_index = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        fractions = offsets / counts[segment_index]
+        
+        out_lats = lats[segment_index] + (lats[segment_index + 1] - lats[segment_index]) * fractions
+        out_lngs = lngs[segment_index] + (lngs[segment_index + 1] - lngs[segment_index]) * fractions
+        
+        # 원래 waypoint(구간 시작/끝)는 입력 dict 그대로 유지
+        interpolated = []
+        for index, (lat, lng, offset) in enumerate(zip(out_lats.tolist(), out_lngs.tolist(), offsets.tolist())):
+            if offset == 0:
+                interpolated.append(waypoints[segment_index[index]])
+            else:
+                interpolated.append({'lat': lat, 'lng': lng})
+        interpolated.append(waypoints[-1])
         
         return interpolated
 
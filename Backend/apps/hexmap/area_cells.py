@@ -0,0 +1,208 @@
+"""
+Precomputed game area cells
+GameArea 경계를 해상도에 맞춰 polyfill 한 H3 cell 집합을 메모리 + Django cache(Redis)에 보관
+bounds 검사를 polygon 연산 대신 set membership으로 처리
+cell 집합은 정수 H3로 보관 (문자열 대비 메모리/해싱 비용 절감)
+"""
+from collections import OrderedDict
+import logging
+import threading
+from h3.api import basic_int as h3_int
+from django.conf import settings
+from django.core.cache import cache
+from shapely.geometry import mapping
+from .h3_utils import bounds_to_polygon, h3_str_to_int, h3_int_to_str
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'hexmap:area_cells:int:'
+
+
+class AreaCells:
+    """All H3 cells whose center is inside one game area (integer cells)"""
+
+    def __init__(self, cells, resolution: int, version: str):
+        self.cells = frozenset(cells)
+        self.resolution = resolution
+        self.version = version
+        self._compacted = None
+
+    def __contains__(self, h3_id):
+        """H3 index string 또는 정수 cell (형식이 잘못된 값은 구역 밖)"""
+        if isinstance(h3_id, str):
+            try:
+                h3_id = h3_str_to_int(h3_id)
+            except ValueError:
+                return False
+        return h3_id in self.cells
+
+    def __len__(self):
+        return len(self.cells)
+
+    def filter_h3(self, h3_ids) -> list:
+        """
+        Keep hexes inside the area
+
+        Args:
+            h3_ids: Iterable of H3 index strings
+
+        Returns:
+            List of H3 index strings inside the area (input order, invalid indexes dropped)
+        """
+        return [h3_id for h3_id in h3_ids if h3_id in self]
+
+    def compacted_cells(self) -> list:
+        """Compacted integer cells (mixed resolutions) for storage"""
+        if self._compacted is None:
+            self._compacted = sorted(h3_int.compact(self.cells))
+        return self._compacted
+
+    def compacted(self) -> list:
+        """Compacted H3 index strings for JSON responses"""
+        return [h3_int_to_str(cell) for cell in self.compacted_cells()]
+
+
+def area_version(game_area) -> str:
+    """캐시 버전: 구역이 수정되면(updated_at/해상도 변경) 달라짐"""
+    updated_at = game_area.updated_at.isoformat() if game_area.updated_at else ''
+    return f'{updated_at}:{game_area.h3_resolution}'
+
+
+def compute_area_cells(bounds: dict, resolution: int):
+    """
+    Polyfill game area bounds at the given resolution
+
+    Args:
+        bounds: GeoJSON polygon or dict with coordinates
+        resolution: H3 resolution
+
+    Returns:
+        Set of H3 cell integers, or None if bounds are empty/unknown
+        or the area has more than settings.H3_AREA_CELLS_MAX cells
+    """
+    try:
+        polygon = bounds_to_polygon(bounds)
+    except Exception:
+        return None
+    if polygon is None:
+        return None
+
+    # polyfill은 중심이 polygon 안에 있는 cell만 포함 (hex 중심 기준 bounds 검사와 동일)
+    cells = h3_int.polyfill(mapping(polygon), resolution, geo_json_conformant=True)
+    if len(cells) > settings.H3_AREA_CELLS_MAX:
+        logger.warning(
+            "Area cells skipped (too many cells): cells=%d max=%d res=%d",
+            len(cells),
+            settings.H3_AREA_CELLS_MAX,
+            resolution,
+        )
+        return None
+    return cells
+
+
+class AreaCellsCache:
+    """
+    GameArea별 AreaCells 캐시
+    - 1단계: 프로세스 메모리 LRU
+    - 2단계: Django cache (Redis) - compact된 cell 목록 저장, 서버/프로세스 간 공유
+    - 없으면 polyfill 후 두 단계에 모두 저장
+    경계를 cell 집합으로 만들 수 없는 구역은 None (polygon 검사로 대체)
+    """
+
+    def __init__(self, maxsize=None):
+        if maxsize is None:
+            maxsize = settings.H3_BOUNDS_CACHE_SIZE
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # area_id -> AreaCells or None
+        self._lock = threading.Lock()
+
+    def get(self, game_area):
+        """
+        Args:
+            game_area: GameArea instance (or None)
+
+        Returns:
+            AreaCells, or None if the area cannot be precomputed
+        """
+        if game_area is None:
+            return None
+
+        area_id = str(game_area.id)
+        version = area_version(game_area)
+        with self._lock:
+            entry = self._entries.get(area_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(area_id)
+                return entry[1]
+
+        area_cells = self._load_shared(area_id, version)
+        if area_cells is None:
+            area_cells = self.refresh(game_area)
+        else:
+            self._remember(area_id, version, area_cells)
+        return area_cells
+
+    def refresh(self, game_area):
+        """구역 경계를 다시 polyfill 하여 메모리/Redis 캐시 갱신 (구역 수정 시 호출)"""
+        area_id = str(game_area.id)
+        version = area_version(game_area)
+        cells = compute_area_cells(game_area.bounds, game_area.h3_resolution)
+        area_cells = AreaCells(cells, game_area.h3_resolution, version) if cells is not None else None
+
+        try:
+            cache.set(
+                CACHE_KEY_PREFIX + area_id,
+                {
+                    'version': version,
+                    'cells': area_cells.compacted_cells() if area_cells is not None else None,
+                },
+                timeout=None,
+            )
+        except Exception as e:
+            logger.warning("Area cells cache write failed: area=%s error=%s", area_id, e)
+
+        self._remember(area_id, version, area_cells)
+        logger.debug(
+            "Area cells computed: area=%s res=%d cells=%s",
+            area_id,
+            game_area.h3_resolution,
+            len(area_cells) if area_cells is not None else None,
+        )
+        return area_cells
+
+    def forget(self, area_id):
+        """구역 삭제 시 캐시 제거"""
+        area_id = str(area_id)
+        with self._lock:
+            self._entries.pop(area_id, None)
+        try:
+            cache.delete(CACHE_KEY_PREFIX + area_id)
+        except Exception as e:
+            logger.warning("Area cells cache delete failed: area=%s error=%s", area_id, e)
+
+    def _load_shared(self, area_id, version):
+        """Redis에 같은 버전이 있으면 uncompact 하여 복원 (경계가 없는 구역도 None으로 기록되어 있음)"""
+        try:
+            data = cache.get(CACHE_KEY_PREFIX + area_id)
+        except Exception as e:
+            logger.warning("Area cells cache read failed: area=%s error=%s", area_id, e)
+            return None
+        if not data or data.get('version') != version or data.get('cells') is None:
+            return None
+        resolution = int(version.rsplit(':', 1)[1])
+        return AreaCells(h3_int.uncompact(data['cells'], resolution), resolution, version)
+
+    def _remember(self, area_id, version, area_cells):
+        with self._lock:
+            self._entries[area_id] = (version, area_cells)
+            self._entries.move_to_end(area_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+area_cells_cache = AreaCellsCache()
+
+
+def get_area_cells(game_area):
+    """GameArea의 미리 계산된 cell 집합 (만들 수 없으면 None)"""
+    return area_cells_cache.get(game_area)
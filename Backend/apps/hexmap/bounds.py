@@ -0,0 +1,128 @@
+"""
+Game area bounds service
+GameArea 경계를 prepared geometry로 한 번만 만들어 두고 재사용 (GameArea id + updated_at 기준 LRU 캐시)
+"""
+from collections import OrderedDict
+import threading
+import h3
+import numpy as np
+import shapely
+from django.conf import settings
+from .h3_utils import bounds_to_polygon, is_valid_h3
+
+
+class AreaBounds:
+    """Prepared polygon of one game area"""
+
+    def __init__(self, polygon):
+        self.polygon = polygon
+        # Prepare polygon for faster repeated contains checks
+        shapely.prepare(self.polygon)
+
+    def contains_point(self, lat: float, lng: float) -> bool:
+        """
+        Check if a point is inside the area
+
+        Args:
+            lat: Latitude
+            lng: Longitude
+
+        Returns:
+            True if point is inside bounds
+        """
+        # shapely uses lng, lat order
+        return bool(shapely.contains_xy(self.polygon, lng, lat))
+
+    def contains_h3(self, h3_id: str) -> bool:
+        """
+        Check if an H3 hex center is inside the area
+
+        Args:
+            h3_id: H3 index string
+
+        Returns:
+            True if hex center is inside bounds (False for an invalid index)
+        """
+        if not is_valid_h3(h3_id):
+            return False
+        lat, lng = h3.h3_to_geo(h3_id)
+        return self.contains_point(lat, lng)
+
+    def filter_h3(self, h3_ids) -> list:
+        """
+        Keep hexes whose center is inside the area (vectorized)
+
+        Args:
+            h3_ids: Iterable of H3 index strings
+
+        Returns:
+            List of H3 index strings inside bounds (input order, invalid indexes dropped)
+        """
+        h3_ids = [h3_id for h3_id in h3_ids if is_valid_h3(h3_id)]
+        if not h3_ids:
+            return []
+        centers = np.array([h3.h3_to_geo(h3_id) for h3_id in h3_ids])
+        mask = shapely.contains_xy(self.polygon, centers[:, 1], centers[:, 0])
+        return [h3_id for h3_id, inside in zip(h3_ids, mask) if inside]
+
+
+class AreaBoundsCache:
+    """
+    GameArea별 AreaBounds LRU 캐시
+    - 키: (GameArea id, updated_at) → 구역이 수정되면 자동으로 새로 만듦
+    - 경계가 없거나 해석할 수 없는 구역은 None (모든 hex 허용)
+    """
+
+    def __init__(self, maxsize=None):
+        if maxsize is None:
+            maxsize = settings.H3_BOUNDS_CACHE_SIZE
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # (area_id, updated_at) -> AreaBounds or None
+        self._lock = threading.Lock()
+
+    def get(self, game_area):
+        """
+        Args:
+            game_area: GameArea instance (or None)
+
+        Returns:
+            AreaBounds, or None if the area has no usable bounds
+        """
+        if game_area is None:
+            return None
+
+        key = (str(game_area.id), game_area.updated_at)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        area_bounds = self._build(game_area.bounds)
+
+        with self._lock:
+            self._entries[key] = area_bounds
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return area_bounds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _build(bounds):
+        try:
+            polygon = bounds_to_polygon(bounds)
+        except Exception:
+            # If parsing fails, allow (fail open)
+            return None
+        return AreaBounds(polygon) if polygon is not None else None
+
+
+area_bounds_cache = AreaBoundsCache()
+
+
+def get_area_bounds(game_area):
+    """GameArea의 캐시된 AreaBounds (경계가 없으면 None)"""
+    return area_bounds_cache.get(game_area)
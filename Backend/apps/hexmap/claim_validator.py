@@ -2,7 +2,9 @@
 Hex claim validation logic
 """
 import logging
-from datetime import datetime, timedelta
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.conf import settings
 from django.core.cache import cache
 
@@ -37,6 +39,7 @@ class ClaimValidator:
     def check_claim(self) -> str:
         """
         Check if claim is valid based on recent samples
+        조건을 채우는 동안 샘플마다 VALID (같은 hex 연속 점령은 consumer에서 무시)
         
         Returns:
             H3 ID if claim is valid, None otherwise
@@ -82,7 +85,7 @@ class ClaimValidator:
             return None
         
         # Claim is valid
-        logger.info(
+        logger.debug(
             "Claim check: VALID. participant=%s h3_id=%s samples=%d time_span=%.2f",
             self.participant_id,
             recent_h3_ids[0],
@@ -91,6 +94,11 @@ class ClaimValidator:
         )
         return recent_h3_ids[0]
     
+    @property
+    def sample_count(self) -> int:
+        """Number of stored samples"""
+        return len(self.get_samples())
+    
     def get_samples(self) -> list:
         """Get cached samples"""
         return cache.get(self.cache_key, [])
@@ -102,4 +110,160 @@ class ClaimValidator:
     def clear_samples(self):
         """Clear cached samples"""
         cache.delete(self.cache_key)
+    
+    def release_claim(self):
+        """점령 저장 실패 시 호출 - 샘플마다 VALID를 반환하므로 할 일 없음"""
+    
+    # 샘플마다 이미 cache에 저장하므로 persist/restore는 할 일이 없음
+    
+    def persist_due(self) -> bool:
+        return False
+    
+    def persist(self):
+        pass
+    
+    def restore(self):
+        pass
+
+
+
+class RingBufferClaimValidator:
+    """
+    Validates hex claims from an in-process ring buffer of GPS samples
+
+    consumer 연결 동안 메모리에만 샘플을 유지 (샘플마다 cache I/O 없음)
+    캐시에는 persist()로만 저장 - 연결 종료 시, 또는 persist_due()가 True일 때 (failover용)
+    저장 형식은 ClaimValidator와 같아서 재연결 시 어느 모드든 restore() 가능
+    """
+
+    def __init__(self, participant_id: str, persist_interval_sec: float = None):
+        self.participant_id = participant_id
+        self.cache_key = f'claim_samples_{participant_id}'
+        self.min_samples = settings.H3_CLAIM_MIN_SAMPLES
+        self.min_dwell_sec = settings.H3_CLAIM_MIN_DWELL_SEC
+        if persist_interval_sec is None:
+            persist_interval_sec = settings.H3_CLAIM_PERSIST_INTERVAL_SEC
+        self.persist_interval_sec = persist_interval_sec
+
+        # (timestamp seconds, h3_id, lat, lng) - 최근 N+1개
+        self._samples = deque(maxlen=self.min_samples + 1)
+        # 같은 hex에 연속으로 들어온 샘플 수 (check_claim을 O(1)로)
+        self._run_h3_id = None
+        self._run_length = 0
+        self._run_claimed = False  # 이번 run에서 이미 VALID를 반환했는지
+        self._dirty = False
+        self._last_persisted = time.monotonic()
+
+    @property
+    def sample_count(self) -> int:
+        """Number of stored samples"""
+        return len(self._samples)
+
+    def add_location_sample(self, lat: float, lng: float, h3_id: str, timestamp: datetime):
+        """Add a location sample"""
+        self._append(timestamp.timestamp(), h3_id, lat, lng)
+        self._dirty = True
+
+    def check_claim(self) -> str:
+        """
+        Check if claim is valid based on recent samples
+        hex에 들어온 뒤 조건을 처음 채운 샘플에서만 VALID (같은 hex에 머무는 동안 다시 반환하지 않음,
+        track.detect_claims와 같은 규칙)
+
+        Returns:
+            H3 ID if claim is valid, None otherwise
+        """
+        if self._run_claimed or not self._run_qualifies():
+            return None
+        self._run_claimed = True
+
+        time_span = self._samples[-1][0] - self._samples[-self.min_samples][0]
+        logger.debug(
+            "Claim check: VALID. participant=%s h3_id=%s samples=%d time_span=%.2f",
+            self.participant_id,
+            self._run_h3_id,
+            self.min_samples,
+            time_span,
+        )
+        return self._run_h3_id
+
+    def release_claim(self):
+        """
+        점령 저장 실패(compare-and-set 충돌) 시 호출
+        같은 hex에 머무는 다음 샘플에서 다시 VALID를 반환해 점령을 재시도할 수 있게 함
+        """
+        self._run_claimed = False
+
+    def get_samples(self) -> list:
+        """Samples in the cache format ({h3_id, timestamp(ISO), lat, lng})"""
+        return [
+            {
+                'h3_id': h3_id,
+                'timestamp': datetime.fromtimestamp(ts, tz=dt_timezone.utc).isoformat(),
+                'lat': lat,
+                'lng': lng
+            }
+            for ts, h3_id, lat, lng in self._samples
+        ]
+
+    def persist_due(self) -> bool:
+        """주기 저장 시점인지 (변경이 있고 persist_interval_sec가 지났을 때)"""
+        return (
+            self._dirty
+            and self.persist_interval_sec > 0
+            and time.monotonic() - self._last_persisted >= self.persist_interval_sec
+        )
+
+    def persist(self):
+        """Save samples to cache (연결 종료 / 주기 저장)"""
+        cache.set(self.cache_key, self.get_samples(), timeout=300)  # 5 minutes
+        self._dirty = False
+        self._last_persisted = time.monotonic()
+
+    def restore(self):
+        """Load samples saved by a previous connection"""
+        for sample in cache.get(self.cache_key, []):
+            try:
+                ts = datetime.fromisoformat(sample['timestamp']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._append(ts, sample.get('h3_id'), sample.get('lat'), sample.get('lng'))
+            # 이전 연결에서 검사했던 샘플 - 조건을 채운 run은 이미 점령 후보로 보냈음
+            if self._run_qualifies():
+                self._run_claimed = True
+        self._last_persisted = time.monotonic()
+
+    def clear_samples(self):
+        """Clear samples (memory and cache)"""
+        self._samples.clear()
+        self._run_h3_id = None
+        self._run_length = 0
+        self._run_claimed = False
+        self._dirty = False
+        cache.delete(self.cache_key)
+
+    def _run_qualifies(self):
+        """최근 N개가 모두 같은 hex이고 가장 오래된 것과 최신 것의 시간 차이가 dwell 이상"""
+        if self._run_length < self.min_samples:
+            return False
+        return self._samples[-1][0] - self._samples[-self.min_samples][0] >= self.min_dwell_sec
+
+    def _append(self, ts, h3_id, lat, lng):
+        self._samples.append((ts, h3_id, lat, lng))
+        if h3_id == self._run_h3_id:
+            self._run_length += 1
+        else:
+            self._run_h3_id = h3_id
+            self._run_length = 1
+            self._run_claimed = False
+
 
+def create_claim_validator(participant_id: str):
+    """
+    settings.H3_CLAIM_VALIDATOR_BACKEND에 따라 validator 생성
+    - 'memory': RingBufferClaimValidator (기본)
+    - 'cache': ClaimValidator (샘플마다 cache 조회/저장)
+    """
+    if settings.H3_CLAIM_VALIDATOR_BACKEND == 'cache':
+        return ClaimValidator(participant_id)
+    return RingBufferClaimValidator(participant_id)
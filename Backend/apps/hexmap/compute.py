@@ -0,0 +1,163 @@
+"""
+Hexmap compute pool
+CPU를 오래 쓰는 hexmap 계산(루프 내부 탐색, 트랙 H3 변환)을 별도 프로세스에서 실행
+ASGI 이벤트 루프나 DB thread pool이 GIL을 오래 잡아 같은 프로세스의 다른 방이 멈추지 않도록 함
+- HEXMAP_COMPUTE_WORKERS=0 이면 호출한 곳에서 바로 실행 (이전 동작)
+- 작업 함수와 인자는 pickle 가능해야 함 (모듈 수준 함수, 정수 cell / 기본 타입)
+- worker는 forkserver(없는 플랫폼은 spawn)로 시작 - thread가 많은 ASGI/WSGI 프로세스를 fork하면
+  다른 thread가 잡고 있던 lock이 잠긴 채로 복사될 수 있음. 작업 함수는 Django 설정 없이 import되어야 함
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+import threading
+import time
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class ComputeTimeout(Exception):
+    """Compute task did not finish within the timeout"""
+
+
+class ComputePool:
+    """
+    hexmap 계산용 프로세스 풀 (처음 작업이 들어올 때 생성)
+    depth: 제출되었지만 끝나지 않은 작업 수 (대기 + 실행 중)
+    """
+
+    def __init__(self, workers=None, timeout=None):
+        if workers is None:
+            workers = settings.HEXMAP_COMPUTE_WORKERS
+        if timeout is None:
+            timeout = settings.HEXMAP_COMPUTE_TIMEOUT_SEC
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    @property
+    def depth(self):
+        """제출되었지만 끝나지 않은 작업 수"""
+        return self._pending
+
+    async def run(self, func, *args, timeout=None):
+        """
+        이벤트 루프에서 계산 실행 (결과를 기다리는 동안 루프는 다른 작업 처리)
+
+        Raises:
+            ComputeTimeout: timeout(기본 HEXMAP_COMPUTE_TIMEOUT_SEC) 안에 끝나지 않음
+        """
+        try:
+            future = self._submit(func, args)
+            if future is None:
+                return func(*args)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise self._timed_out(func, future)
+        except BrokenProcessPool:
+            self._recreate_after_broken(func)
+            # 이번 작업은 thread에서 실행 (이벤트 루프를 막지 않도록)
+            return await asyncio.to_thread(func, *args)
+
+    def call(self, func, *args, timeout=None):
+        """
+        동기 코드(DB thread, REST view)에서 계산 실행 - 기다리는 동안 GIL을 놓음
+
+        Raises:
+            ComputeTimeout: timeout 안에 끝나지 않음
+        """
+        try:
+            future = self._submit(func, args)
+            if future is None:
+                return func(*args)
+            return future.result(timeout=timeout or self.timeout)
+        except TimeoutError:
+            raise self._timed_out(func, future)
+        except BrokenProcessPool:
+            self._recreate_after_broken(func)
+            # 호출한 곳이 이미 이벤트 루프 밖(DB thread, REST view)이므로 바로 실행
+            return func(*args)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, func, args):
+        """
+        풀에 작업 제출 (풀을 쓰지 않으면 None)
+
+        Raises:
+            BrokenProcessPool: 새로 만든 풀도 작업을 받지 못함
+        """
+        if not self.enabled:
+            return None
+        submitted_at = time.monotonic()
+        for attempt in range(2):
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context(START_METHOD),
+                    )
+                executor = self._executor
+                self._pending += 1
+            try:
+                future = executor.submit(func, *args)
+                break
+            except BrokenProcessPool:
+                # 앞선 작업에서 worker가 죽은 풀 - 새 풀로 한 번 더 제출
+                self._done(None)
+                self._reset(executor)
+                if attempt:
+                    raise
+        future.submitted_at = submitted_at
+        future.add_done_callback(self._done)
+        logger.debug(
+            "Compute task submitted: func=%s depth=%d",
+            func.__name__,
+            self._pending,
+        )
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _timed_out(self, func, future):
+        # 아직 시작하지 않은 작업만 취소됨 (실행 중인 작업은 worker에서 끝까지 실행)
+        future.cancel()
+        logger.warning(
+            "Compute task timed out: func=%s elapsed=%.2f depth=%d",
+            func.__name__,
+            time.monotonic() - future.submitted_at,
+            self._pending,
+        )
+        return ComputeTimeout(func.__name__)
+
+    def _recreate_after_broken(self, func):
+        """worker 프로세스가 죽은 경우 다음 작업에서 풀을 다시 만들도록 버림"""
+        logger.error("Compute pool broken, recreating: func=%s", func.__name__)
+        self._reset(self._executor)
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+compute_pool = ComputePool()
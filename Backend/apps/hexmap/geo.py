@@ -0,0 +1,125 @@
+"""
+Geodesic helpers (numpy)
+거리/방위/목적지 계산을 한 곳에서 - consumer, 시뮬레이터, 트랙 일괄 처리가 함께 사용
+모든 함수는 스칼라와 배열(broadcast 가능)을 모두 받음 (배열이면 점마다 Python 루프 없이 계산)
+"""
+import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+_SCALAR_TYPES = (int, float)
+
+
+def _is_scalar(*values):
+    return all(isinstance(value, _SCALAR_TYPES) for value in values)
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance (Haversine formula)
+
+    Args:
+        lat1, lng1: Start latitude/longitude in degrees (scalars or arrays)
+        lat2, lng2: End latitude/longitude in degrees (scalars or arrays, broadcastable)
+
+    Returns:
+        Distance in meters (float for scalar input, ndarray otherwise)
+    """
+    if _is_scalar(lat1, lng1, lat2, lng2):
+        # GPS tick마다 한 구간씩 계산하는 경우 numpy 호출 비용이 계산보다 큼
+        phi1 = math.radians(lat1)
+        phi2 = math.radians(lat2)
+        a = (
+            math.sin((phi2 - phi1) / 2) ** 2
+            + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_M * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    delta_phi = phi2 - phi1
+    delta_lambda = np.radians(np.subtract(lng2, lng1))
+
+    a = np.sin(delta_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    distance = 2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return float(distance) if np.ndim(distance) == 0 else distance
+
+
+def bearing(lat1, lng1, lat2, lng2):
+    """
+    Initial bearing from start to end
+
+    Args:
+        lat1, lng1: Start latitude/longitude in degrees (scalars or arrays)
+        lat2, lng2: End latitude/longitude in degrees (scalars or arrays)
+
+    Returns:
+        Bearing in radians clockwise from north (-pi..pi)
+    """
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    delta_lambda = np.radians(np.subtract(lng2, lng1))
+    y = np.sin(delta_lambda) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(delta_lambda)
+    result = np.arctan2(y, x)
+    return float(result) if np.ndim(result) == 0 else result
+
+
+def destination(lat, lng, bearing_rad, distance_m):
+    """
+    Point reached by travelling distance_m along a great circle
+
+    Args:
+        lat, lng: Start latitude/longitude in degrees (scalars or arrays)
+        bearing_rad: Bearing in radians (scalar or array)
+        distance_m: Distance in meters (scalar or array)
+
+    Returns:
+        (lat, lng) in degrees (floats for scalar input, ndarrays otherwise)
+    """
+    phi1 = np.radians(lat)
+    lambda1 = np.radians(lng)
+    delta = np.asarray(distance_m, dtype=np.float64) / EARTH_RADIUS_M
+
+    phi2 = np.arcsin(np.sin(phi1) * np.cos(delta) + np.cos(phi1) * np.sin(delta) * np.cos(bearing_rad))
+    lambda2 = lambda1 + np.arctan2(
+        np.sin(bearing_rad) * np.sin(delta) * np.cos(phi1),
+        np.cos(delta) - np.sin(phi1) * np.sin(phi2),
+    )
+    lat2, lng2 = np.degrees(phi2), np.degrees(lambda2)
+    if np.ndim(lat2) == 0:
+        return float(lat2), float(lng2)
+    return lat2, lng2
+
+
+def segment_distances(lats, lngs):
+    """
+    Distances between consecutive points of a track
+
+    Args:
+        lats: Latitudes (1-D array)
+        lngs: Longitudes (1-D array)
+
+    Returns:
+        ndarray of len(lats) - 1 distances in meters
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    if lats.size < 2:
+        return np.zeros(0)
+    return haversine(lats[:-1], lngs[:-1], lats[1:], lngs[1:])
+
+
+def path_length(lats, lngs) -> float:
+    """
+    Total length of a polyline
+
+    Args:
+        lats: Latitudes (1-D array)
+        lngs: Longitudes (1-D array)
+
+    Returns:
+        Length in meters
+    """
+    return float(segment_distances(lats, lngs).sum())
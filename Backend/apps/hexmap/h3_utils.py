@@ -1,7 +1,11 @@
 """
 H3 utility functions
+hexmap 내부(그래프, 루프 감지, 구역 cell 집합)는 64-bit 정수 H3 cell 사용
+문자열 H3 ID는 DB/JSON 경계에서만 사용 (h3_str_to_int / h3_int_to_str로 변환)
 """
+from collections import OrderedDict
 import h3
+from h3.api import basic_int as h3_int
 from django.conf import settings
 from shapely.geometry import Point, Polygon, shape
 from shapely.prepared import prep
@@ -51,6 +55,106 @@ def get_h3_neighbors(h3_id: str, k: int = 1) -> list:
     return h3.k_ring(h3_id, k)
 
 
+def is_valid_h3(h3_id, resolution: int = None) -> bool:
+    """
+    Check that a client value is a valid H3 index string
+    
+    Args:
+        h3_id: Value to check (any type)
+        resolution: Required resolution (None = any)
+    
+    Returns:
+        True if h3_id is a valid H3 cell (at the given resolution)
+    """
+    if not isinstance(h3_id, str) or not h3.h3_is_valid(h3_id):
+        return False
+    return resolution is None or h3.h3_get_resolution(h3_id) == resolution
+
+
+def h3_str_to_int(h3_id: str) -> int:
+    """
+    Convert H3 index string to 64-bit integer cell
+    
+    Args:
+        h3_id: H3 index string
+    
+    Returns:
+        H3 cell integer
+    """
+    return h3_int.string_to_h3(h3_id)
+
+
+def h3_int_to_str(cell: int) -> str:
+    """
+    Convert 64-bit integer cell to H3 index string
+    
+    Args:
+        cell: H3 cell integer
+    
+    Returns:
+        H3 index string
+    """
+    return h3_int.h3_to_string(cell)
+
+
+def latlng_to_h3_int(lat: float, lng: float, res: int = None) -> int:
+    """
+    Convert latitude/longitude to H3 integer cell
+    
+    Args:
+        lat: Latitude
+        lng: Longitude
+        res: H3 resolution (defaults to settings.H3_DEFAULT_RESOLUTION)
+    
+    Returns:
+        H3 cell integer
+    """
+    if res is None:
+        res = settings.H3_DEFAULT_RESOLUTION
+    return h3_int.geo_to_h3(lat, lng, res)
+
+
+def h3_int_to_latlng(cell: int) -> tuple:
+    """
+    Convert H3 integer cell to latitude/longitude
+    
+    Args:
+        cell: H3 cell integer
+    
+    Returns:
+        (latitude, longitude) tuple
+    """
+    return h3_int.h3_to_geo(cell)
+
+
+def get_h3_neighbors_int(cell: int, k: int = 1) -> set:
+    """
+    Get H3 neighbors (k-ring) of an integer cell
+    
+    Args:
+        cell: H3 cell integer
+        k: Ring distance (default: 1)
+    
+    Returns:
+        Set of H3 cell integers (includes the cell itself)
+    """
+    return h3_int.k_ring(cell, k)
+
+
+def compact_h3_ids(h3_ids) -> list:
+    """
+    Compact a set of H3 index strings (complete groups of children become their parent)
+
+    Args:
+        h3_ids: Iterable of H3 index strings (same resolution)
+
+    Returns:
+        Sorted list of H3 index strings (mixed resolutions, uncompact with the room resolution)
+    """
+    cells = {h3_int.string_to_h3(h3_id) for h3_id in h3_ids}
+    return [h3_int.h3_to_string(cell) for cell in sorted(h3_int.compact(cells))]
+
+
 def get_h3_edge_length_m(res: int) -> float:
     """
     Get average hexagon edge length in meters for a given resolution
@@ -95,31 +199,43 @@ def is_point_in_bounds(lat: float, lng: float, bounds: dict) -> bool:
         return True  # No bounds defined = allow all
     
     try:
-        # Create point (shapely uses lng, lat order)
-        point = Point(lng, lat)
-        
-        # Create polygon from bounds
-        if 'type' in bounds and bounds['type'] == 'Polygon':
-            # GeoJSON format
-            polygon = shape(bounds)
-        elif 'coordinates' in bounds:
-            # Simple coordinates format
-            coords = bounds['coordinates']
-            if isinstance(coords, list) and len(coords) > 0:
-                # GeoJSON polygon has outer ring as first element
-                outer_ring = coords[0] if isinstance(coords[0][0], list) else coords
-                polygon = Polygon(outer_ring)
-            else:
-                return True
-        else:
+        polygon = bounds_to_polygon(bounds)
+        if polygon is None:
             return True  # Unknown format, allow
         
-        return polygon.contains(point)
+        # Create point (shapely uses lng, lat order)
+        return polygon.contains(Point(lng, lat))
     except Exception:
         # If parsing fails, allow (fail open)
         return True
 
 
+def bounds_to_polygon(bounds: dict):
+    """
+    Build a shapely polygon from game area bounds
+    
+    Args:
+        bounds: GeoJSON polygon or dict with coordinates
+    
+    Returns:
+        Polygon, or None for empty/unknown formats
+    """
+    if not bounds:
+        return None
+    
+    if 'type' in bounds and bounds['type'] == 'Polygon':
+        # GeoJSON format
+        return shape(bounds)
+    if 'coordinates' in bounds:
+        # Simple coordinates format
+        coords = bounds['coordinates']
+        if isinstance(coords, list) and len(coords) > 0:
+            # GeoJSON polygon has outer ring as first element
+            outer_ring = coords[0] if isinstance(coords[0][0], list) else coords
+            return Polygon(outer_ring)
+    return None
+
+
 def is_h3_in_bounds(h3_id: str, bounds: dict) -> bool:
     """
     Check if an H3 hex is within the game area bounds
@@ -142,8 +258,9 @@ def is_h3_in_bounds(h3_id: str, bounds: dict) -> bool:
         return True  # If parsing fails, allow
 
 
-# Cache for prepared polygons (for faster repeated checks)
-_bounds_cache = {}
+# Cache for prepared polygons (for faster repeated checks, LRU)
+_bounds_cache = OrderedDict()
+_BOUNDS_CACHE_SIZE = 64
 
 
 def get_prepared_polygon(bounds: dict):
@@ -163,24 +280,19 @@ def get_prepared_polygon(bounds: dict):
     cache_key = str(bounds)
     
     if cache_key in _bounds_cache:
+        _bounds_cache.move_to_end(cache_key)
         return _bounds_cache[cache_key]
     
     try:
-        if 'type' in bounds and bounds['type'] == 'Polygon':
-            polygon = shape(bounds)
-        elif 'coordinates' in bounds:
-            coords = bounds['coordinates']
-            if isinstance(coords, list) and len(coords) > 0:
-                outer_ring = coords[0] if isinstance(coords[0][0], list) else coords
-                polygon = Polygon(outer_ring)
-            else:
-                return None
-        else:
+        polygon = bounds_to_polygon(bounds)
+        if polygon is None:
             return None
         
         # Prepare polygon for faster repeated contains checks
         prepared = prep(polygon)
         _bounds_cache[cache_key] = prepared
+        if len(_bounds_cache) > _BOUNDS_CACHE_SIZE:
+            _bounds_cache.popitem(last=False)
         return prepared
     except Exception:
         return None
@@ -1,181 +1,183 @@
 """
 Loop detection algorithm
-MVP 버전: Room.current_hex_ownerships JSONField 사용
+MVP 버전: {h3_id: ownership} 점령 상태 dict 사용 (HexOwnership 테이블 / 방 상태)
+
+새로 점령한 hex 주변의 팀 소유가 아닌 cell에서 제한된 반경 안에서만 flood fill 하여
+바깥으로 빠져나가지 못하는 영역(루프 내부)을 찾음
+비용은 영향을 받는 영역 크기에 비례하고 팀 전체 영역 크기와 무관함
+탐색은 정수 H3 cell로 하고 결과만 문자열 H3 ID로 반환
 """
-from .h3_utils import get_h3_neighbors
-import h3
+from collections import deque
+from django.conf import settings
+from .h3_utils import get_h3_neighbors_int, h3_str_to_int, h3_int_to_str
+from .team_graph import TeamGraph
+from h3.api import basic_int as h3_int
 
 
 class LoopDetector:
-    """Detects loops in hex ownership graph"""
-    
-    def __init__(self, room_id: str):
+    """Detects enclosed areas in hex ownership graph"""
+
+    def __init__(self, room_id: str, max_radius: int = None, max_interior: int = None):
+        """
+        Args:
+            room_id: Room UUID string
+            max_radius: flood fill 최대 반경 (hex 거리, defaults to settings.H3_LOOP_MAX_RADIUS)
+                        이 반경에 닿는 영역은 바깥과 연결된 것으로 간주
+            max_interior: 내부 영역 최대 cell 수 (defaults to settings.H3_LOOP_MAX_INTERIOR)
+                          넘는 영역도 바깥과 연결된 것으로 간주 (한 번에 채우는 양과 탐색 시간 제한)
+        """
         self.room_id = room_id
-    
-    def detect_loop(self, team: str, current_hex_ownerships: dict, new_hex_id: str = None) -> dict:
+        if max_radius is None:
+            max_radius = settings.H3_LOOP_MAX_RADIUS
+        if max_interior is None:
+            max_interior = settings.H3_LOOP_MAX_INTERIOR
+        self.max_radius = max_radius
+        self.max_interior = max_interior
+
+    def detect_loop(self, team: str, current_hex_ownerships: dict, new_hex_id: str = None,
+                    team_graph: TeamGraph = None) -> dict:
         """
-        Detect loops in team's owned hexes
-        
+        Detect areas enclosed by team's owned hexes
+
         Args:
             team: Team string ('A' or 'B')
-            current_hex_ownerships: Room.current_hex_ownerships JSONField
-            new_hex_id: 새로 점령한 hex ID (이 hex가 포함된 루프만 찾음, None이면 모든 루프 검사)
-        
+            current_hex_ownerships: {h3_id: {team, user_id, ...}} ownership dict
+            new_hex_id: 새로 점령한 hex ID (이 hex로 새로 막힌 영역만 찾음, None이면 팀 전체 검사)
+            team_graph: 방 상태가 유지하는 팀 인접 그래프 (정수 cell, 있으면 ownership dict 대신 사용)
+
         Returns:
-            Dict with 'loop_h3_ids' and 'interior_h3_ids', or None
+            Dict with 'loop_h3_ids' (내부를 둘러싼 팀 hex) and 'interior_h3_ids', or None
         """
-        # Get all owned hexes for this team from JSONField
-        hex_set = set(
-            h3_id for h3_id, ownership in current_hex_ownerships.items()
-            if ownership.get('team') == team
-        )
-        
-        if len(hex_set) < 3:  # Minimum 3 hexes for a loop
-            return None
-        
-        # 새로 점령한 hex가 팀 소유가 아니면 None 반환
-        if new_hex_id and new_hex_id not in hex_set:
-            return None
-        
-        # Build graph
-        graph = self._build_hex_graph(hex_set)
-        
-        # Find cycles
-        if new_hex_id:
-            # 새로 점령한 hex를 시작점으로 하는 루프만 찾기
-            cycles = self._find_cycles_from_node(graph, hex_set, new_hex_id)
+        if team_graph is not None:
+            is_team_hex = team_graph.__contains__
         else:
-            # 기존 방식: 모든 루프 찾기
-            cycles = self._find_cycles(graph, hex_set)
-        
-        if not cycles:
-            return None
-        
-        # 새로 점령한 hex가 포함된 루프만 선택
+            def is_team_hex(cell):
+                ownership = current_hex_ownerships.get(h3_int_to_str(cell))
+                return ownership is not None and ownership.get('team') == team
+
         if new_hex_id:
-            cycles_with_new_hex = [c for c in cycles if new_hex_id in c]
-            if cycles_with_new_hex:
-                # 새로 점령한 hex가 포함된 루프 중 가장 작은 것 선택 (가장 최근에 완성된 루프)
-                selected_cycle = min(cycles_with_new_hex, key=len)
-            else:
+            new_cell = h3_str_to_int(new_hex_id)
+            # 새로 점령한 hex가 팀 소유가 아니면 None 반환
+            if not is_team_hex(new_cell):
+                return None
+            # 팀 이웃이 한 묶음뿐이면 새로 막히는 영역이 없으므로 탐색 생략
+            if team_graph is not None and not team_graph.may_enclose(new_cell):
                 return None
+            origins = [new_cell]
+        elif team_graph is not None:
+            origins = list(team_graph)
         else:
-            # 기존 방식: 가장 큰 루프 선택
-            selected_cycle = max(cycles, key=len)
-        
-        # Find interior hexes
-        interior = self._find_interior_hexes(selected_cycle, hex_set)
-        
-        return {
-            'loop_h3_ids': selected_cycle,
-            'interior_h3_ids': interior
-        }
-    
-    def _build_hex_graph(self, hex_set: set) -> dict:
-        """Build adjacency graph"""
-        graph = {}
-        for h3_id in hex_set:
-            neighbors = get_h3_neighbors(h3_id, k=1)
-            graph[h3_id] = [n for n in neighbors if n in hex_set]
-        return graph
-    
-    def _find_cycles(self, graph: dict, hex_set: set) -> list:
-        """Find cycles using DFS (모든 노드에서 시작)"""
-        visited = set()
-        cycles = []
-        
-        def dfs(node, path):
-            if node in path:
-                # Found a cycle
-                cycle_start = path.index(node)
-                cycle = path[cycle_start:] + [node]
-                if len(cycle) >= 4:  # Minimum 3 unique nodes + closing node
-                    cycles.append(cycle[:-1])  # Remove duplicate closing node
-                return
-            
-            if node in visited:
-                return
-            
-            visited.add(node)
-            for neighbor in graph.get(node, []):
-                if neighbor not in path or neighbor == path[-2] if len(path) > 1 else False:
-                    dfs(neighbor, path + [neighbor])
-            visited.remove(node)
-        
-        for h3_id in hex_set:
-            if h3_id not in visited:
-                dfs(h3_id, [h3_id])
-        
-        return cycles
-    
-    def _find_cycles_from_node(self, graph: dict, hex_set: set, start_node: str) -> list:
-        """특정 노드에서 시작하는 사이클만 찾기"""
-        visited = set()
-        cycles = []
-        
-        def dfs(node, path):
-            if node in path:
-                # Found a cycle
-                cycle_start = path.index(node)
-                cycle = path[cycle_start:] + [node]
-                # 시작 노드가 포함된 사이클만 추가
-                if len(cycle) >= 4 and start_node in cycle:
-                    cycles.append(cycle[:-1])  # Remove duplicate closing node
-                return
-            
-            if node in visited:
-                return
-            
-            visited.add(node)
-            for neighbor in graph.get(node, []):
-                if neighbor not in path or neighbor == path[-2] if len(path) > 1 else False:
-                    dfs(neighbor, path + [neighbor])
-            visited.remove(node)
-        
-        # 시작 노드에서만 DFS 시작
-        if start_node in hex_set:
-            dfs(start_node, [start_node])
-        
-        return cycles
-    
-    def _find_interior_hexes(self, loop_h3_ids: list, all_owned: set) -> list:
+            origins = [
+                h3_str_to_int(h3_id) for h3_id, ownership in current_hex_ownerships.items()
+                if ownership.get('team') == team
+            ]
+
+        loop, interior = find_enclosed(origins, is_team_hex, self.max_radius, self.max_interior)
+        if not interior:
+            return None
+        return _as_result(loop, interior)
+
+    def region_cells(self, team_graph: TeamGraph, new_hex_id: str) -> frozenset:
         """
-        Find hexes inside the loop using polygon fill
-        
-        This is a simplified version. For production, use H3 polygon fill API.
+        Team cells the flood fill around new_hex_id can reach (compute worker input)
+
+        탐색은 new_hex_id에서 max_radius 안쪽만 확장하므로 이 범위의 팀 cell만 있으면
+        팀 전체 그래프 없이 같은 결과를 얻음
+
+        Args:
+            team_graph: Team adjacency graph
+            new_hex_id: Newly claimed H3 index string
+
+        Returns:
+            frozenset of team H3 cell integers within max_radius
         """
-        interior = []
-        
-        # Get bounding box of loop
-        lats = []
-        lngs = []
-        for h3_id in loop_h3_ids:
-            lat, lng = h3.h3_to_geo(h3_id)
-            lats.append(lat)
-            lngs.append(lng)
-        
-        min_lat, max_lat = min(lats), max(lats)
-        min_lng, max_lng = min(lngs), max(lngs)
-        
-        # Simple grid search (can be optimized)
-        # For MVP, we'll use a k-ring expansion approach
-        # Get all hexes in a larger ring around the loop
-        expanded_set = set(loop_h3_ids)
-        for h3_id in loop_h3_ids:
-            expanded_set.update(get_h3_neighbors(h3_id, k=3))
-        
-        # Filter hexes that are inside the loop polygon
-        # This is simplified - in production use proper polygon point-in-polygon test
-        for candidate in expanded_set:
-            if candidate not in all_owned and candidate not in loop_h3_ids:
-                # Check if candidate is inside polygon (simplified)
-                lat, lng = h3.h3_to_geo(candidate)
-                if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
-                    # Additional check: candidate should be surrounded by loop hexes
-                    neighbors = get_h3_neighbors(candidate, k=1)
-                    neighbor_count = sum(1 for n in neighbors if n in loop_h3_ids)
-                    if neighbor_count >= 3:  # At least 3 neighbors are in loop
-                        interior.append(candidate)
-        
-        return interior
+        disk = h3_int.k_ring(h3_str_to_int(new_hex_id), self.max_radius)
+        return frozenset(cell for cell in disk if cell in team_graph)
+
+
+def find_enclosed(origins, is_team_hex, max_radius: int, max_interior: int) -> tuple:
+    """
+    Flood fill from the non-team neighbors of each origin
+
+    Args:
+        origins: Team cells to search around
+        is_team_hex: cell -> bool
+        max_radius: Flood fill radius from the origin
+        max_interior: Largest component treated as enclosed
+
+    Returns:
+        (loop cell set, interior cell set) - 내부가 없으면 interior는 빈 set
+    """
+    interior = set()
+    outside = set()
+    for origin in origins:
+        for seed in get_h3_neighbors_int(origin, k=1):
+            if seed in interior or seed in outside or is_team_hex(seed):
+                continue
+            component, enclosed = _flood_fill(seed, origin, is_team_hex, max_radius, max_interior)
+            if enclosed:
+                interior.update(component)
+            else:
+                outside.update(component)
+
+    loop = set()
+    for cell in interior:
+        loop.update(n for n in get_h3_neighbors_int(cell, k=1) if is_team_hex(n))
+    return loop, interior
+
+
+def detect_loop_in_region(region_cells, new_cell: int, max_radius: int, max_interior: int):
+    """
+    Loop detection from a regional snapshot of team cells (runs in a compute worker)
+
+    Args:
+        region_cells: Team cells within max_radius of new_cell (LoopDetector.region_cells)
+        new_cell: Newly claimed H3 cell integer
+        max_radius: Flood fill radius
+        max_interior: Largest component treated as enclosed
+
+    Returns:
+        Same dict as LoopDetector.detect_loop, or None
+    """
+    loop, interior = find_enclosed([new_cell], region_cells.__contains__, max_radius, max_interior)
+    if not interior:
+        return None
+    return _as_result(loop, interior)
+
+
+def _as_result(loop, interior) -> dict:
+    return {
+        'loop_h3_ids': [h3_int_to_str(cell) for cell in loop],
+        'interior_h3_ids': [h3_int_to_str(cell) for cell in interior]
+    }
+
+
+def _flood_fill(seed: int, origin: int, is_team_hex, max_radius: int, max_interior: int) -> tuple:
+    """
+    seed에서 팀 소유가 아닌 cell로 BFS
+
+    Args:
+        seed: 시작 cell (팀 소유가 아님)
+        origin: 반경 기준 cell (새로 점령한 hex)
+        is_team_hex: cell -> bool
+        max_radius: Flood fill radius from origin
+        max_interior: Largest component treated as enclosed
 
+    Returns:
+        (component set, enclosed bool)
+        반경 max_radius에 닿거나 max_interior개를 넘으면 바깥과 연결된 것으로 보고 탐색 중단 (enclosed=False)
+    """
+    component = {seed}
+    queue = deque([seed])
+    while queue:
+        current = queue.popleft()
+        if h3_int.h3_distance(origin, current) >= max_radius:
+            return component, False
+        for neighbor in get_h3_neighbors_int(current, k=1):
+            if neighbor in component or is_team_hex(neighbor):
+                continue
+            component.add(neighbor)
+            if len(component) > max_interior:
+                return component, False
+            queue.append(neighbor)
+    return component, True
@@ -0,0 +1,34 @@
+"""
+Management command for precomputing game area cells
+활성 GameArea를 polyfill 하여 cell 집합을 Redis 캐시에 미리 저장 (배포 후 1회 실행)
+"""
+import time
+from django.core.management.base import BaseCommand
+from apps.hexmap.area_cells import area_cells_cache
+from apps.rooms.models import GameArea
+
+
+class Command(BaseCommand):
+    help = 'Precompute H3 cell sets for game areas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--area_id', type=str, default=None, help='GameArea UUID (default: all active areas)')
+
+    def handle(self, *args, **options):
+        areas = GameArea.objects.filter(is_active=True)
+        if options['area_id']:
+            areas = areas.filter(id=options['area_id'])
+
+        for area in areas:
+            started = time.perf_counter()
+            area_cells = area_cells_cache.refresh(area)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if area_cells is None:
+                self.stdout.write(self.style.WARNING(
+                    f'[AreaCells] {area.name} ({area.id}): skipped (no bounds or too many cells)'
+                ))
+                continue
+            self.stdout.write(
+                f'[AreaCells] {area.name} ({area.id}): res={area_cells.resolution} '
+                f'cells={len(area_cells)} compacted={len(area_cells.compacted())} {elapsed_ms:.1f}ms'
+            )
@@ -0,0 +1,90 @@
+"""
+Team adjacency graph
+팀 하나의 점령 hex 인접 그래프 - 점령/상실 시 증분 갱신 (매 루프 검사마다 다시 만들지 않음)
+cell은 64-bit 정수 H3 (h3_utils.h3_str_to_int)
+"""
+from .h3_utils import get_h3_neighbors_int
+
+
+class TeamGraph:
+    """Owned hexes of one team with links to owned neighbors"""
+
+    def __init__(self, cells=()):
+        self.adjacency = {}  # cell -> set of owned neighbor cells
+        for cell in cells:
+            self.add(cell)
+
+    def __contains__(self, cell):
+        return cell in self.adjacency
+
+    def __len__(self):
+        return len(self.adjacency)
+
+    def __iter__(self):
+        return iter(self.adjacency)
+
+    def add(self, cell: int):
+        """
+        Link a newly owned hex to its owned neighbors
+
+        Args:
+            cell: H3 cell integer
+        """
+        if cell in self.adjacency:
+            return
+        linked = {
+            neighbor for neighbor in get_h3_neighbors_int(cell, k=1)
+            if neighbor != cell and neighbor in self.adjacency
+        }
+        self.adjacency[cell] = linked
+        for neighbor in linked:
+            self.adjacency[neighbor].add(cell)
+
+    def remove(self, cell: int):
+        """
+        Unlink a hex lost to the other team
+
+        Args:
+            cell: H3 cell integer
+        """
+        linked = self.adjacency.pop(cell, None)
+        if not linked:
+            return
+        for neighbor in linked:
+            self.adjacency[neighbor].discard(cell)
+
+    def neighbors(self, cell: int) -> set:
+        """Owned neighbors of a hex (empty if not owned)"""
+        return self.adjacency.get(cell, set())
+
+    def may_enclose(self, cell: int) -> bool:
+        """
+        Whether claiming the cell can close a new loop
+
+        이웃 중 팀 hex가 둘 이상의 떨어진 묶음으로 나뉘어 있어야 그 사이의
+        비어 있는 이웃들이 서로 분리되어 새 내부 영역이 생길 수 있음
+
+        Args:
+            cell: H3 cell integer (already added)
+
+        Returns:
+            False if the owned neighbors form at most one contiguous arc
+        """
+        owned = self.neighbors(cell)
+        if len(owned) < 2:
+            return False
+
+        # 이웃 묶음 수 = 이웃 hex끼리의 연결 요소 수 (인접 여부는 그래프에서 바로 확인)
+        remaining = set(owned)
+        arcs = 0
+        while remaining:
+            arcs += 1
+            stack = [remaining.pop()]
+            while stack:
+                current = stack.pop()
+                for neighbor in self.adjacency[current] & remaining:
+                    remaining.discard(neighbor)
+                    stack.append(neighbor)
+            if arcs >= 2:
+                return True
+        return False
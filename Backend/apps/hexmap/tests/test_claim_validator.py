@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from apps.hexmap.claim_validator import ClaimValidator, RingBufferClaimValidator
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@override_settings(H3_CLAIM_MIN_SAMPLES=3, H3_CLAIM_MIN_DWELL_SEC=1.5)
+class ClaimValidatorTests(SimpleTestCase):
+    validator_classes = (ClaimValidator, RingBufferClaimValidator)
+
+    def tearDown(self):
+        cache.clear()
+
+    def feed(self, validator, h3_ids, step_sec=0.8):
+        results = []
+        for i, h3_id in enumerate(h3_ids):
+            validator.add_location_sample(37.5, 127.0, h3_id, T0 + timedelta(seconds=i * step_sec))
+            results.append(validator.check_claim())
+        return results
+
+    def test_valid_once_per_visit(self):
+        samples = ['a'] * 6 + ['b'] * 2 + ['a'] * 4
+        expected = [None, None, 'a', None, None, None, None, None, None, None, 'a', None]
+        self.assertEqual(self.feed(RingBufferClaimValidator('visit'), samples), expected)
+
+    def test_cache_validator_valid_while_dwelling(self):
+        samples = ['a'] * 4 + ['b'] * 2 + ['a'] * 3
+        expected = [None, None, 'a', 'a', None, None, None, None, 'a']
+        self.assertEqual(self.feed(ClaimValidator('dwelling'), samples), expected)
+
+    def test_released_claim_is_retried(self):
+        validator = RingBufferClaimValidator('release')
+        self.assertEqual(self.feed(validator, ['a'] * 3)[-1], 'a')
+        validator.release_claim()
+
+        validator.add_location_sample(37.5, 127.0, 'a', T0 + timedelta(seconds=3))
+
+        self.assertEqual(validator.check_claim(), 'a')
+        self.assertIsNone(validator.check_claim())
+
+    def test_dwell_time_required(self):
+        for cls in self.validator_classes:
+            with self.subTest(validator=cls.__name__):
+                results = self.feed(cls(f'{cls.__name__}-dwell'), ['a'] * 4, step_sec=0.5)
+                self.assertEqual(results, [None] * 4)
+
+    def test_restored_visit_is_not_reported_again(self):
+        validator = RingBufferClaimValidator('restore')
+        self.assertEqual(self.feed(validator, ['a'] * 3)[-1], 'a')
+        validator.persist()
+
+        restored = RingBufferClaimValidator('restore')
+        restored.restore()
+        restored.add_location_sample(37.5, 127.0, 'a', T0 + timedelta(seconds=3))
+
+        self.assertIsNone(restored.check_claim())
+        self.assertEqual(restored.sample_count, 4)
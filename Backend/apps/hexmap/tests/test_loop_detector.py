@@ -0,0 +1,102 @@
+import random
+from django.test import SimpleTestCase
+from h3.api import basic_int as h3_int
+from apps.hexmap.h3_utils import h3_int_to_str, latlng_to_h3_int
+from apps.hexmap.loop_detector import LoopDetector, detect_loop_in_region
+from apps.hexmap.team_graph import TeamGraph
+
+ORIGIN = latlng_to_h3_int(37.5665, 126.9780, 9)
+
+
+def ownerships(cells, team='A'):
+    return {h3_int_to_str(cell): {'team': team, 'user_id': 'u'} for cell in cells}
+
+
+class LoopDetectorTests(SimpleTestCase):
+    """dict / 팀 그래프 / compute worker(region) 경로가 같은 결과를 내는지"""
+
+    def setUp(self):
+        self.detector = LoopDetector('room', max_radius=6, max_interior=40)
+
+    def detect_all(self, team_cells, new_cell):
+        """(dict 경로, 그래프 경로, region 경로) interior 집합 - 루프가 없으면 None"""
+        graph = TeamGraph(team_cells)
+        new_hex_id = h3_int_to_str(new_cell)
+        results = (
+            self.detector.detect_loop('A', ownerships(team_cells), new_hex_id),
+            self.detector.detect_loop('A', {}, new_hex_id, team_graph=graph),
+            detect_loop_in_region(
+                self.detector.region_cells(graph, new_hex_id),
+                new_cell,
+                self.detector.max_radius,
+                self.detector.max_interior,
+            ),
+        )
+        return [set(result['interior_h3_ids']) if result else None for result in results]
+
+    def test_closing_ring_encloses_center(self):
+        ring = h3_int.hex_ring(ORIGIN, 1)
+
+        for new_cell in ring:
+            with self.subTest(new_cell=new_cell):
+                self.assertTrue(TeamGraph(ring).may_enclose(new_cell))
+                self.assertEqual(self.detect_all(ring, new_cell), [{h3_int_to_str(ORIGIN)}] * 3)
+
+    def test_open_arc_encloses_nothing(self):
+        ring = list(h3_int.hex_ring(ORIGIN, 1))
+        arc = ring[1:]
+        graph = TeamGraph(arc)
+
+        for new_cell in arc:
+            with self.subTest(new_cell=new_cell):
+                self.assertEqual(self.detect_all(arc, new_cell), [None] * 3)
+        # 호의 양 끝은 팀 이웃이 한 묶음뿐이라 탐색을 생략
+        ends = [cell for cell in arc if len(graph.neighbors(cell)) == 1]
+        self.assertEqual(len(ends), 2)
+        self.assertFalse(any(graph.may_enclose(cell) for cell in ends))
+
+    def test_larger_ring_encloses_inner_disk(self):
+        ring = h3_int.hex_ring(ORIGIN, 2)
+        interior = {h3_int_to_str(cell) for cell in h3_int.k_ring(ORIGIN, 1)}
+
+        self.assertEqual(self.detect_all(ring, next(iter(ring))), [interior] * 3)
+
+    def test_interior_over_limit_is_not_enclosed(self):
+        self.detector.max_interior = 6
+        ring = h3_int.hex_ring(ORIGIN, 2)
+
+        self.assertEqual(self.detect_all(ring, next(iter(ring))), [None] * 3)
+
+    def test_random_games_agree(self):
+        """
+        무작위 순서로 점령하고 루프 내부를 채우며 진행 (게임에서 나올 수 있는 상태만 만듦)
+        구역(반경 3) 안의 내부는 항상 max_interior/max_radius 안이므로 막히는 즉시 채워짐
+        """
+        self.detector.max_radius = 8
+        rng = random.Random(7)
+        disk = sorted(h3_int.k_ring(ORIGIN, 3))
+        for _ in range(20):
+            team_cells = set()
+            for new_cell in rng.sample(disk, len(disk)):
+                if new_cell in team_cells:
+                    continue
+                team_cells.add(new_cell)
+                dict_result, graph_result, region_result = self.detect_all(team_cells, new_cell)
+                self.assertEqual(graph_result, dict_result)
+                self.assertEqual(region_result, dict_result)
+                if not TeamGraph(team_cells).may_enclose(new_cell):
+                    # may_enclose가 False인 점령은 탐색을 생략하므로 실제로도 새 내부가 없어야 함
+                    self.assertIsNone(dict_result)
+                if dict_result:
+                    team_cells.update(h3_int.string_to_h3(h3_id) for h3_id in dict_result)
+
+    def test_team_graph_tracks_removal(self):
+        ring = list(h3_int.hex_ring(ORIGIN, 1))
+        graph = TeamGraph(ring)
+
+        graph.remove(ring[0])
+
+        self.assertNotIn(ring[0], graph)
+        self.assertEqual(len(graph), 5)
+        for cell in ring[1:]:
+            self.assertNotIn(ring[0], graph.neighbors(cell))
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+import random
+import h3
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+from apps.hexmap.claim_validator import RingBufferClaimValidator
+from apps.hexmap.track import TrackError, detect_claims, parse_track, process_track
+
+CENTER = (37.5665, 126.9780)
+ORIGIN_H3 = h3.geo_to_h3(*CENTER, 9)
+NEIGHBOR_H3 = sorted(h3.hex_ring(ORIGIN_H3, 1))[0]
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def validator_claims(cells, timestamps, min_samples, min_dwell_sec):
+    """같은 샘플을 RingBufferClaimValidator에 하나씩 넣었을 때 VALID가 나온 샘플 번호"""
+    with override_settings(H3_CLAIM_MIN_SAMPLES=min_samples, H3_CLAIM_MIN_DWELL_SEC=min_dwell_sec):
+        validator = RingBufferClaimValidator('track-test', persist_interval_sec=0)
+    indices = []
+    for i, (cell, ts) in enumerate(zip(cells, timestamps)):
+        validator.add_location_sample(0.0, 0.0, int(cell), T0 + timedelta(seconds=float(ts)))
+        if validator.check_claim() is not None:
+            indices.append(i)
+    return indices
+
+
+class DetectClaimsTests(SimpleTestCase):
+    def test_first_valid_sample_of_each_run(self):
+        cells = np.array([1, 1, 1, 1, 2, 2, 1, 1, 1], dtype=np.uint64)
+        timestamps = np.array([0, 1, 2, 4, 5, 6, 7, 8, 9], dtype=np.float64)
+
+        self.assertEqual(detect_claims(cells, timestamps, 3, 0).tolist(), [2, 8])
+        # 최근 3개 샘플 사이가 2.5초 이상이어야 함 (마지막 run은 2초뿐)
+        self.assertEqual(detect_claims(cells, timestamps, 3, 2.5).tolist(), [3])
+        self.assertEqual(detect_claims(cells[:2], timestamps[:2], 3, 0).tolist(), [])
+
+    def test_matches_ring_buffer_validator(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            count = rng.randint(1, 40)
+            cells = np.array([rng.choice((1, 2, 3)) if rng.random() < 0.3 else 0 for _ in range(count)], dtype=np.uint64)
+            # 한 hex에 머무는 구간이 생기도록 앞 샘플을 이어 붙임
+            for i in range(1, count):
+                if cells[i] == 0:
+                    cells[i] = cells[i - 1]
+            cells[cells == 0] = 1
+            timestamps = np.cumsum([rng.choice((0.2, 1.0, 3.0, 8.0)) for _ in range(count)])
+            min_samples = rng.randint(1, 4)
+            min_dwell_sec = rng.choice((0, 2, 5))
+            with self.subTest(cells=cells.tolist(), timestamps=timestamps.tolist(),
+                              min_samples=min_samples, min_dwell_sec=min_dwell_sec):
+                self.assertEqual(
+                    detect_claims(cells, timestamps, min_samples, min_dwell_sec).tolist(),
+                    validator_claims(cells, timestamps, min_samples, min_dwell_sec),
+                )
+
+
+class ProcessTrackTests(SimpleTestCase):
+    def points(self, h3_ids, per_hex=3, step_sec=1):
+        points = []
+        ts = T0
+        for h3_id in h3_ids:
+            lat, lng = h3.h3_to_geo(h3_id)
+            for _ in range(per_hex):
+                points.append({'lat': lat, 'lng': lng, 'timestamp': ts.isoformat()})
+                ts += timedelta(seconds=step_sec)
+        return points
+
+    def test_claims_in_time_order(self):
+        points = self.points([ORIGIN_H3, NEIGHBOR_H3, ORIGIN_H3], step_sec=30)
+        # 순서가 섞여 들어와도 시간순으로 처리
+        random.Random(1).shuffle(points)
+
+        result = process_track(points, 9, 2, 0)
+
+        self.assertEqual(result['sample_count'], 9)
+        self.assertEqual(result['claims'], [ORIGIN_H3, NEIGHBOR_H3, ORIGIN_H3])
+        self.assertEqual(result['last']['h3_id'], ORIGIN_H3)
+        self.assertGreater(result['distance_meters'], 0)
+
+    def test_array_points_with_epoch_ms(self):
+        lat, lng = h3.h3_to_geo(ORIGIN_H3)
+        points = [[lat, lng, int((T0 + timedelta(seconds=i)).timestamp() * 1000)] for i in range(3)]
+
+        self.assertEqual(process_track(points, 9, 3, 2)['claims'], [ORIGIN_H3])
+
+    def test_invalid_points(self):
+        with self.assertRaises(TrackError):
+            parse_track('not a list')
+        with self.assertRaises(TrackError):
+            parse_track([{'lat': 37.5}])
+        self.assertEqual(process_track([], 9, 2, 0)['last'], None)
+
+    def test_drops_non_finite_and_out_of_range_points(self):
+        lat, lng = h3.h3_to_geo(ORIGIN_H3)
+        start = T0.timestamp()
+        points = [
+            [lat, lng, start * 1000],
+            [float('nan'), lng, (start + 1) * 1000],
+            [lat, lng, float('inf')],
+            [lat, lng, (start - 60) * 1000],
+            [lat, lng, (start + 10) * 1000],
+            [lat, lng, (start + 3600) * 1000],
+        ]
+
+        timestamps, _, _ = parse_track(points, not_before=start, not_after=start + 60)
+
+        self.assertEqual(timestamps.tolist(), [start, start + 10])
+
+    def test_drops_points_reached_too_fast(self):
+        far_h3 = h3.geo_to_h3(CENTER[0] + 0.05, CENTER[1], 9)  # 약 5.5km 북쪽
+        # 출발 hex 2샘플 → 1초 뒤 먼 hex에서 체류 조건을 채우는 조작 샘플 → 다시 출발 hex
+        points = self.points([ORIGIN_H3], per_hex=2, step_sec=2)
+        forged = self.points([far_h3], per_hex=5, step_sec=2)
+        back = self.points([ORIGIN_H3], per_hex=2, step_sec=2)
+        for i, point in enumerate(forged + back):
+            point['timestamp'] = (T0 + timedelta(seconds=4 + 2 * i)).isoformat()
+        points += forged + back
+
+        result = process_track(points, 9, 3, 0)
+
+        self.assertEqual(result['rejected_count'], 5)
+        self.assertEqual(result['sample_count'], 4)
+        self.assertEqual(result['claims'], [ORIGIN_H3])
+
+    def test_speed_is_checked_from_origin(self):
+        far_h3 = h3.geo_to_h3(CENTER[0] + 0.05, CENTER[1], 9)
+        points = self.points([far_h3], per_hex=3, step_sec=1)
+        lat, lng = h3.h3_to_geo(ORIGIN_H3)
+        origin = (T0.timestamp() - 1, lat, lng)
+
+        self.assertEqual(process_track(points, 9, 3, 0, origin=origin)['claims'], [])
+        # 오래 전 위치에서는 충분히 이동할 수 있음
+        origin = (T0.timestamp() - 3600, lat, lng)
+        self.assertEqual(process_track(points, 9, 3, 0, origin=origin)['claims'], [far_h3])
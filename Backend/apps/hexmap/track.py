@@ -0,0 +1,237 @@
+"""
+GPS track batch processing
+오프라인 구간 등 한꺼번에 들어온 위치 샘플을 numpy 배열로 한 번에 처리
+(H3 변환, 구간 거리, 점령 조건 검사를 점마다 consumer 로직을 반복하지 않고 계산)
+"""
+from datetime import datetime
+import numpy as np
+from h3.api import basic_int as h3_int
+from .geo import haversine, segment_distances
+from .h3_utils import h3_int_to_str
+
+# 이보다 빠른 구간은 GPS 튐으로 보고 거리에서 제외 (consumer 실시간 처리와 같은 기준, 시속 약 50km)
+MAX_SPEED_MPS = 14.0
+
+
+class TrackError(ValueError):
+    """Track payload that cannot be processed"""
+
+
+def _timestamp_seconds(value):
+    """ISO string or epoch milliseconds → epoch seconds"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    return float(value) / 1000.0
+
+
+def parse_track(points, not_before=None, not_after=None):
+    """
+    Convert client points into time-ordered arrays
+
+    Args:
+        points: List of {lat, lng, timestamp} dicts or [lat, lng, timestamp] arrays
+                (timestamp: ISO 8601 string or epoch milliseconds)
+        not_before: Drop points earlier than this (epoch seconds)
+        not_after: Drop points later than this (epoch seconds)
+
+    Returns:
+        (timestamps, lats, lngs) ndarrays sorted by timestamp (epoch seconds)
+        - 값이 유한하지 않거나 허용 시간 범위 밖인 점은 제외
+
+    Raises:
+        TrackError: If points is not a list or a point is malformed
+    """
+    if not isinstance(points, (list, tuple)):
+        raise TrackError('points must be a list')
+
+    rows = []
+    for point in points:
+        try:
+            if isinstance(point, dict):
+                lat, lng, timestamp = point['lat'], point['lng'], point['timestamp']
+            else:
+                lat, lng, timestamp = point[0], point[1], point[2]
+            rows.append((_timestamp_seconds(timestamp), float(lat), float(lng)))
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise TrackError(f'Invalid point: {point!r}') from e
+
+    if not rows:
+        return np.zeros(0), np.zeros(0), np.zeros(0)
+
+    track = np.array(rows, dtype=np.float64)
+    valid = np.isfinite(track).all(axis=1)
+    valid &= (np.abs(track[:, 1]) <= 90) & (np.abs(track[:, 2]) <= 180)
+    if not_before is not None:
+        valid &= track[:, 0] >= not_before
+    if not_after is not None:
+        valid &= track[:, 0] <= not_after
+    track = track[valid]
+    track = track[np.argsort(track[:, 0], kind='stable')]
+    return track[:, 0], track[:, 1], track[:, 2]
+
+
+def drop_fast_points(timestamps, lats, lngs, max_speed_mps: float = MAX_SPEED_MPS, origin=None):
+    """
+    Drop points that could only be reached faster than max_speed_mps
+
+    앞에서부터 마지막으로 남긴 점과 비교 (튄 점 하나 때문에 그 다음 정상 점까지 버리지 않도록)
+
+    Args:
+        timestamps: Epoch seconds (sorted)
+        lats: Latitudes
+        lngs: Longitudes
+        max_speed_mps: Speed limit for a plausible segment
+        origin: Last known (timestamp, lat, lng) before the track, or None
+
+    Returns:
+        Boolean mask of kept points
+    """
+    keep = np.zeros(len(timestamps), dtype=bool)
+    previous = origin
+    for i, (ts, lat, lng) in enumerate(zip(timestamps.tolist(), lats.tolist(), lngs.tolist())):
+        if previous is not None:
+            # 1초 미만 간격은 1초로 (track_distance와 같은 기준)
+            elapsed = max(ts - previous[0], 1.0)
+            if haversine(previous[1], previous[2], lat, lng) / elapsed > max_speed_mps:
+                continue
+        keep[i] = True
+        previous = (ts, lat, lng)
+    return keep
+
+
+def track_cells(lats, lngs, resolution: int):
+    """
+    H3 cells of every point
+
+    Args:
+        lats: Latitudes
+        lngs: Longitudes
+        resolution: H3 resolution
+
+    Returns:
+        ndarray of uint64 H3 cells
+    """
+    return np.fromiter(
+        (h3_int.geo_to_h3(lat, lng, resolution) for lat, lng in zip(lats.tolist(), lngs.tolist())),
+        dtype=np.uint64,
+        count=len(lats),
+    )
+
+
+def track_distance(timestamps, lats, lngs, max_speed_mps: float = MAX_SPEED_MPS) -> float:
+    """
+    Total distance of a track, ignoring segments faster than max_speed_mps
+
+    Args:
+        timestamps: Epoch seconds (sorted)
+        lats: Latitudes
+        lngs: Longitudes
+        max_speed_mps: Speed limit for a plausible segment
+
+    Returns:
+        Distance in meters
+    """
+    distances = segment_distances(lats, lngs)
+    if distances.size == 0:
+        return 0.0
+    # 1초 미만 간격은 1초로 (실시간 처리와 같은 기준)
+    elapsed = np.maximum(np.diff(timestamps), 1.0)
+    return float(distances[distances / elapsed <= max_speed_mps].sum())
+
+
+def detect_claims(cells, timestamps, min_samples: int, min_dwell_sec: float):
+    """
+    Sample indices where a claim becomes valid (first valid sample of each same-hex run)
+
+    RingBufferClaimValidator와 같은 규칙: 최근 min_samples개가 모두 같은 hex이고
+    그 첫 샘플과 마지막 샘플의 시간 차이가 min_dwell_sec 이상
+
+    Args:
+        cells: H3 cells per sample (time order)
+        timestamps: Epoch seconds per sample
+        min_samples: Required consecutive samples in one hex
+        min_dwell_sec: Required dwell time
+
+    Returns:
+        ndarray of sample indices (ascending)
+    """
+    count = len(cells)
+    if count < min_samples or min_samples < 1:
+        return np.zeros(0, dtype=np.int64)
+
+    # 같은 hex가 이어지는 구간(run) 번호와 구간 안 위치
+    run_start = np.empty(count, dtype=bool)
+    run_start[0] = True
+    run_start[1:] = cells[1:] != cells[:-1]
+    run_ids = np.cumsum(run_start) - 1
+    starts = np.flatnonzero(run_start)
+    position = np.arange(count) - starts[run_ids]
+
+    candidates = np.flatnonzero(position >= min_samples - 1)
+    if candidates.size == 0:
+        return candidates
+    spans = timestamps[candidates] - timestamps[candidates - (min_samples - 1)]
+    valid = candidates[spans >= min_dwell_sec]
+    # run마다 처음 조건을 만족한 샘플만 (같은 hex 연속 점령은 consumer에서도 무시됨)
+    _, first = np.unique(run_ids[valid], return_index=True)
+    return valid[first]
+
+
+def process_track(
+    points,
+    resolution: int,
+    min_samples: int,
+    min_dwell_sec: float,
+    not_before=None,
+    not_after=None,
+    max_speed_mps: float = MAX_SPEED_MPS,
+    origin=None,
+) -> dict:
+    """
+    Process a batch of GPS points in one pass
+
+    Args:
+        points: Client points (see parse_track)
+        resolution: H3 resolution of the room
+        min_samples: Claim sample requirement
+        min_dwell_sec: Claim dwell requirement
+        not_before: Earliest accepted timestamp (epoch seconds)
+        not_after: Latest accepted timestamp (epoch seconds)
+        max_speed_mps: Points reached faster than this are dropped
+        origin: Last known (timestamp, lat, lng) before the track, or None
+
+    Returns:
+        Dict with:
+        - sample_count: Number of valid points
+        - rejected_count: Points dropped (malformed values, out of time range, too fast)
+        - distance_meters: Plausible distance covered
+        - claims: Claimed H3 index strings in time order
+        - last: Last point {lat, lng, h3_id, timestamp(epoch seconds)} or None
+    """
+    timestamps, lats, lngs = parse_track(points, not_before, not_after)
+    keep = drop_fast_points(timestamps, lats, lngs, max_speed_mps, origin)
+    timestamps, lats, lngs = timestamps[keep], lats[keep], lngs[keep]
+    rejected_count = len(points) - int(timestamps.size)
+    if timestamps.size == 0:
+        return {
+            'sample_count': 0,
+            'rejected_count': rejected_count,
+            'distance_meters': 0.0,
+            'claims': [],
+            'last': None,
+        }
+
+    cells = track_cells(lats, lngs, resolution)
+    claim_indices = detect_claims(cells, timestamps, min_samples, min_dwell_sec)
+    return {
+        'sample_count': int(timestamps.size),
+        'rejected_count': rejected_count,
+        'distance_meters': track_distance(timestamps, lats, lngs, max_speed_mps),
+        'claims': [h3_int_to_str(int(cell)) for cell in cells[claim_indices]],
+        'last': {
+            'lat': float(lats[-1]),
+            'lng': float(lngs[-1]),
+            'h3_id': h3_int_to_str(int(cells[-1])),
+            'timestamp': float(timestamps[-1]),
+        },
+    }
@@ -6,6 +6,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Count, Sum
 from apps.rooms.models import Room, Participant
+from apps.rooms.ownership import create_ownership_reader
 
 
 @api_view(['GET'])
@@ -29,12 +30,12 @@ def leaderboard(request):
         except Room.DoesNotExist:
             return Response({'error': 'NOT_FOUND', 'message': '방을 찾을 수 없습니다.'}, status=404)
         
-        ownerships = room.current_hex_ownerships or {}
-        
+        # 점령 수는 점령 저장소 기준 (Redis 저장소는 게임 중 DB 집계 필드를 갱신하지 않음)
+        store = create_ownership_reader(room)
         if leaderboard_type == 'team':
-            # 팀별 점수
-            team_a_count = sum(1 for h in ownerships.values() if h.get('team') == 'A')
-            team_b_count = sum(1 for h in ownerships.values() if h.get('team') == 'B')
+            _, team_counts = store.counts(room)
+            team_a_count = team_counts['A']
+            team_b_count = team_counts['B']
             
             return Response({
                 'room_id': str(room.id),
@@ -46,26 +47,23 @@ def leaderboard(request):
             })
         else:
             # 개인별 점수
-            user_counts = {}
-            for hex_data in ownerships.values():
-                user_id = hex_data.get('user_id')
-                if user_id:
-                    user_counts[user_id] = user_counts.get(user_id, 0) + 1
-            
-            # 참가자 정보와 함께 반환
-            participants = Participant.objects.filter(room=room).select_related('user')
-            user_map = {str(p.user_id): p for p in participants}
+            hex_counts = store.participant_counts()
+            participants = sorted(
+                (
+                    participant for participant in Participant.objects.filter(room=room).select_related('user')
+                    if hex_counts.get(str(participant.user_id), 0) > 0
+                ),
+                key=lambda participant: -hex_counts[str(participant.user_id)],
+            )
             
             results = []
-            for user_id, count in sorted(user_counts.items(), key=lambda x: -x[1]):
-                participant = user_map.get(user_id)
-                if participant:
-                    results.append({
-                        'user_id': user_id,
-                        'username': participant.user.username,
-                        'team': participant.team,
-                        'hex_count': count
-                    })
+            for participant in participants:
+                results.append({
+                    'user_id': str(participant.user_id),
+                    'username': participant.user.username,
+                    'team': participant.team,
+                    'hex_count': hex_counts[str(participant.user_id)]
+                })
             
             return Response({
                 'room_id': str(room.id),
@@ -16,18 +16,16 @@ class RankingService:
         return int(round(self.K_FACTOR * (result - expected)))
 
     def compute_hex_counts(self, room):
-        """각 사용자가 점령한 hex 개수 계산"""
-        ownerships = room.current_hex_ownerships or {}
-        counts = {}
-        for h3_id, hex_data in ownerships.items():
-            user_id = hex_data.get('user_id')
-            if user_id:
-                key = str(user_id)
-                counts[key] = counts.get(key, 0) + 1
+        """각 사용자가 점령한 hex 개수 (점령 시 갱신되는 Participant.hexes_claimed 집계)"""
+        counts = {
+            str(user_id): hexes_claimed
+            for user_id, hexes_claimed in Participant.objects.filter(room=room)
+            .values_list('user_id', 'hexes_claimed')
+        }
         logger.info(
             "compute_hex_counts: room=%s total_hexes=%d counts=%s",
             room.id,
-            len(ownerships),
+            room.team_a_hex_count + room.team_b_hex_count,
             counts,
         )
         return counts
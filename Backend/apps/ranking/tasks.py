@@ -6,7 +6,9 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 from apps.rooms.models import Room
+from apps.rooms.ownership import create_ownership_store
 from apps.ranking.services import RankingService
+from apps.realtime.events import group_event
 
 
 logger = logging.getLogger(__name__)
@@ -25,6 +27,9 @@ def check_and_end_games():
 @shared_task
 def process_game_end(room_id):
     """게임 종료 처리 및 레이팅 업데이트"""
+    # Redis 점령 저장소는 게임 중 DB 집계를 갱신하지 않으므로 승패 계산 전에 반영
+    create_ownership_store(room_id).persist()
+
     try:
         room = Room.objects.get(id=room_id)
     except Room.DoesNotExist:
@@ -50,6 +55,6 @@ def process_game_end(room_id):
 
     async_to_sync(channel_layer.group_send)(
         f'room_{room.id}',
-        payload,
+        group_event(payload),
     )
     return True
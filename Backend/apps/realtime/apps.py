@@ -5,3 +5,6 @@ class RealtimeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.realtime'
 
+    def ready(self):
+        from . import signals  # noqa: F401
+
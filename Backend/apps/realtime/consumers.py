@@ -3,37 +3,35 @@ WebSocket consumers - MVP 버전
 Room과 Participant 모델 사용 (Session 모델 제거됨)
 """
 import json
-import math
 import logging
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
-from apps.rooms.models import Room, Participant, RunningRecord
-from apps.hexmap.h3_utils import latlng_to_h3, is_h3_in_bounds, h3_to_latlng
-from apps.hexmap.claim_validator import ClaimValidator
-from apps.hexmap.loop_detector import LoopDetector
+from apps.rooms.models import Participant, RunningRecord
+from apps.hexmap.h3_utils import (
+    latlng_to_h3, h3_to_latlng, h3_str_to_int, is_valid_h3
+)
+from apps.hexmap.compute import ComputeTimeout, compute_pool
+from apps.hexmap.claim_validator import create_claim_validator
+from apps.hexmap.geo import haversine
+from apps.hexmap.loop_detector import LoopDetector, detect_loop_in_region
+from apps.hexmap.track import TrackError
+from apps.rooms.services import InventoryService, TrackIngestService, loop_complete_payload
+from apps.realtime.room_state import room_states
+from apps.realtime.events import encode, group_event, event_text, event_bytes
+from apps.realtime.metrics import (
+    CLAIMS, CLAIM_REJECTIONS, LOOPS, MESSAGES_RECEIVED, MESSAGES_SENT, HANDLER_SECONDS, timed
+)
+from apps.realtime.protocol import (
+    CLIENT_MESSAGES, PROTOCOL_MSGPACK, ProtocolError, negotiate_protocol, encode_message, decode_message
+)
 
 logger = logging.getLogger(__name__)
 
-
-def haversine_distance(lat1, lng1, lat2, lng2):
-    """
-    두 좌표 간 거리 계산 (Haversine 공식)
-    반환값: 미터 단위
-    """
-    R = 6371000  # 지구 반지름 (미터)
-    
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lng2 - lng1)
-    
-    a = (math.sin(delta_phi / 2) ** 2 + 
-         math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    return R * c
-
+# metrics label로 쓰는 클라이언트 메시지 종류 (그 외는 unknown)
+CLIENT_MESSAGE_TYPES = frozenset(message_type for message_type, _ in CLIENT_MESSAGES.values())
 
 
 class RoomConsumer(AsyncWebsocketConsumer):
@@ -46,20 +44,38 @@ class RoomConsumer(AsyncWebsocketConsumer):
         self.room_id = self.scope['url_route']['kwargs']['room_id']
         self.group_name = f'room_{self.room_id}'
         self.user = self.scope['user']
+        self.room_state = None
+        self.participant_id = None
+        # 메시지 형식 (기본 JSON, subprotocol 또는 ?protocol=msgpack 이면 compact)
+        self.protocol, subprotocol = negotiate_protocol(self.scope)
         
-        # 방 및 참가자 확인
-        room = await self.get_room()
-        if not room:
+        # 인증 실패 연결은 방 상태를 건드리지 않고 바로 종료
+        if not self.user.is_authenticated:
             await self.close()
             return
         
-        participant = await self.get_participant()
+        # 방 상태 로드 (같은 방의 다른 consumer가 이미 로드했다면 재사용)
+        room_state = await room_states.acquire(self.room_id)
+        if not room_state:
+            await self.close()
+            return
+        self.room_state = room_state
+        
+        participant = room_state.get_participant(self.user.id)
+        if not participant:
+            # 상태 로드 이후 방에 참가한 경우: 내 참가자 정보만 조회 (방 전체를 다시 로드하지 않음)
+            participant = await room_state.load_participant(self.user.id)
         if not participant:
+            # 참가자가 아니면 방 상태 참조를 바로 해제 (disconnect에 맡기지 않음)
+            self.room_state = None
+            await room_states.release(self.room_id)
             await self.close()
             return
         
         self.participant_id = str(participant.id)
-        self.claim_validator = ClaimValidator(self.participant_id)
+        # 점령 검증 샘플 (기본: consumer 메모리의 ring buffer, 재연결 시 이전 샘플 복원)
+        self.claim_validator = create_claim_validator(self.participant_id)
+        await sync_to_async(self.claim_validator.restore)()
         
         # 거리 계산용 변수 초기화
         self.last_position = None  # 마지막 위치 {'lat': float, 'lng': float}
@@ -69,28 +85,55 @@ class RoomConsumer(AsyncWebsocketConsumer):
         
         # 그룹 참가
         await self.channel_layer.group_add(self.group_name, self.channel_name)
-        await self.accept()
+        await self.accept(subprotocol=subprotocol)
         
         # 연결 확인 메시지
-        await self.send(text_data=json.dumps({
+        await self.send_message({
             'type': 'connection_established',
             'room_id': self.room_id,
-            'participant_id': self.participant_id
-        }))
+            'participant_id': self.participant_id,
+            'ownership_version': self.room_state.ownership_version
+        })
+        
+        # 재연결: ?since_version=N 이면 그 이후 점령 변경분 바로 전송
+        since_version = parse_qs(self.scope.get('query_string', b'').decode()).get('since_version')
+        if since_version:
+            await self.handle_sync_ownerships({'since_version': since_version[0]})
     
     async def disconnect(self, close_code):
         # 그룹에서 나가기
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        
+        # 점령 검증 샘플 저장 (재연결 시 복원)
+        if getattr(self, 'claim_validator', None):
+            await sync_to_async(self.claim_validator.persist)()
+        
+        # 방 상태 참조 해제 (내 위치는 바로 저장, 마지막 연결이면 메모리에서 제거)
+        room_state = getattr(self, 'room_state', None)
+        if room_state:
+            self.room_state = None
+            try:
+                if self.participant_id:
+                    await room_state.location_buffer.flush(self.participant_id)
+            finally:
+                await room_states.release(self.room_id)
     
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """WebSocket 메시지 수신"""
         try:
-            data = json.loads(text_data)
+            if bytes_data is not None:
+                data = decode_message(bytes_data)
+            else:
+                data = json.loads(text_data)
             event_type = data.get('type')
+            MESSAGES_RECEIVED.inc(type=event_type if event_type in CLIENT_MESSAGE_TYPES else 'unknown')
             
             if event_type == 'location_update':
                 # 위치 업데이트
                 await self.handle_location_update(data)
+            elif event_type == 'location_batch':
+                # 끊겼던 동안의 위치 일괄 전송
+                await self.handle_location_batch(data)
             elif event_type == 'paintball':
                 # 페인트볼 사용
                 await self.handle_paintball(data)
@@ -103,13 +146,22 @@ class RoomConsumer(AsyncWebsocketConsumer):
             elif event_type == 'stop_recording':
                 # 기록 종료
                 await self.handle_stop_recording(data)
+            elif event_type == 'sync_ownerships':
+                # 점령 상태 동기화 (재연결)
+                await self.handle_sync_ownerships(data)
         
         except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 'type': 'error',
                 'message': 'Invalid JSON'
-            }))
+            })
+        except ProtocolError as e:
+            await self.send_message({
+                'type': 'error',
+                'message': str(e)
+            })
     
+    @timed('handle_location_update')
     async def handle_location_update(self, data):
         """위치 업데이트 처리"""
         import logging
@@ -146,22 +198,18 @@ class RoomConsumer(AsyncWebsocketConsumer):
             h3_id = latlng_to_h3(lat, lng, resolution)
             
             # 위치 업데이트
-            await self.update_participant_location(lat, lng, h3_id, timestamp)
+            await self.update_participant_location(participant, lat, lng, h3_id, timestamp)
             
-            # 위치 브로드캐스트
-            logger.info(f"Broadcasting location update to group {self.group_name}")
-            await self.channel_layer.group_send(
-                self.group_name,
-                {
-                    'type': 'participant_location',
-                    'participant_id': self.participant_id,
-                    'lat': lat,
-                    'lng': lng,
-                    'h3_id': h3_id,
-                    'timestamp': timestamp.isoformat()
-                }
-            )
-            logger.info(f"Location broadcast sent successfully")
+            # 위치 브로드캐스트 (방 단위로 모아서 participants_snapshot으로 주기 전송)
+            await self.room_state.location_broadcaster.add(self.participant_id, {
+                'participant_id': self.participant_id,
+                'user_id': str(participant.user_id),
+                'team': participant.team,
+                'lat': lat,
+                'lng': lng,
+                'h3_id': h3_id,
+                'timestamp': timestamp.isoformat()
+            })
             
             # 기록 중인 경우에만 점령 처리 및 거리 계산
             if not participant.is_recording:
@@ -174,7 +222,7 @@ class RoomConsumer(AsyncWebsocketConsumer):
             if participant.is_recording:
                 # 거리 계산 (GPS 위치 기반)
                 if self.last_position is not None:
-                    distance = haversine_distance(
+                    distance = haversine(
                         self.last_position['lat'], self.last_position['lng'],
                         lat, lng
                     )
@@ -193,80 +241,178 @@ class RoomConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error(f"handle_location_update error: {e}", exc_info=True)
     
+    async def handle_location_batch(self, data):
+        """
+        재연결 후 끊겼던 동안의 위치 샘플 일괄 처리
+        트랙 전체를 한 번에 계산하고 점령은 한 번에 저장 (방 명령 큐에서 다른 점령과 순서대로)
+        """
+        room = await self.get_room()
+        participant = await self.get_participant()
+        if not room or not participant:
+            return
+        if room.status != 'active':
+            await self.send_message({
+                'type': 'error',
+                'message': '진행 중인 게임이 아닙니다.'
+            })
+            return
+        
+        try:
+            result = await self.room_state.commands.run(
+                self.apply_location_batch, data.get('points'), participant, room
+            )
+        except TrackError as e:
+            await self.send_message({
+                'type': 'error',
+                'message': str(e)
+            })
+            return
+        
+        if participant.is_recording:
+            self.total_distance += result['distance_meters']
+        if result['gauge_added']:
+            await self.send_gauge_update(participant)
+        await self.send_message({
+            'type': 'location_batch_result',
+            'sample_count': result['sample_count'],
+            'rejected_count': result['rejected_count'],
+            'distance_meters': round(result['distance_meters'], 2),
+            'claimed_count': len(result['claimed_h3_ids']),
+            'version': result['version']
+        })
+    
+    async def apply_location_batch(self, points, participant, room):
+        """트랙 일괄 점령 명령: 저장 + 루프 채우기(서비스) → 인메모리 점령 상태 반영 → 브로드캐스트"""
+        await self.room_state.ensure_ownerships_loaded()
+        team_cells = frozenset(self.room_state.team_graphs[participant.team])
+        service = TrackIngestService(room, participant, team_cells=team_cells)
+        result = await database_sync_to_async(service.ingest)(points)
+        
+        claimed_h3_ids = result['claimed_h3_ids']
+        if not claimed_h3_ids:
+            return result
+        
+        team = participant.team
+        user_id = str(participant.user_id)
+        claimed_at = timezone.now().isoformat()
+        self.room_state.set_ownerships(claimed_h3_ids, {
+            'team': team,
+            'user_id': user_id,
+            'claimed_at': claimed_at,
+            'version': result['version']
+        })
+        self.last_claimed_h3_id = claimed_h3_ids[-1]
+        
+        await self.group_send(
+            group_event({
+                'type': 'hexes_claimed',
+                'participant_id': self.participant_id,
+                'team': team,
+                'h3_ids': claimed_h3_ids,
+                'version': result['version'],
+                'timestamp': timezone.now().isoformat()
+            }, version=result['version'])
+        )
+        for fill in result['loop_fills']:
+            self.room_state.set_ownerships(fill['h3_ids'], {
+                'team': team,
+                'user_id': user_id,
+                'claimed_at': fill['claimed_at'].isoformat(),
+                'version': fill['version'],
+                'claimed_by': 'loop'
+            })
+            await self.group_send(
+                group_event(
+                    loop_complete_payload(
+                        participant, room.h3_resolution, fill['h3_ids'], fill['version'], fill['claimed_at']
+                    ),
+                    version=fill['version']
+                )
+            )
+        await self.broadcast_score_update(room)
+        return result
+    
     async def process_claim_logic(self, lat, lng, h3_id, timestamp, participant, room):
         """점령 로직 처리"""
         # 클레임 검증기에 샘플 추가
         self.claim_validator.add_location_sample(lat, lng, h3_id, timestamp)
         
         # 샘플 상태 로그 (주기적으로만 출력)
-        samples = self.claim_validator.get_samples()
-        if len(samples) > 0 and len(samples) % 3 == 0:  # 3개마다 한 번씩
+        sample_count = self.claim_validator.sample_count
+        if sample_count > 0 and sample_count % 3 == 0:  # 3개마다 한 번씩
             logger.debug(
                 "Location sample added: participant=%s h3_id=%s total_samples=%d lat=%.6f lng=%.6f",
                 self.participant_id,
                 h3_id,
-                len(samples),
+                sample_count,
                 lat,
                 lng,
             )
         
+        # failover용 주기 저장 (ring buffer 모드)
+        if self.claim_validator.persist_due():
+            await sync_to_async(self.claim_validator.persist)()
+        
         # 클레임 검증
         claimed_h3_id = self.claim_validator.check_claim()
         
         if claimed_h3_id:
-            logger.info(
+            logger.debug(
                 "Claim candidate: participant=%s h3_id=%s",
                 self.participant_id,
                 claimed_h3_id,
             )
             await self.process_claim(claimed_h3_id, participant, room)
     
+    @timed('process_claim')
     async def process_claim(self, h3_id, participant, room):
-        """점령 처리"""
+        """점령 처리 (방 명령 큐에서 다른 점령/페인트볼과 순서대로 실행)"""
+        await self.room_state.commands.run(self.apply_claim, h3_id, participant)
+    
+    async def apply_claim(self, h3_id, participant):
+        """점령 명령: 점령 상태 확인 → 저장 → 루프 채우기 → 점수 브로드캐스트"""
         logger.debug(
             "process_claim called: participant=%s h3_id=%s",
             self.participant_id,
             h3_id,
         )
         
-        # Race condition 방지: room을 다시 조회하여 최신 ownerships 가져오기
+        # 방 상태의 room 사용 (점령 저장은 hex 단위 compare-and-set)
         room = await self.get_room()
         if not room:
             logger.error("Room not found in process_claim: room_id=%s", self.room_id)
             return
         
-        # 게임 영역 검증: 영역 밖 hex는 점령 불가
-        game_area_bounds = room.game_area.bounds if room.game_area else None
-        
-        # H3 hex의 중심 좌표 확인
-        try:
-            hex_lat, hex_lng = h3_to_latlng(h3_id)
-        except Exception as e:
-            logger.error(
-                "Failed to get hex center: participant=%s h3_id=%s error=%s",
-                self.participant_id,
-                h3_id,
-                str(e),
-            )
-            hex_lat, hex_lng = None, None
-        
-        if not is_h3_in_bounds(h3_id, game_area_bounds):
+        # 게임 영역 검증: 영역 밖 hex는 점령 불가 (GameArea별 캐시된 prepared 경계 사용)
+        if not self.room_state.is_h3_in_bounds(h3_id):
+            # H3 hex의 중심 좌표 확인 (로그용)
+            try:
+                hex_lat, hex_lng = h3_to_latlng(h3_id)
+            except Exception as e:
+                logger.error(
+                    "Failed to get hex center: participant=%s h3_id=%s error=%s",
+                    self.participant_id,
+                    h3_id,
+                    str(e),
+                )
+                hex_lat, hex_lng = None, None
             logger.warning(
                 "Claim rejected (out of bounds): participant=%s h3_id=%s hex_center=(%.6f, %.6f) bounds=%s",
                 self.participant_id,
                 h3_id,
                 hex_lat or 0.0,
                 hex_lng or 0.0,
-                bool(game_area_bounds),
+                bool(room.game_area_bounds),
             )
+            CLAIM_REJECTIONS.inc(reason='out_of_bounds')
             return
         
         team = participant.team
         user_id = str(participant.user_id)
         
-        # 현재 소유 상태 확인
-        current_ownerships = room.current_hex_ownerships or {}
-        existing = current_ownerships.get(h3_id)
+        # 현재 소유 상태 확인 (방 상태의 인메모리 점령 상태, 처음 점령 시 로드)
+        await self.room_state.ensure_ownerships_loaded()
+        existing = self.room_state.ownerships.get(h3_id)
         
         logger.debug(
             "Claim processing: participant=%s h3_id=%s team=%s existing=%s",
@@ -283,6 +429,7 @@ class RoomConsumer(AsyncWebsocketConsumer):
                 self.participant_id,
                 h3_id,
             )
+            CLAIM_REJECTIONS.inc(reason='same_hex')
             return  # 게이지도 추가하지 않고 점령도 하지 않음
         
         gauge_to_add = 0
@@ -300,21 +447,12 @@ class RoomConsumer(AsyncWebsocketConsumer):
                     existing.get('user_id'),
                 )
                 # user_id를 변경하지 않으므로 원래 점령자가 계속 카운트됨
+                CLAIM_REJECTIONS.inc(reason='same_team')
             else:
                 # 상대 팀 땅 점령
-                current_ownerships[h3_id] = {
-                    'team': team,
-                    'user_id': user_id,
-                    'claimed_at': timezone.now().isoformat()
-                }
                 claimed = True
         else:
             # 빈 땅 점령
-            current_ownerships[h3_id] = {
-                'team': team,
-                'user_id': user_id,
-                'claimed_at': timezone.now().isoformat()
-            }
             claimed = True
         
         # 게이지 추가
@@ -322,30 +460,43 @@ class RoomConsumer(AsyncWebsocketConsumer):
             await self.add_gauge(participant, gauge_to_add)
             await self.send_gauge_update(participant)
         
-        # 점령 저장
+        # 점령 저장 (그 사이 다른 참가자가 먼저 점령했으면 실패)
         if claimed:
-            logger.info(
+            version = await self.save_hex_ownership(h3_id, existing, team, user_id)
+            claimed = version is not None
+            if not claimed:
+                logger.debug(
+                    "Claim conflict: participant=%s h3_id=%s team=%s",
+                    self.participant_id,
+                    h3_id,
+                    team,
+                )
+                CLAIM_REJECTIONS.inc(reason='conflict')
+                # 같은 hex에 머무는 동안 다음 샘플에서 다시 점령 시도
+                self.claim_validator.release_claim()
+        
+        if claimed:
+            CLAIMS.inc(source='gps')
+            logger.debug(
                 "Claim success: participant=%s h3_id=%s team=%s user_id=%s",
                 self.participant_id,
                 h3_id,
                 team,
                 user_id,
             )
-            await self.save_hex_ownerships(room, current_ownerships)
-            
             # 출석 체크 (다른 hex로 이동)
             await self.check_attendance(participant, h3_id)
             
             # 점령 브로드캐스트
-            await self.channel_layer.group_send(
-                self.group_name,
-                {
+            await self.group_send(
+                group_event({
                     'type': 'hex_claimed',
                     'participant_id': self.participant_id,
                     'team': team,
                     'h3_id': h3_id,
+                    'version': version,
                     'timestamp': timezone.now().isoformat()
-                }
+                }, version=version)
             )
             
             # 루프 감지 및 내부 hex 자동 점령 (새로 점령한 hex가 포함된 루프만 찾기)
@@ -364,10 +515,10 @@ class RoomConsumer(AsyncWebsocketConsumer):
         target_h3_id = data.get('target_h3_id')
         
         if not target_h3_id:
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 'type': 'error',
                 'message': 'target_h3_id가 필요합니다.'
-            }))
+            })
             return
         
         participant = await self.get_participant()
@@ -376,13 +527,20 @@ class RoomConsumer(AsyncWebsocketConsumer):
         if not participant or not room or room.status != 'active':
             return
         
+        # 형식/해상도가 맞지 않는 hex는 페인트볼을 쓰기 전에 거절 (잘못된 점령 상태가 저장되지 않도록)
+        if not is_valid_h3(target_h3_id, room.h3_resolution):
+            await self.send_message({
+                'type': 'error',
+                'message': '올바르지 않은 hex입니다.'
+            })
+            return
+        
         # 게임 영역 검증: 영역 밖 hex는 페인트볼로도 점령 불가
-        game_area_bounds = room.game_area.bounds if room.game_area else None
-        if not is_h3_in_bounds(target_h3_id, game_area_bounds):
-            await self.send(text_data=json.dumps({
+        if not self.room_state.is_h3_in_bounds(target_h3_id):
+            await self.send_message({
                 'type': 'error',
                 'message': '게임 영역 밖의 hex는 점령할 수 없습니다.'
-            }))
+            })
             return
         
         # 페인트볼 사용
@@ -392,44 +550,66 @@ class RoomConsumer(AsyncWebsocketConsumer):
             success = await self.use_paintball(participant)
         
         if not success:
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 'type': 'error',
                 'message': '페인트볼이 부족합니다.'
-            }))
+            })
             return
         
-        # 타겟 hex 점령
+        # 타겟 hex 점령 (방 명령 큐에서 다른 점령과 순서대로 실행)
+        version = await self.room_state.commands.run(
+            self.apply_paintball, target_h3_id, paintball_type, participant, room
+        )
+        if version is None:
+            # 점령 저장 실패 → 사용한 페인트볼 되돌림
+            await self.refund_paintball(participant, paintball_type)
+            await self.send_message({
+                'type': 'error',
+                'message': '다른 점령과 겹쳐 페인트볼을 사용하지 못했습니다.'
+            })
+        # 페인트볼 사용 후 게이지/개수 업데이트 전송
+        await self.send_gauge_update(participant)
+    
+    async def apply_paintball(self, target_h3_id, paintball_type, participant, room):
+        """
+        페인트볼 명령: 타겟 hex 점령 → 브로드캐스트 → 루프 채우기 → 점수 브로드캐스트
+        반환값: 점령 성공 시 ownership version, 두 번 모두 저장하지 못하면 None (브로드캐스트 없음)
+        """
         team = participant.team
         user_id = str(participant.user_id)
         
-        current_ownerships = room.current_hex_ownerships or {}
-        current_ownerships[target_h3_id] = {
-            'team': team,
-            'user_id': user_id,
-            'claimed_at': timezone.now().isoformat()
-        }
-        
-        await self.save_hex_ownerships(room, current_ownerships)
+        await self.room_state.ensure_ownerships_loaded()
+        ownerships = self.room_state.ownerships
+        version = await self.save_hex_ownership(target_h3_id, ownerships.get(target_h3_id), team, user_id)
+        if version is None:
+            # 그 사이 다른 점령이 반영됨 → 최신 상태 기준으로 한 번 더 시도
+            version = await self.save_hex_ownership(target_h3_id, ownerships.get(target_h3_id), team, user_id)
+        if version is None:
+            logger.warning(
+                "Paintball claim failed: participant=%s h3_id=%s",
+                self.participant_id,
+                target_h3_id,
+            )
+            return None
         
         # 브로드캐스트
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
+        await self.group_send(
+            group_event({
                 'type': 'paintball_used',
                 'participant_id': self.participant_id,
                 'team': team,
                 'paintball_type': paintball_type,
                 'target_h3_id': target_h3_id,
+                'version': version,
                 'timestamp': timezone.now().isoformat()
-            }
+            }, version=version)
         )
         
         # 루프 감지 및 내부 hex 자동 점령 (페인트볼로 점령한 hex가 포함된 루프만 찾기)
         await self.check_and_claim_loop(team, room, participant, target_h3_id)
         
         await self.broadcast_score_update(room)
-        # 페인트볼 사용 후 게이지/개수 업데이트 전송
-        await self.send_gauge_update(participant)
+        return version
     
     async def handle_exchange_paintball(self):
         """페인트볼 교환 처리 (일반 3개 -> 슈퍼 1개)"""
@@ -440,24 +620,24 @@ class RoomConsumer(AsyncWebsocketConsumer):
         success = await self.db_exchange_paintball(participant)
         if success:
             await self.send_gauge_update(participant)
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 'type': 'exchange_success',
                 'message': '슈퍼 페인트볼로 교환되었습니다.'
-            }))
+            })
         else:
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 'type': 'error',
                 'message': '페인트볼이 부족합니다 (최소 3개 필요)'
-            }))
+            })
 
     async def send_gauge_update(self, participant):
         """본인에게 게이지 및 페인트볼 현황 전송"""
-        await self.send(text_data=json.dumps({
+        await self.send_message({
             'type': 'gauge_update',
             'paintball_gauge': participant.paintball_gauge,
             'paintball_count': participant.paintball_count,
             'super_paintball_count': participant.super_paintball_count
-        }))
+        })
     
     async def handle_start_recording(self):
         """기록 시작 처리"""
@@ -468,10 +648,10 @@ class RoomConsumer(AsyncWebsocketConsumer):
             return
         
         if participant.is_recording:
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 'type': 'error',
                 'message': '이미 기록 중입니다.'
-            }))
+            })
             return
         
         # 거리 계산 변수 초기화
@@ -485,11 +665,11 @@ class RoomConsumer(AsyncWebsocketConsumer):
         # 러닝 기록 생성
         record = await self.create_running_record(participant, room, self.recording_start_time)
         
-        await self.send(text_data=json.dumps({
+        await self.send_message({
             'type': 'recording_started',
             'record_id': str(record.id),
             'started_at': record.started_at.isoformat()
-        }))
+        })
     
     async def handle_stop_recording(self, data):
         """기록 종료 처리"""
@@ -513,8 +693,8 @@ class RoomConsumer(AsyncWebsocketConsumer):
             else:
                 duration_seconds = 0
             
-            # 거리: 백엔드에서 계산한 값 사용
-            distance_meters = self.total_distance
+            # 거리: 백엔드에서 계산한 값 사용 (REST로 일괄 전송된 트랙 거리는 기록에 이미 누적됨)
+            distance_meters = self.total_distance + (record.distance_meters if record else 0)
             
             # 기록 종료
             await self.set_participant_recording(participant, False)
@@ -523,13 +703,13 @@ class RoomConsumer(AsyncWebsocketConsumer):
                 # update_running_record에서 계산된 값을 반환받아 사용
                 result = await self.update_running_record(record, duration_seconds, distance_meters, ended_at)
                 
-                await self.send(text_data=json.dumps({
+                await self.send_message({
                     'type': 'recording_stopped',
                     'record_id': str(record.id),
                     'duration_seconds': duration_seconds,
                     'distance_meters': round(distance_meters, 2),
                     'avg_pace_seconds_per_km': result.get('avg_pace_seconds_per_km')
-                }))
+                })
             
             # 거리 계산 변수 초기화
             self.last_position = None
@@ -539,89 +719,108 @@ class RoomConsumer(AsyncWebsocketConsumer):
             import logging
             logger = logging.getLogger(__name__)
             logger.error(f"handle_stop_recording error: {e}", exc_info=True)
-            await self.send(text_data=json.dumps({
+            await self.send_message({
                 'type': 'error',
                 'message': f'기록 종료 중 오류가 발생했습니다: {str(e)}'
-            }))
+            })
+    
+    async def handle_sync_ownerships(self, data):
+        """
+        점령 상태 동기화
+        since_version 이후 변경분(ownership_delta, 점령 저장소에서 조회), 알 수 없거나 너무 많으면 전체 스냅샷(ownership_snapshot)
+        """
+        try:
+            since_version = int(data.get('since_version'))
+        except (TypeError, ValueError):
+            since_version = None
+        
+        if not await self.room_state.ensure_loaded():
+            return
+        
+        version, changes = await self.room_state.changes_since(since_version)
+        if changes is not None:
+            await self.send_message({
+                'type': 'ownership_delta',
+                'since_version': since_version,
+                'version': version,
+                'changes': changes
+            })
+        else:
+            await self.room_state.ensure_ownerships_loaded()
+            await self.send_message({
+                'type': 'ownership_snapshot',
+                'version': self.room_state.ownership_version,
+                'teams': self.room_state.ownership_snapshot()
+            })
     
     async def broadcast_score_update(self, room):
         """점수 업데이트 브로드캐스트"""
-        ownerships = room.current_hex_ownerships or {}
+        # 점령 시 갱신되는 팀별 집계 사용 (전체 hex 순회 없음)
+        team_a_count = self.room_state.team_hex_counts['A']
+        team_b_count = self.room_state.team_hex_counts['B']
         
-        team_a_count = sum(1 for h in ownerships.values() if h.get('team') == 'A')
-        team_b_count = sum(1 for h in ownerships.values() if h.get('team') == 'B')
-        
-        await self.channel_layer.group_send(
-            self.group_name,
-            {
+        await self.group_send(
+            group_event({
                 'type': 'score_update',
                 'team_a_count': team_a_count,
                 'team_b_count': team_b_count,
                 'timestamp': timezone.now().isoformat()
-            }
+            })
         )
     
-    # Database helper methods
+    # Room state helper methods
     
-    @database_sync_to_async
-    def get_room(self):
-        try:
-            # select_related로 game_area를 미리 로드하여 비동기 컨텍스트에서 lazy loading 방지
-            return Room.objects.select_related('game_area').get(id=self.room_id)
-        except Room.DoesNotExist:
+    async def get_room(self):
+        """캐시된 방 상태의 Room (무효화된 경우에만 DB 재조회)"""
+        if not self.room_state or not await self.room_state.ensure_loaded():
             return None
+        return self.room_state.room
     
-    @database_sync_to_async
-    def get_participant(self):
-        try:
-            return Participant.objects.get(room_id=self.room_id, user=self.user)
-        except Participant.DoesNotExist:
+    async def get_participant(self):
+        """캐시된 방 상태의 내 Participant"""
+        if not self.room_state or not await self.room_state.ensure_loaded():
             return None
+        return self.room_state.get_participant(self.user.id)
     
-    @database_sync_to_async
-    def update_participant_location(self, lat, lng, h3_id, timestamp):
-        try:
-            participant = Participant.objects.get(room_id=self.room_id, user=self.user)
-            participant.last_lat = lat
-            participant.last_lng = lng
-            participant.last_h3_id = h3_id
-            participant.last_location_at = timestamp
-            participant.save(update_fields=['last_lat', 'last_lng', 'last_h3_id', 'last_location_at'])
-        except Participant.DoesNotExist:
-            pass
+    async def update_participant_location(self, participant, lat, lng, h3_id, timestamp):
+        """메모리 상태 갱신 후 write-behind 버퍼에 기록 (DB에는 주기적으로 일괄 저장)"""
+        participant.last_lat = lat
+        participant.last_lng = lng
+        participant.last_h3_id = h3_id
+        participant.last_location_at = timestamp
+        await self.room_state.location_buffer.add(self.participant_id, lat, lng, h3_id, timestamp)
     
-    @database_sync_to_async
-    def set_participant_recording(self, participant, is_recording):
+    # Database helper methods
+    # 단순 조회/갱신은 Django async ORM (한 번의 쿼리), 트랜잭션이 필요한 점령 저장은 database_sync_to_async
+    
+    async def set_participant_recording(self, participant, is_recording):
         """참가자 기록 상태 변경"""
         participant.is_recording = is_recording
-        participant.save(update_fields=['is_recording'])
+        await Participant.objects.filter(id=participant.id).aupdate(is_recording=is_recording)
     
-    @database_sync_to_async
-    def create_running_record(self, participant, room, started_at):
+    async def create_running_record(self, participant, room, started_at):
         """러닝 기록 생성"""
-        return RunningRecord.objects.create(
-            user=participant.user,
+        return await RunningRecord.objects.acreate(
+            user_id=participant.user_id,
             room=room,
             participant=participant,
             started_at=started_at
         )
     
-    @database_sync_to_async
-    def get_latest_running_record(self, participant):
+    async def get_latest_running_record(self, participant):
         """가장 최근의 종료되지 않은 러닝 기록 조회"""
-        return RunningRecord.objects.filter(
+        return await RunningRecord.objects.filter(
             participant=participant,
             ended_at__isnull=True
-        ).order_by('-started_at').first()
+        ).order_by('-started_at').afirst()
     
-    @database_sync_to_async
-    def update_running_record(self, record, duration_seconds, distance_meters, ended_at):
+    async def update_running_record(self, record, duration_seconds, distance_meters, ended_at):
         """러닝 기록 업데이트 - 업데이트된 값을 반환"""
         record.duration_seconds = duration_seconds
         record.distance_meters = distance_meters
         record.ended_at = ended_at
         record.calculate_pace()
-        record.save(update_fields=['duration_seconds', 'distance_meters', 'ended_at', 'avg_pace_seconds_per_km'])
+        await record.asave(update_fields=['duration_seconds', 'distance_meters', 'ended_at', 'avg_pace_seconds_per_km'])
         
         # 반환할 값들을 딕셔너리로 반환 (비동기 컨텍스트에서 안전하게 사용)
         return {
@@ -630,37 +829,61 @@ class RoomConsumer(AsyncWebsocketConsumer):
             'avg_pace_seconds_per_km': record.avg_pace_seconds_per_km
         }
     
-    @database_sync_to_async
-    def add_gauge(self, participant, amount):
-        participant.add_gauge(amount)
+    # 게이지/페인트볼: 조건부 UPDATE 한 문장 (변경 후 값이 participant에 반영됨)
     
-    @database_sync_to_async
-    def use_paintball(self, participant):
-        return participant.use_paintball()
+    async def add_gauge(self, participant, amount):
+        await InventoryService(participant).aadd_gauge(amount)
     
-    @database_sync_to_async
-    def use_super_paintball(self, participant):
-        return participant.use_super_paintball()
+    async def use_paintball(self, participant):
+        return await InventoryService(participant).ause_paintball()
     
-    @database_sync_to_async
-    def db_exchange_paintball(self, participant):
+    async def use_super_paintball(self, participant):
+        return await InventoryService(participant).ause_super_paintball()
+    
+    async def refund_paintball(self, participant, paintball_type):
+        await InventoryService(participant).arefund_paintball(paintball_type)
+    
+    async def db_exchange_paintball(self, participant):
         """페인트볼 교환 DB 처리"""
-        return participant.exchange_paintballs_to_super()
+        return await InventoryService(participant).aexchange_paintballs_to_super()
+    
+    @timed('save_hex_ownership')
+    async def save_hex_ownership(self, h3_id, expected, team, user_id):
+        """
+        hex 하나 점령 저장 후 인메모리 점령 상태 반영
+        expected(알고 있던 점령 상태)가 DB와 다르면 저장하지 않고 최신 상태로 갱신
+        반환값: 점령 성공 시 ownership version, 실패 시 None
+        """
+        claimed_at = timezone.now()
+        version, current = await self.db_compare_and_set_hex(h3_id, expected, team, user_id, claimed_at)
+        if version is not None:
+            current = {
+                'team': team,
+                'user_id': user_id,
+                'claimed_at': claimed_at.isoformat(),
+                'version': version
+            }
+        self.room_state.set_ownership(h3_id, current)
+        return version
     
     @database_sync_to_async
-    def save_hex_ownerships(self, room, ownerships):
-        """점령 상태 저장 (race condition 방지를 위해 최신 상태를 다시 읽어서 merge)"""
-        # 최신 상태를 다시 조회
-        room.refresh_from_db()
-        # 기존 ownerships와 새 ownerships를 merge
-        existing_ownerships = room.current_hex_ownerships or {}
-        merged_ownerships = {**existing_ownerships, **ownerships}
-        room.current_hex_ownerships = merged_ownerships
-        room.save(update_fields=['current_hex_ownerships'])
+    def db_compare_and_set_hex(self, h3_id, expected, team, user_id, claimed_at):
+        """hex 단위 compare-and-set (실패 시 현재 점령 상태도 함께 반환)"""
+        store = self.room_state.ownership_store
+        version = store.compare_and_set(h3_id, expected, team, user_id, claimed_at)
+        if version is not None:
+            return version, None
+        return None, store.get(h3_id)
     
     @database_sync_to_async
-    def check_attendance(self, participant, new_h3_id):
-        """출석 체크 (다른 hex로 이동 시)"""
+    def db_claim_unowned_hexes(self, h3_ids, team, user_id, claimed_at):
+        """미점령 hex 일괄 점령 (루프 내부), (실제로 점령된 h3_id 목록, ownership version) 반환"""
+        return self.room_state.ownership_store.claim_unowned(
+            h3_ids, team, user_id, claimed_at, claimed_by='loop'
+        )
+    
+    async def check_attendance(self, participant, new_h3_id):
+        """출석 체크 (다른 hex로 이동 시, 오늘 이미 출석했으면 DB 접근 없음)"""
         today = timezone.now().date()
         
         if participant.last_h3_id and participant.last_h3_id != new_h3_id:
@@ -675,17 +898,17 @@ class RoomConsumer(AsyncWebsocketConsumer):
                 else:
                     participant.consecutive_attendance_days = 1
                 
-                # 출석 보상 계산 (2일: +2, 3일: +3, ..., 최대 +7)
-                bonus = min(participant.consecutive_attendance_days, 7)
-                if bonus >= 2:
-                    participant.paintball_count += bonus
-                
                 participant.last_attendance_date = today
-                participant.save(update_fields=[
+                await participant.asave(update_fields=[
                     'consecutive_attendance_days', 
-                    'last_attendance_date',
-                    'paintball_count'
+                    'last_attendance_date'
                 ])
+                
+                # 출석 보상 계산 (2일: +2, 3일: +3, ..., 최대 +7)
+                # 페인트볼 개수는 증감 UPDATE로 (그 사이 사용한 페인트볼을 덮어쓰지 않도록)
+                bonus = min(participant.consecutive_attendance_days, 7)
+                if bonus >= 2:
+                    await InventoryService(participant).aadd_paintballs(bonus)
     
     async def check_and_claim_loop(self, team, room, participant, new_hex_id):
         """루프 감지 및 내부 hex 자동 점령"""
@@ -696,98 +919,158 @@ class RoomConsumer(AsyncWebsocketConsumer):
             # 내부 hex 자동 점령
             await self.claim_interior_hexes(loop_result, participant, room)
     
-    @database_sync_to_async
-    def detect_loop(self, team, room, new_hex_id=None):
-        """루프 감지 (동기 함수)"""
+    @timed('detect_loop')
+    async def detect_loop(self, team, room, new_hex_id):
+        """
+        루프 감지 (새 hex 주변 팀 cell만 떼어 compute 프로세스에서 탐색)
+        방 명령 큐 안에서 실행되므로 기다리는 동안 팀 그래프가 바뀌지 않음
+        """
+        team_graph = self.room_state.team_graphs[team]
+        new_cell = h3_str_to_int(new_hex_id)
+        # 팀 이웃이 한 묶음뿐이면 새로 막히는 영역이 없으므로 탐색 생략 (대부분의 점령)
+        if new_cell not in team_graph or not team_graph.may_enclose(new_cell):
+            return None
+        
         detector = LoopDetector(str(room.id))
-        current_ownerships = room.current_hex_ownerships or {}
-        return detector.detect_loop(team, current_ownerships, new_hex_id)
+        region = detector.region_cells(team_graph, new_hex_id)
+        try:
+            loop_result = await compute_pool.run(
+                detect_loop_in_region, region, new_cell, detector.max_radius, detector.max_interior
+            )
+        except ComputeTimeout:
+            LOOPS.inc(result='timeout')
+            logger.warning(
+                "Loop detection skipped (timeout): room=%s h3_id=%s region=%d",
+                self.room_id,
+                new_hex_id,
+                len(region),
+            )
+            return None
+        LOOPS.inc(result='completed' if loop_result else 'none')
+        return loop_result
     
     async def claim_interior_hexes(self, loop_result, participant, room):
-        """루프 내부 hex 자동 점령"""
+        """
+        루프 내부 hex 자동 점령 (한 번에 처리)
+        게임 구역 필터 1회, 저장 1회(같은 version), 브로드캐스트는 점령된 hex의 compact 집합
+        """
         interior_h3_ids = loop_result.get('interior_h3_ids', [])
-        loop_h3_ids = loop_result.get('loop_h3_ids', [])
-        
         if not interior_h3_ids:
             return
         
-        # 최신 room 객체 가져오기
-        room = await self.get_room()
-        if not room:
-            return
-        
-        # 게임 영역 bounds 가져오기
-        game_area_bounds = room.game_area.bounds if room.game_area else None
-        
         team = participant.team
         user_id = str(participant.user_id)
         
-        # 현재 소유 상태 가져오기 (최신 상태)
-        current_ownerships = room.current_hex_ownerships or {}
-        claimed_count = 0
+        # 이미 점령된 hex는 건너뛰고, 게임 영역 밖 hex는 한 번에 걸러냄
+        current_ownerships = self.room_state.ownerships
+        unowned = [h3_id for h3_id in interior_h3_ids if h3_id not in current_ownerships]
+        to_claim = self.room_state.filter_in_bounds(unowned)
+        if not to_claim:
+            return
         
-        # 내부 hex들을 자동 점령
-        for h3_id in interior_h3_ids:
-            # 이미 점령된 hex는 건너뛰기
-            if h3_id in current_ownerships:
-                continue
-            
-            # 게임 영역 밖 hex는 건너뛰기
-            if not is_h3_in_bounds(h3_id, game_area_bounds):
-                continue
-            
-            current_ownerships[h3_id] = {
-                'team': team,
-                'user_id': user_id,
-                'claimed_at': timezone.now().isoformat(),
-                'claimed_by': 'loop'  # 루프로 인한 자동 점령 표시
-            }
-            claimed_count += 1
+        # 점령 상태 저장 (미점령 hex만 한 번에 insert, 그 사이 점령된 hex는 무시됨)
+        claimed_at = timezone.now()
+        claimed_h3_ids, version = await self.db_claim_unowned_hexes(to_claim, team, user_id, claimed_at)
+        if not claimed_h3_ids:
+            return
+        CLAIMS.inc(len(claimed_h3_ids), source='loop')
         
-        if claimed_count > 0:
-            # 점령 상태 저장
-            await self.save_hex_ownerships(room, current_ownerships)
-            
-            # 루프 완성 이벤트 브로드캐스트
-            await self.channel_layer.group_send(
-                self.group_name,
-                {
-                    'type': 'loop_complete',
-                    'participant_id': self.participant_id,
-                    'team': team,
-                    'loop_h3_ids': loop_h3_ids,
-                    'interior_h3_ids': interior_h3_ids,
-                    'claimed_count': claimed_count,
-                    'timestamp': timezone.now().isoformat()
-                }
+        self.room_state.set_ownerships(claimed_h3_ids, {
+            'team': team,
+            'user_id': user_id,
+            'claimed_at': claimed_at.isoformat(),
+            'version': version,
+            'claimed_by': 'loop'  # 루프로 인한 자동 점령 표시
+        })
+        
+        # 루프 완성 이벤트 브로드캐스트 (고리 hex는 이미 팀 소유라 보내지 않음)
+        await self.group_send(
+            group_event(
+                loop_complete_payload(participant, room.h3_resolution, claimed_h3_ids, version, claimed_at),
+                version=version
             )
+        )
+    
+    # Outgoing messages
+    
+    async def group_send(self, event):
+        """방 그룹 전체에 이벤트 전송 (channel layer 전송 시간 기록)"""
+        with HANDLER_SECONDS.time(step='group_send'):
+            await self.channel_layer.group_send(self.group_name, event)
+    
+    async def send_message(self, payload):
+        """이 클라이언트에게만 보내는 메시지 (연결 프로토콜에 맞춰 직렬화)"""
+        MESSAGES_SENT.inc(type=payload.get('type'))
+        if self.protocol == PROTOCOL_MSGPACK:
+            await self.send(bytes_data=encode_message(payload))
+        else:
+            await self.send(text_data=encode(payload))
+    
+    async def send_event(self, event):
+        """group 이벤트 전달 (보낸 쪽에서 직렬화해 둔 payload를 그대로 전송)"""
+        MESSAGES_SENT.inc(type=event['type'])
+        if self.protocol == PROTOCOL_MSGPACK:
+            await self.send(bytes_data=event_bytes(event))
+        else:
+            await self.send(text_data=event_text(event))
     
     # Event handlers (channel layer callbacks)
     
     async def participant_location(self, event):
         """타 참가자 위치 업데이트 수신 시 클라이언트에 전송"""
-        await self.send(text_data=json.dumps(event))
+        await self.send_event(event)
+    
+    async def participants_snapshot(self, event):
+        """tick 동안 변경된 참가자 위치 묶음 전송"""
+        await self.send_event(event)
     
     async def hex_claimed(self, event):
         """점령 브로드캐스트"""
-        await self.send(text_data=json.dumps(event))
+        self.sync_ownership_version(event)
+        await self.send_event(event)
     
     async def paintball_used(self, event):
         """페인트볼 사용 브로드캐스트"""
-        await self.send(text_data=json.dumps(event))
+        self.sync_ownership_version(event)
+        await self.send_event(event)
     
     async def score_update(self, event):
         """점수 업데이트 브로드캐스트"""
-        await self.send(text_data=json.dumps(event))
+        await self.send_event(event)
     
     async def game_ended(self, event):
         """게임 종료 브로드캐스트"""
-        await self.send(text_data=json.dumps(event))
+        if self.room_state:
+            await self.room_state.location_buffer.flush()
+            self.room_state.invalidate()
+        await self.send_event(event)
     
     async def loop_complete(self, event):
         """루프 완성 브로드캐스트"""
-        await self.send(text_data=json.dumps(event))
+        self.sync_ownership_version(event)
+        await self.send_event(event)
+    
+    async def hexes_claimed(self, event):
+        """트랙 일괄 점령 브로드캐스트"""
+        self.sync_ownership_version(event)
+        await self.send_event(event)
+    
+    def sync_ownership_version(self, event):
+        """
+        방 상태가 반영하지 않은 점령 version이면 점령 상태를 다시 로드하도록 표시 (점령 이벤트마다 호출)
+        (다른 프로세스의 consumer, 방 명령 큐 밖에서 저장하는 REST 업로드의 점령은 이 방 상태에 반영되지 않음)
+        """
+        version = event.get('version')
+        if self.room_state and version and not self.room_state.has_version(version):
+            self.room_state.invalidate_ownerships()
     
     async def room_updated(self, event):
         """방 업데이트 브로드캐스트 (참가자 추가, 게임 시작 등)"""
-        await self.send(text_data=json.dumps(event))
+        if self.room_state:
+            self.room_state.invalidate()
+        await self.send_event(event)
+    
+    async def room_state_changed(self, event):
+        """REST 등에서 방/참가자 상태 변경 시 캐시 무효화 (클라이언트로 전달하지 않음)"""
+        if self.room_state:
+            self.room_state.invalidate()
@@ -0,0 +1,86 @@
+"""
+Group 이벤트 직렬화
+브로드캐스트 payload를 보내는 쪽에서 한 번만 직렬화하여 'text'에 담아 group_send
+받는 consumer들은 json.dumps 없이 그대로 전송 (방 인원 N명이어도 직렬화 1회)
+msgpack 프레임은 compact 클라이언트에게 보낼 때 만들고 프로세스 안에서 이벤트별로 재사용
+(compact 클라이언트가 없는 방은 msgpack 변환 비용이 없음)
+"""
+from collections import OrderedDict
+import json
+import logging
+from django.conf import settings
+from apps.realtime import protocol
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+_orjson_missing_logged = False
+
+# 직렬화된 payload('text') -> compact 프레임 (같은 이벤트를 받는 consumer들이 공유, 이벤트 루프에서만 사용)
+_COMPACT_FRAME_CACHE_SIZE = 256
+_compact_frames = OrderedDict()
+
+
+def _use_orjson():
+    global _orjson_missing_logged
+    if settings.REALTIME_JSON_ENCODER != 'orjson':
+        return False
+    if orjson is None:
+        if not _orjson_missing_logged:
+            logger.warning("REALTIME_JSON_ENCODER=orjson but orjson is not installed, falling back to json")
+            _orjson_missing_logged = True
+        return False
+    return True
+
+
+def encode(payload) -> str:
+    """클라이언트로 보낼 JSON 문자열 (REALTIME_JSON_ENCODER 설정에 따라 json 또는 orjson)"""
+    if _use_orjson():
+        # orjson은 bytes 반환 - WebSocket text frame으로 보내기 위해 str 변환
+        return orjson.dumps(payload, default=str).decode()
+    return json.dumps(payload)
+
+
+def group_event(payload, **meta) -> dict:
+    """
+    직렬화된 payload를 담은 group 이벤트
+
+    Args:
+        payload: 클라이언트로 보낼 메시지 (payload['type']이 consumer 핸들러 이름)
+        meta: consumer 핸들러가 읽는 값 (클라이언트로는 전송되지 않음)
+
+    Returns:
+        {'type': 핸들러 이름, 'text': 직렬화된 payload, **meta}
+    """
+    return {**meta, 'type': payload['type'], 'text': encode(payload)}
+
+
+def event_text(event) -> str:
+    """group 이벤트에서 클라이언트로 보낼 문자열 (직렬화되지 않은 이전 형식 이벤트도 지원)"""
+    text = event.get('text')
+    if text is None:
+        text = encode(event)
+    return text
+
+
+def event_bytes(event) -> bytes:
+    """group 이벤트에서 compact 프로토콜 클라이언트로 보낼 프레임 (같은 이벤트는 프로세스당 한 번만 변환)"""
+    data = event.get('bytes')
+    if data is not None:
+        return data
+    text = event.get('text')
+    if text is None:
+        return protocol.encode_message(event)
+
+    data = _compact_frames.get(text)
+    if data is None:
+        data = protocol.encode_message(json.loads(text))
+        _compact_frames[text] = data
+        if len(_compact_frames) > _COMPACT_FRAME_CACHE_SIZE:
+            _compact_frames.popitem(last=False)
+    return data
@@ -0,0 +1,103 @@
+"""
+참가자 위치 브로드캐스트 묶음 전송
+GPS tick마다 group_send 하지 않고 방 단위로 변경된 위치를 모아 주기적으로 한 번에 전송
+(N명 × 1Hz 기준 초당 N² 프레임 → tick마다 N 프레임)
+"""
+import asyncio
+import logging
+from django.conf import settings
+from django.utils import timezone
+from channels.layers import get_channel_layer
+from apps.realtime.events import group_event
+from apps.realtime.metrics import HANDLER_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class LocationBroadcaster:
+    """
+    방 하나의 위치 브로드캐스터
+    - add(): 참가자별 최신 위치로 덮어씀 (전송 없음)
+    - interval_ms마다 변경된 위치를 participants_snapshot 이벤트 하나로 전송
+    - interval_ms가 0이면 add() 때마다 바로 participant_location 이벤트 전송 (기존 방식)
+    """
+
+    def __init__(self, room_id, interval_ms=None):
+        self.room_id = str(room_id)
+        self.group_name = f'room_{self.room_id}'
+        if interval_ms is None:
+            interval_ms = settings.LOCATION_BROADCAST_INTERVAL_MS
+        self.interval_ms = interval_ms
+        self._pending = {}  # participant_id -> location dict
+        self._task = None
+
+    async def add(self, participant_id, location):
+        """
+        참가자 위치 전송 예약
+
+        Args:
+            location: {participant_id, user_id, team, lat, lng, h3_id, timestamp}
+        """
+        if self.interval_ms <= 0:
+            await self._send({'type': 'participant_location', **location})
+            return
+
+        self._pending[participant_id] = location
+        if self._task is None:
+            self._task = asyncio.create_task(self._broadcast_periodically())
+
+    async def flush(self):
+        """쌓인 위치를 participants_snapshot 하나로 전송, 반환값: 전송한 참가자 수"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        await self._send({
+            'type': 'participants_snapshot',
+            'participants': list(pending.values()),
+            'timestamp': timezone.now().isoformat()
+        })
+        return len(pending)
+
+    async def close(self):
+        """
+        주기 전송 중단 후 남은 위치를 한 번 전송
+        (이 프로세스의 마지막 연결이 끊겨도 다른 프로세스에 연결된 group 멤버는 마지막 위치를 받아야 함)
+        """
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(
+                "Location broadcast failed on close: room=%s error=%s",
+                self.room_id,
+                e,
+                exc_info=True,
+            )
+
+    async def _broadcast_periodically(self):
+        try:
+            while True:
+                await asyncio.sleep(self.interval_ms / 1000)
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(
+                        "Location broadcast failed: room=%s error=%s",
+                        self.room_id,
+                        e,
+                        exc_info=True,
+                    )
+        except asyncio.CancelledError:
+            pass
+
+    async def _send(self, payload):
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            with HANDLER_SECONDS.time(step='group_send'):
+                await channel_layer.group_send(self.group_name, group_event(payload))
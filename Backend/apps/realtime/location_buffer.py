@@ -0,0 +1,103 @@
+"""
+Participant 위치 write-behind 버퍼
+GPS tick마다 UPDATE 하지 않고 참가자별 최신 위치만 모아 주기적으로 한 번에 저장
+"""
+import asyncio
+import logging
+from django.conf import settings
+from apps.rooms.models import Participant
+
+logger = logging.getLogger(__name__)
+
+LOCATION_FIELDS = ['last_lat', 'last_lng', 'last_h3_id', 'last_location_at']
+
+
+class LocationWriteBuffer:
+    """
+    방 하나의 위치 저장 버퍼
+    - add(): 참가자별 최신 위치로 덮어씀 (DB 접근 없음)
+    - flush(): 쌓인 위치를 bulk_update 한 번으로 저장
+    - flush_interval 초마다 자동 flush, 0이면 add() 때마다 바로 저장
+    """
+
+    def __init__(self, room_id, flush_interval=None):
+        self.room_id = str(room_id)
+        if flush_interval is None:
+            flush_interval = settings.LOCATION_FLUSH_INTERVAL_SEC
+        self.flush_interval = flush_interval
+        self._pending = {}  # participant_id -> (lat, lng, h3_id, timestamp)
+        self._task = None
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    async def add(self, participant_id, lat, lng, h3_id, timestamp):
+        """참가자의 최신 위치 기록 (이전에 쌓인 값은 버림)"""
+        self._pending[participant_id] = (lat, lng, h3_id, timestamp)
+
+        if self.flush_interval <= 0:
+            await self.flush(participant_id)
+        elif self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def flush(self, participant_id=None):
+        """
+        쌓인 위치 저장
+        participant_id가 주어지면 해당 참가자만 저장
+        반환값: 저장한 참가자 수
+        """
+        if participant_id is not None:
+            if participant_id not in self._pending:
+                return 0
+            pending = {participant_id: self._pending.pop(participant_id)}
+        else:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        try:
+            await self._write(pending)
+        except Exception as e:
+            logger.error(
+                "Location flush failed: room=%s participants=%d error=%s",
+                self.room_id,
+                len(pending),
+                e,
+                exc_info=True,
+            )
+            # 실패한 값은 다음 flush에서 다시 시도 (그 사이 들어온 최신 값이 우선)
+            for key, value in pending.items():
+                self._pending.setdefault(key, value)
+            return 0
+
+        logger.debug("Location flush: room=%s participants=%d", self.room_id, len(pending))
+        return len(pending)
+
+    async def close(self):
+        """주기 flush 중단 후 남은 위치 저장"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _flush_periodically(self):
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    async def _write(self, pending):
+        participants = []
+        for participant_id, (lat, lng, h3_id, timestamp) in pending.items():
+            participants.append(Participant(
+                id=participant_id,
+                last_lat=lat,
+                last_lng=lng,
+                last_h3_id=h3_id,
+                last_location_at=timestamp,
+            ))
+        await Participant.objects.abulk_update(participants, LOCATION_FIELDS)
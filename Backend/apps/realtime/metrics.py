@@ -0,0 +1,243 @@
+"""
+Realtime metrics
+consumer hot path의 지연시간/처리량을 프로세스 메모리에 모아 Prometheus text format으로 노출 (/metrics)
+- 외부 의존성 없음 (prometheus_client 미사용)
+- 값은 ASGI 프로세스마다 따로 집계됨 (여러 프로세스면 프로세스별로 scrape)
+- REALTIME_METRICS_ENABLED=False 이면 기록하지 않음
+"""
+import abc
+import functools
+import threading
+import time
+from django.conf import settings
+
+# 초 단위 (GPS tick 처리 ~ 루프 탐색 timeout 범위)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(abc.ABC):
+    """label 값 조합마다 값을 따로 보관 (labels는 키워드 인자로 전달)"""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self):
+        """(suffix, label values, extra labels, value) 목록"""
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type_name}',
+        ]
+        for suffix, values, extra, value in self.samples():
+            labels = _format_labels(self.labelnames, values, extra)
+            lines.append(f'{self.name}{suffix}{labels} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not settings.REALTIME_METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [('_total', key, (), value) for key, value in items]
+
+
+class Gauge(Metric):
+    """
+    scrape 시점에 collect()로 값을 읽는 gauge
+    collect: () -> [(label 값 tuple, value), ...]
+    """
+
+    type_name = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def samples(self):
+        return [('', key, (), value) for key, value in self.collect()]
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        if not settings.REALTIME_METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [bucket별 개수..., 합계]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        samples = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                samples.append(('_bucket', key, (('le', _format_value(bound)),), cumulative))
+            samples.append(('_sum', key, (), state[-1]))
+            samples.append(('_count', key, (), cumulative))
+        return samples
+
+    def time(self, **labels):
+        """with 블록 실행 시간 기록"""
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+def _room_connections():
+    from apps.realtime.room_state import room_states
+    return [((room_id,), count) for room_id, count in room_states.connection_counts().items()]
+
+
+def _room_command_depths():
+    from apps.realtime.room_state import room_states
+    return [((room_id,), depth) for room_id, depth in room_states.command_queue_depths().items()]
+
+
+def _compute_depth():
+    from apps.hexmap.compute import compute_pool
+    return [((), compute_pool.depth)]
+
+
+HANDLER_SECONDS = Histogram(
+    'realtime_handler_seconds',
+    'Time spent in consumer hot path steps',
+    ('step',),
+)
+CLAIMS = Counter(
+    'realtime_claims',
+    'Hexes claimed',
+    ('source',),  # gps, track, loop
+)
+CLAIM_REJECTIONS = Counter(
+    'realtime_claim_rejections',
+    'Claim candidates that did not change ownership',
+    ('reason',),  # out_of_bounds, same_hex, same_team, conflict
+)
+LOOPS = Counter(
+    'realtime_loops',
+    'Loop detections that reached the flood fill',
+    ('result',),  # completed, none, timeout
+)
+MESSAGES_RECEIVED = Counter(
+    'realtime_messages_received',
+    'WebSocket messages received from clients',
+    ('type',),
+)
+MESSAGES_SENT = Counter(
+    'realtime_messages_sent',
+    'WebSocket messages sent to clients',
+    ('type',),
+)
+ROOM_CONNECTIONS = Gauge(
+    'realtime_room_connections',
+    'Connected WebSocket consumers per room',
+    ('room_id',),
+    collect=_room_connections,
+)
+ROOM_COMMAND_QUEUE_DEPTH = Gauge(
+    'realtime_room_command_queue_depth',
+    'Commands waiting in the room command queue',
+    ('room_id',),
+    collect=_room_command_depths,
+)
+COMPUTE_QUEUE_DEPTH = Gauge(
+    'hexmap_compute_queue_depth',
+    'Submitted but unfinished compute pool tasks',
+    collect=_compute_depth,
+)
+
+REGISTRY = (
+    HANDLER_SECONDS,
+    CLAIMS,
+    CLAIM_REJECTIONS,
+    LOOPS,
+    MESSAGES_RECEIVED,
+    MESSAGES_SENT,
+    ROOM_CONNECTIONS,
+    ROOM_COMMAND_QUEUE_DEPTH,
+    COMPUTE_QUEUE_DEPTH,
+)
+
+
+def timed(step):
+    """async 함수 실행 시간을 realtime_handler_seconds{step=...}에 기록하는 decorator"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                HANDLER_SECONDS.observe(time.perf_counter() - started, step=step)
+        return wrapper
+    return decorator
+
+
+def render():
+    """Prometheus text exposition format"""
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
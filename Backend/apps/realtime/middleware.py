@@ -5,16 +5,12 @@ import urllib.parse
 import jwt
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from channels.db import database_sync_to_async
-from apps.accounts.models import User
+from apps.realtime.user_cache import user_cache
 
 
-@database_sync_to_async
-def _get_user(user_id):
-    try:
-        return User.objects.get(id=user_id)
-    except User.DoesNotExist:
-        return AnonymousUser()
+async def _get_user(user_id, jti=None):
+    user = await user_cache.get(user_id, jti)
+    return user if user is not None else AnonymousUser()
 
 
 class JWTAuthMiddleware:
@@ -46,7 +42,7 @@ class JWTAuthMiddleware:
         if not user_id:
             return AnonymousUser()
 
-        return await _get_user(user_id)
+        return await _get_user(user_id, payload.get("jti"))
 
     def _get_token_from_scope(self, scope):
         raw_query = scope.get("query_string", b"")
@@ -0,0 +1,147 @@
+"""
+Compact WebSocket protocol (MessagePack)
+연결 시 subprotocol 또는 ?protocol=msgpack 으로 선택, 기본은 JSON (REALTIME_COMPACT_PROTOCOL=False면 항상 JSON)
+
+메시지는 [type code, field...] 배열 (필드 이름 없이 순서로 구분)
+- H3 id: 64-bit 정수
+- timestamp: epoch milliseconds
+- 표에 없는 서버 메시지 (room_updated, error 등): [0, JSON과 같은 map]
+"""
+from datetime import datetime
+from urllib.parse import parse_qs
+import msgpack
+from django.conf import settings
+from apps.hexmap.h3_utils import h3_str_to_int, h3_int_to_str
+
+PROTOCOL_JSON = 'json'
+PROTOCOL_MSGPACK = 'msgpack'
+SUBPROTOCOL_MSGPACK = 'running.msgpack.v1'
+
+GENERIC_CODE = 0
+
+
+class ProtocolError(ValueError):
+    """형식이 맞지 않는 compact 프레임"""
+
+# 클라이언트 → 서버: code -> (type, fields)
+CLIENT_MESSAGES = {
+    1: ('location_update', ('lat', 'lng', 'accuracy', 'speed')),
+    2: ('paintball', ('target_h3_id', 'paintball_type')),
+    3: ('exchange_paintball', ()),
+    4: ('start_recording', ()),
+    5: ('stop_recording', ()),
+    6: ('sync_ownerships', ('since_version',)),
+    7: ('location_batch', ('points',)),  # points: [[lat, lng, timestamp(ms)], ...]
+}
+
+# 서버 → 클라이언트: type -> (code, fields)
+SERVER_MESSAGES = {
+    'participant_location': (10, ('participant_id', 'user_id', 'team', 'lat', 'lng', 'h3_id', 'timestamp')),
+    'participants_snapshot': (11, ('participants', 'timestamp')),
+    'hex_claimed': (12, ('participant_id', 'team', 'h3_id', 'timestamp', 'version')),
+    'paintball_used': (13, ('participant_id', 'team', 'paintball_type', 'target_h3_id', 'timestamp', 'version')),
+    'score_update': (14, ('team_a_count', 'team_b_count', 'timestamp')),
+    'loop_complete': (15, ('participant_id', 'team', 'h3_resolution', 'claimed_cells', 'claimed_count', 'timestamp', 'version')),
+    'ownership_delta': (16, ('since_version', 'version', 'changes')),
+    'ownership_snapshot': (17, ('version', 'teams')),
+    'hexes_claimed': (18, ('participant_id', 'team', 'h3_ids', 'timestamp', 'version')),
+}
+
+H3_FIELDS = {'h3_id', 'target_h3_id'}
+H3_LIST_FIELDS = {'claimed_cells', 'h3_ids'}
+TIMESTAMP_FIELDS = {'timestamp'}
+
+
+def negotiate_protocol(scope):
+    """
+    연결 scope에서 프로토콜 선택
+
+    Returns:
+        (protocol, subprotocol) - subprotocol은 accept()에 그대로 전달 (요청하지 않았으면 None)
+    """
+    if not settings.REALTIME_COMPACT_PROTOCOL:
+        return PROTOCOL_JSON, None
+    if SUBPROTOCOL_MSGPACK in scope.get('subprotocols', []):
+        return PROTOCOL_MSGPACK, SUBPROTOCOL_MSGPACK
+    query = parse_qs(scope.get('query_string', b'').decode())
+    if query.get('protocol', [None])[0] == PROTOCOL_MSGPACK:
+        return PROTOCOL_MSGPACK, None
+    return PROTOCOL_JSON, None
+
+
+def _timestamp_ms(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(value.timestamp() * 1000)
+
+
+def _compact_value(field, value):
+    if value is None:
+        return None
+    if field in H3_FIELDS:
+        return h3_str_to_int(value)
+    if field in H3_LIST_FIELDS:
+        return [h3_str_to_int(h3_id) for h3_id in value]
+    if field in TIMESTAMP_FIELDS:
+        return _timestamp_ms(value)
+    if field == 'changes':
+        return [[h3_str_to_int(h3_id), team, user_id] for h3_id, team, user_id in value]
+    if field == 'teams':
+        return {team: [h3_str_to_int(h3_id) for h3_id in h3_ids] for team, h3_ids in value.items()}
+    if field == 'participants':
+        fields = SERVER_MESSAGES['participant_location'][1]
+        return [_compact_fields(location, fields) for location in value]
+    return value
+
+
+def _compact_fields(payload, fields):
+    return [_compact_value(field, payload.get(field)) for field in fields]
+
+
+def encode_message(payload) -> bytes:
+    """
+    서버 메시지를 compact 프레임으로 변환
+
+    Args:
+        payload: JSON 프로토콜과 같은 메시지 dict ('type' 포함)
+    """
+    schema = SERVER_MESSAGES.get(payload.get('type'))
+    if schema is None:
+        frame = [GENERIC_CODE, payload]
+    else:
+        code, fields = schema
+        frame = [code, *_compact_fields(payload, fields)]
+    return msgpack.packb(frame, default=str)
+
+
+def decode_message(data: bytes) -> dict:
+    """
+    클라이언트 compact 프레임을 JSON 프로토콜과 같은 dict로 변환
+
+    Raises:
+        ProtocolError: 형식이 맞지 않는 프레임
+    """
+    try:
+        frame = msgpack.unpackb(data)
+    except Exception as e:
+        raise ProtocolError(f'Invalid msgpack frame: {e}') from e
+    if not isinstance(frame, (list, tuple)) or not frame:
+        raise ProtocolError('Frame must be a non-empty array')
+
+    code, values = frame[0], frame[1:]
+    if code == GENERIC_CODE:
+        if len(values) != 1 or not isinstance(values[0], dict):
+            raise ProtocolError('Generic frame must carry one map')
+        return values[0]
+    if code not in CLIENT_MESSAGES:
+        raise ProtocolError(f'Unknown message code: {code}')
+
+    message_type, fields = CLIENT_MESSAGES[code]
+    data = {'type': message_type}
+    for field, value in zip(fields, values):
+        if value is None:
+            continue
+        if field in H3_FIELDS and isinstance(value, int):
+            value = h3_int_to_str(value)
+        data[field] = value
+    return data
@@ -0,0 +1,69 @@
+"""
+방 단위 점령 명령 큐 (actor)
+점령/페인트볼/루프 채우기를 방마다 하나의 asyncio task가 도착 순서대로 실행
+같은 방의 consumer들이 인메모리 점령 상태를 동시에 읽고 고쳐 쓰지 않음 (DB CAS 충돌/재시도 감소)
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RoomCommandQueue:
+    """
+    방 하나의 명령 큐
+    - run(): 명령(코루틴 함수)을 큐에 넣고 실행 결과를 기다림
+    - 명령은 한 번에 하나씩 실행되므로 명령 안에서 다시 run()을 기다리면 안 됨 (교착)
+    """
+
+    def __init__(self, room_id):
+        self.room_id = str(room_id)
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    @property
+    def depth(self):
+        """실행을 기다리는 명령 수"""
+        return self._queue.qsize()
+
+    async def run(self, command, *args):
+        """
+        Args:
+            command: async 함수 (방 상태를 읽고 바꾸는 처리)
+
+        Returns:
+            command의 반환값 (예외도 그대로 전달)
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((command, args, future))
+        if self._task is None:
+            self._task = asyncio.create_task(self._process())
+        return await future
+
+    async def close(self):
+        """실행 task 중단, 남은 명령은 취소"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def _process(self):
+        while True:
+            command, args, future = await self._queue.get()
+            if future.cancelled():
+                # 기다리던 consumer가 이미 끊김
+                continue
+            try:
+                result = await command(*args)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,391 @@
+"""
+Room state engine - MVP 버전
+방(Room) 단위 게임 상태를 메모리에 유지하여 GPS tick마다 DB를 조회하지 않도록 함
+"""
+import asyncio
+from collections import Counter, deque
+import logging
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from apps.rooms.models import Room, Participant
+from apps.rooms.ownership import create_ownership_store
+from apps.hexmap.team_graph import TeamGraph
+from apps.hexmap.h3_utils import h3_str_to_int
+from apps.hexmap.bounds import get_area_bounds
+from apps.hexmap.area_cells import get_area_cells
+from apps.realtime.location_buffer import LocationWriteBuffer
+from apps.realtime.location_broadcaster import LocationBroadcaster
+from apps.realtime.room_commands import RoomCommandQueue
+
+logger = logging.getLogger(__name__)
+
+
+class RoomState:
+    """
+    방 하나의 인메모리 게임 상태
+    - Room(+GameArea), 모든 Participant를 쿼리 한 번으로 로드해 consumer들이 공유
+    - hex 점령 상태는 점령/동기화가 처음 필요할 때 로드 (연결만 하는 경우 조회하지 않음)
+    - 방/참가자가 외부(REST, Celery)에서 바뀌면 invalidate() → 다음 접근 시 다시 로드
+    - 재연결 클라이언트의 since_version 이후 변경분은 점령 저장소에서 조회 (프로세스/재시작과 무관)
+    - 최근 점령 변경 version 로그로 이 상태가 모르는 점령(다른 프로세스, REST)을 감지 → 다시 로드
+    """
+
+    def __init__(self, room_id):
+        self.room_id = str(room_id)
+        self.room = None
+        self.participants = {}  # user_id(str) -> Participant
+        self.ownerships = {}  # h3_id -> {team, user_id, claimed_at, version}
+        self.ownership_version = 0  # 이 상태에 반영된 마지막 방 ownership_version
+        self.ownership_changes = deque()  # 이 상태에 반영한 점령 version 로그
+        self.changelog_floor = 0  # 이 버전 이후의 변경은 모두 로그에 있음
+        self.team_hex_counts = {'A': 0, 'B': 0}
+        self.team_graphs = {'A': TeamGraph(), 'B': TeamGraph()}  # 루프 감지용 팀별 인접 그래프
+        self.area_cells = None  # 게임 구역 안의 cell 집합 (미리 계산 불가하면 None)
+        self.ownership_store = create_ownership_store(self.room_id)
+        self.is_stale = True
+        self.ownerships_stale = True
+        self.location_buffer = LocationWriteBuffer(self.room_id)
+        self.location_broadcaster = LocationBroadcaster(self.room_id)
+        self.commands = RoomCommandQueue(self.room_id)  # 점령/페인트볼/루프 채우기 순서 보장
+        self._load_lock = asyncio.Lock()
+        self._ownership_load_lock = asyncio.Lock()
+
+    @property
+    def status(self):
+        return self.room.status if self.room else None
+
+    @property
+    def game_area(self):
+        return self.room.game_area if self.room else None
+
+    @property
+    def game_area_bounds(self):
+        """게임 구역 경계 (없으면 None)"""
+        return self.game_area.bounds if self.game_area else None
+
+    @property
+    def h3_resolution(self):
+        return self.room.h3_resolution
+
+    @property
+    def area_bounds(self):
+        """게임 구역의 캐시된 prepared 경계 (경계가 없으면 None)"""
+        return get_area_bounds(self.game_area)
+
+    def is_h3_in_bounds(self, h3_id):
+        """hex 중심이 게임 구역 안인지 (경계가 없으면 모두 허용)"""
+        if self.area_cells is not None:
+            return h3_id in self.area_cells
+        area_bounds = self.area_bounds
+        return area_bounds is None or area_bounds.contains_h3(h3_id)
+
+    def filter_in_bounds(self, h3_ids):
+        """게임 구역 안의 hex만 남김 (여러 hex를 한 번에 검사)"""
+        if self.area_cells is not None:
+            return self.area_cells.filter_h3(h3_ids)
+        area_bounds = self.area_bounds
+        if area_bounds is None:
+            return list(h3_ids)
+        return area_bounds.filter_h3(h3_ids)
+
+    def get_participant(self, user_id):
+        if user_id is None:
+            return None
+        return self.participants.get(str(user_id))
+
+    async def load_participant(self, user_id):
+        """
+        로드 이후 방에 참가한 사용자의 Participant만 조회하여 추가 (쿼리 1회)
+        반환값: Participant, 참가자가 아니면 None
+        """
+        participant = await self._fetch_participant(user_id)
+        if participant:
+            participant.room = self.room
+            self.participants[str(participant.user_id)] = participant
+        return participant
+
+    async def _fetch_participant(self, user_id):
+        return await Participant.objects.select_related('user').filter(
+            room_id=self.room_id, user_id=user_id
+        ).afirst()
+
+    def set_ownership(self, h3_id, ownership):
+        """
+        hex 점령 상태 변경 반영 (ownership이 None이면 제거)
+        팀/참가자 점령 수와 팀 인접 그래프도 함께 갱신 (DB 집계와 같은 규칙)
+        """
+        previous = self.ownerships.get(h3_id)
+        if previous:
+            self._adjust_counts(previous, -1, h3_id)
+        if ownership:
+            self.ownerships[h3_id] = ownership
+            self._adjust_counts(ownership, 1, h3_id)
+        else:
+            self.ownerships.pop(h3_id, None)
+
+        version = ownership.get('version') if ownership else None
+        if version and (previous is None or previous.get('version') != version):
+            self._record_change(version)
+
+    def set_ownerships(self, h3_ids, ownership):
+        """여러 hex를 같은 점령 상태로 반영 (루프 채우기/트랙 일괄 점령 - 한 번 저장된 같은 version)"""
+        for h3_id in h3_ids:
+            self.set_ownership(h3_id, dict(ownership))
+
+    def _record_change(self, version):
+        """변경 로그에 추가 (같은 version은 한 번만, 가득 차면 가장 오래된 항목을 버리고 floor를 올림)"""
+        if self.ownership_changes and self.ownership_changes[-1] == version:
+            return
+        if len(self.ownership_changes) >= settings.OWNERSHIP_CHANGELOG_SIZE:
+            evicted_version = self.ownership_changes.popleft()
+            self.changelog_floor = max(self.changelog_floor, evicted_version)
+        self.ownership_changes.append(version)
+        self.ownership_version = max(self.ownership_version, version)
+
+    async def changes_since(self, since_version):
+        """
+        since_version 이후 바뀐 hex의 현재 상태 (점령 저장소 기준)
+        저장소 version이 이 상태보다 앞서 있으면 점령 상태를 다시 로드하도록 표시
+
+        Returns:
+            (저장소 ownership version, [[h3_id, team, user_id], ...] - 점령이 없어진 hex는 team/user_id가 None)
+            변경분으로 알 수 없는 버전이면 변경 목록 대신 None (전체 스냅샷으로 대체)
+        """
+        if since_version is None:
+            return self.ownership_version, None
+        version, changes = await self._load_changes(since_version)
+        if version > self.ownership_version:
+            self.invalidate_ownerships()
+        return version, changes
+
+    def ownership_snapshot(self):
+        """전체 점령 상태를 팀별 h3_id 목록으로 압축 {team: [h3_id, ...]}"""
+        teams = {team: [] for team in self.team_hex_counts}
+        for h3_id, ownership in self.ownerships.items():
+            teams.setdefault(ownership.get('team'), []).append(h3_id)
+        return teams
+
+    def _adjust_counts(self, ownership, delta, h3_id):
+        team = ownership.get('team')
+        if team in self.team_hex_counts:
+            self.team_hex_counts[team] += delta
+            graph = self.team_graphs[team]
+            if delta > 0:
+                graph.add(h3_str_to_int(h3_id))
+            else:
+                graph.remove(h3_str_to_int(h3_id))
+        participant = self.get_participant(ownership.get('user_id'))
+        if participant:
+            participant.hexes_claimed += delta
+
+    def invalidate(self):
+        """다음 접근 시 DB에서 다시 로드하도록 표시"""
+        self.is_stale = True
+
+    def invalidate_ownerships(self):
+        """다음 점령 처리 전에 점령 상태만 DB에서 다시 로드하도록 표시"""
+        self.ownerships_stale = True
+
+    def has_version(self, version):
+        """이 점령 version의 변경이 방 상태에 반영되어 있는지 (로드 시점 이전이거나 변경 로그에 있음)"""
+        if self.ownerships_stale or version <= self.changelog_floor:
+            return True
+        for logged_version in reversed(self.ownership_changes):
+            if logged_version == version:
+                return True
+            if logged_version < version:
+                break
+        return False
+
+    async def ensure_loaded(self):
+        """
+        상태가 없거나 무효화된 경우에만 DB에서 로드
+        반환값: 방이 존재하면 True
+        """
+        if not self.is_stale:
+            return self.room is not None
+
+        async with self._load_lock:
+            # 대기하는 동안 다른 consumer가 이미 로드했을 수 있음
+            if self.is_stale:
+                # 버퍼에 남은 위치를 먼저 저장해야 다시 로드한 값이 최신
+                await self.location_buffer.flush()
+                room, participants, area_cells, counts = await self._load()
+                self.room = room
+                self.area_cells = area_cells
+                self.participants = {str(p.user_id): p for p in participants}
+                # 이 상태가 모르는 점령 변경(다른 프로세스 등)이 있었을 때만 점령 상태를 다시 로드
+                loaded_version, team_hex_counts = counts
+                if loaded_version != self.ownership_version:
+                    self.ownerships_stale = True
+                if room:
+                    self.team_hex_counts = team_hex_counts
+                self.is_stale = False
+                logger.debug(
+                    "Room state loaded: room=%s participants=%d",
+                    self.room_id,
+                    len(self.participants),
+                )
+        return self.room is not None
+
+    async def ensure_ownerships_loaded(self):
+        """점령 상태가 필요한 처리(점령, 페인트볼, 동기화) 전에 호출 - 없거나 오래된 경우에만 로드"""
+        if not self.ownerships_stale:
+            return
+
+        async with self._ownership_load_lock:
+            if not self.ownerships_stale:
+                return
+            ownerships, room_version = await self._load_ownerships()
+            self.ownerships = ownerships
+            self.team_graphs = {
+                team: TeamGraph(
+                    h3_str_to_int(h3_id) for h3_id, ownership in ownerships.items()
+                    if ownership.get('team') == team
+                )
+                for team in self.team_graphs
+            }
+            # 점수/참가자 점령 수도 로드한 점령 상태 기준으로 (놓친 변경이 있었으면 메모리 집계가 틀림)
+            team_counts = Counter(ownership.get('team') for ownership in ownerships.values())
+            self.team_hex_counts = {team: team_counts[team] for team in self.team_hex_counts}
+            user_counts = Counter(ownership.get('user_id') for ownership in ownerships.values())
+            for user_id, participant in self.participants.items():
+                participant.hexes_claimed = user_counts[user_id]
+            # 다시 로드한 상태 이전의 변경은 로그로 알 수 없음 → 로그를 비우고 현재 버전부터 다시 기록
+            self.ownership_version = room_version
+            self.ownership_changes.clear()
+            self.changelog_floor = room_version
+            self.ownerships_stale = False
+            logger.debug(
+                "Room ownerships loaded: room=%s hexes=%d version=%d",
+                self.room_id,
+                len(self.ownerships),
+                room_version,
+            )
+
+    async def close(self):
+        """방의 마지막 연결이 끊길 때 호출: 남은 쓰기 작업 정리"""
+        await self.commands.close()
+        await self.location_broadcaster.close()
+        await self.location_buffer.close()
+
+    @database_sync_to_async
+    def _load(self):
+        # 참가자 + 방 + 게임 구역 + 사용자를 쿼리 한 번으로 로드 (비동기 컨텍스트에서 lazy loading 방지)
+        participants = list(
+            Participant.objects.select_related('room__game_area', 'user').filter(room_id=self.room_id)
+        )
+        if participants:
+            room = participants[0].room
+            for participant in participants:
+                participant.room = room  # 모든 참가자가 같은 Room 객체를 공유
+        else:
+            try:
+                room = Room.objects.select_related('game_area').get(id=self.room_id)
+            except Room.DoesNotExist:
+                return None, [], None, (0, {})
+        # 게임 구역 cell 집합 (메모리/Redis 캐시, 없으면 polyfill)
+        area_cells = get_area_cells(room.game_area)
+        # 점령 버전/팀 집계는 저장소 기준 (Redis 저장소는 게임 중 Room 집계 필드를 갱신하지 않음)
+        return room, participants, area_cells, self.ownership_store.counts(room)
+
+    @database_sync_to_async
+    def _load_changes(self, since_version):
+        return self.ownership_store.changes_since(since_version, settings.OWNERSHIP_DELTA_MAX_HEXES)
+
+    @database_sync_to_async
+    def _load_ownerships(self):
+        """
+        Returns:
+            (점령 상태, 점령 상태에 반영된 방 ownership_version)
+        """
+        ownerships = self.ownership_store.load()
+        room_version = self.ownership_store.counts(self.room)[0] if self.room else 0
+        # 방을 로드한 뒤 바뀐 hex가 있으면 그 버전까지 반영된 것
+        room_version = max(
+            [room_version] + [ownership.get('version', 0) for ownership in ownerships.values()]
+        )
+        return ownerships, room_version
+
+
+class RoomStateRegistry:
+    """
+    프로세스 내 RoomState 저장소
+    - 방에 연결된 consumer가 있는 동안만 상태를 유지
+    """
+
+    def __init__(self):
+        self._states = {}
+        self._connections = {}
+
+    def get(self, room_id):
+        return self._states.get(str(room_id))
+
+    async def acquire(self, room_id):
+        """
+        consumer 연결 시 호출: 상태를 로드(또는 재사용)하고 연결 수 증가
+        방이 없으면 None
+        """
+        room_id = str(room_id)
+        state = self._states.get(room_id)
+        if state is None:
+            state = RoomState(room_id)
+            self._states[room_id] = state
+        self._connections[room_id] = self._connections.get(room_id, 0) + 1
+
+        try:
+            exists = await state.ensure_loaded()
+        except Exception:
+            await self.release(room_id)
+            raise
+
+        if not exists:
+            await self.release(room_id)
+            return None
+        return state
+
+    async def release(self, room_id):
+        """consumer 연결 종료 시 호출: 마지막 연결이면 남은 쓰기를 저장하고 상태 제거"""
+        room_id = str(room_id)
+        remaining = self._connections.get(room_id, 0) - 1
+        if remaining > 0:
+            self._connections[room_id] = remaining
+            return
+        self._connections.pop(room_id, None)
+        state = self._states.pop(room_id, None)
+        if state:
+            await state.close()
+
+    def invalidate(self, room_id):
+        state = self._states.get(str(room_id))
+        if state:
+            state.invalidate()
+
+    def connection_counts(self):
+        """방별 연결된 consumer 수 (metrics)"""
+        return dict(self._connections)
+
+    def command_queue_depths(self):
+        """방별 실행을 기다리는 점령 명령 수 (metrics)"""
+        return {room_id: state.commands.depth for room_id, state in list(self._states.items())}
+
+
+room_states = RoomStateRegistry()
+
+
+def notify_room_state_changed(room_id):
+    """
+    WebSocket 밖(REST 등)에서 방/참가자 상태를 바꾼 경우 호출
+    방 그룹의 consumer들이 캐시된 상태를 무효화함 (클라이언트로는 전달되지 않음)
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer:
+        async_to_sync(channel_layer.group_send)(
+            f'room_{room_id}',
+            {
+                'type': 'room_state_changed',
+                'room_id': str(room_id),
+            }
+        )
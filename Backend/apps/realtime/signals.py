@@ -0,0 +1,18 @@
+"""
+Realtime signals
+사용자 정보 수정/삭제 시 WebSocket 인증 사용자 캐시 제거
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.accounts.models import User
+from .user_cache import user_cache
+
+
+@receiver(post_save, sender=User)
+def invalidate_ws_user_on_save(sender, instance, **kwargs):
+    user_cache.invalidate(instance.id)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_ws_user_on_delete(sender, instance, **kwargs):
+    user_cache.invalidate(instance.id)
@@ -0,0 +1,172 @@
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.accounts.models import User
+from apps.realtime.events import group_event
+from apps.realtime.middleware import JWTAuthMiddlewareStack
+from apps.realtime.room_state import room_states
+from apps.realtime.routing import websocket_urlpatterns
+from apps.rooms.models import Participant
+from apps.rooms.ownership import HexOwnershipStore
+from apps.rooms.tests.factories import ORIGIN_H3, RING_H3, create_game
+
+application = JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+
+
+def access_token(user):
+    return str(RefreshToken.for_user(user).access_token)
+
+
+async def receive_all(communicator, timeout=0.2):
+    """더 이상 오지 않을 때까지 받은 JSON 메시지 목록"""
+    messages = []
+    while not await communicator.receive_nothing(timeout=timeout):
+        output = await communicator.receive_output()
+        if output['type'] == 'websocket.send':
+            messages.append(json.loads(output['text']))
+    return messages
+
+
+def types(messages):
+    return [message['type'] for message in messages]
+
+
+class RoomConsumerTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.room, self.participants = create_game(is_recording=True, paintball_count=3)
+
+    def communicator(self, user=None, query=''):
+        path = f'/ws/room/{self.room.id}/?{query}'
+        if user is not None:
+            path += f'&token={access_token(user)}'
+        return WebsocketCommunicator(application, path)
+
+    async def connect(self, participant):
+        communicator = self.communicator(participant.user)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    def paintball_count(self, participant):
+        return Participant.objects.get(id=participant.id).paintball_count
+
+    async def test_connect_and_disconnect_release_room_state(self):
+        communicator = await self.connect(self.participants[0])
+
+        messages = await receive_all(communicator)
+        self.assertEqual(messages[0]['type'], 'connection_established')
+        self.assertEqual(messages[0]['participant_id'], str(self.participants[0].id))
+        self.assertIn(str(self.room.id), room_states.connection_counts())
+
+        await communicator.disconnect()
+
+        self.assertNotIn(str(self.room.id), room_states.connection_counts())
+
+    async def test_non_participant_is_rejected_without_leaking_state(self):
+        outsider = await sync_to_async(User.objects.create_user)(username='outsider', password='pw')
+        communicator = self.communicator(outsider)
+
+        connected, _ = await communicator.connect()
+
+        self.assertFalse(connected)
+        self.assertNotIn(str(self.room.id), room_states.connection_counts())
+
+    async def test_unauthenticated_connection_is_rejected(self):
+        for communicator in (self.communicator(), self.communicator(query='token=invalid')):
+            with self.subTest():
+                connected, _ = await communicator.connect()
+                self.assertFalse(connected)
+        self.assertNotIn(str(self.room.id), room_states.connection_counts())
+
+    async def test_invalid_paintball_target_keeps_paintball(self):
+        participant = self.participants[0]
+        communicator = await self.connect(participant)
+        await receive_all(communicator)
+
+        await communicator.send_json_to({'type': 'paintball', 'target_h3_id': 'not-a-hex'})
+
+        messages = await receive_all(communicator)
+        self.assertEqual(messages, [{'type': 'error', 'message': '올바르지 않은 hex입니다.'}])
+        self.assertEqual(await sync_to_async(self.paintball_count)(participant), 3)
+        await communicator.disconnect()
+
+    async def test_paintball_is_broadcast(self):
+        shooter, other = self.participants
+        shooter_communicator = await self.connect(shooter)
+        other_communicator = await self.connect(other)
+        await receive_all(shooter_communicator)
+        await receive_all(other_communicator)
+
+        await shooter_communicator.send_json_to({'type': 'paintball', 'target_h3_id': ORIGIN_H3})
+
+        shooter_messages = await receive_all(shooter_communicator)
+        other_messages = await receive_all(other_communicator)
+        self.assertIn('paintball_used', types(shooter_messages))
+        self.assertIn('gauge_update', types(shooter_messages))
+        [used] = [message for message in other_messages if message['type'] == 'paintball_used']
+        self.assertEqual((used['target_h3_id'], used['team']), (ORIGIN_H3, shooter.team))
+        self.assertEqual(await sync_to_async(self.paintball_count)(shooter), 2)
+        await shooter_communicator.disconnect()
+        await other_communicator.disconnect()
+
+    async def test_failed_paintball_claim_is_refunded_and_not_broadcast(self):
+        shooter, other = self.participants
+        shooter_communicator = await self.connect(shooter)
+        other_communicator = await self.connect(other)
+        await receive_all(shooter_communicator)
+        await receive_all(other_communicator)
+
+        with mock.patch.object(HexOwnershipStore, 'compare_and_set', return_value=None):
+            await shooter_communicator.send_json_to({'type': 'paintball', 'target_h3_id': ORIGIN_H3})
+            shooter_messages = await receive_all(shooter_communicator)
+
+        self.assertIn(
+            {'type': 'error', 'message': '다른 점령과 겹쳐 페인트볼을 사용하지 못했습니다.'},
+            shooter_messages,
+        )
+        self.assertNotIn('paintball_used', types(shooter_messages))
+        self.assertEqual(await receive_all(other_communicator), [])
+        self.assertEqual(await sync_to_async(self.paintball_count)(shooter), 3)
+        await shooter_communicator.disconnect()
+        await other_communicator.disconnect()
+
+    async def test_sync_ownerships_reads_changes_from_store(self):
+        runner, other = self.participants
+        store = HexOwnershipStore(self.room.id)
+        await sync_to_async(store.compare_and_set)(ORIGIN_H3, None, 'A', str(runner.user_id), timezone.now())
+        communicator = await self.connect(other)
+        await receive_all(communicator)
+        room_state = room_states.get(self.room.id)
+        await room_state.ensure_ownerships_loaded()
+        self.assertEqual((room_state.ownership_version, room_state.team_hex_counts['A']), (1, 1))
+
+        # 다른 프로세스의 점령: 이 프로세스의 방 상태를 거치지 않고 저장 후 브로드캐스트
+        h3_id = sorted(RING_H3)[0]
+        version = await sync_to_async(store.compare_and_set)(h3_id, None, 'A', str(runner.user_id), timezone.now())
+        await get_channel_layer().group_send(f'room_{self.room.id}', group_event({
+            'type': 'hex_claimed', 'participant_id': str(runner.id), 'team': 'A',
+            'h3_id': h3_id, 'version': version, 'timestamp': timezone.now().isoformat(),
+        }, version=version))
+        await receive_all(communicator)
+        self.assertTrue(room_state.ownerships_stale)
+
+        await communicator.send_json_to({'type': 'sync_ownerships', 'since_version': 1})
+
+        [delta] = await receive_all(communicator)
+        self.assertEqual(delta, {
+            'type': 'ownership_delta', 'since_version': 1, 'version': 2,
+            'changes': [[h3_id, 'A', str(runner.user_id)]],
+        })
+        # 다시 로드하면 점수도 저장소 기준
+        await room_state.ensure_ownerships_loaded()
+        self.assertEqual((room_state.ownership_version, room_state.team_hex_counts['A']), (2, 2))
+        self.assertEqual(room_state.get_participant(runner.user_id).hexes_claimed, 2)
+        await communicator.disconnect()
@@ -0,0 +1,136 @@
+from datetime import datetime, timezone
+import h3
+import msgpack
+from django.test import SimpleTestCase, override_settings
+from apps.realtime import events
+from apps.realtime.protocol import (
+    CLIENT_MESSAGES, PROTOCOL_JSON, PROTOCOL_MSGPACK, SERVER_MESSAGES, SUBPROTOCOL_MSGPACK,
+    ProtocolError, decode_message, encode_message, negotiate_protocol,
+)
+
+ORIGIN_H3 = h3.geo_to_h3(37.5665, 126.9780, 9)
+RING_H3 = sorted(h3.hex_ring(ORIGIN_H3, 1))
+TIMESTAMP = '2026-01-01T09:00:00.123000+00:00'
+CLIENT_CODES = {message_type: code for code, (message_type, _) in CLIENT_MESSAGES.items()}
+
+
+def client_frame(message):
+    """모바일 클라이언트와 같은 방식으로 compact 프레임 생성 (h3 id는 정수)"""
+    code = CLIENT_CODES[message['type']]
+    fields = CLIENT_MESSAGES[code][1]
+    values = [
+        h3.string_to_h3(message[field]) if field == 'target_h3_id' and field in message else message.get(field)
+        for field in fields
+    ]
+    return msgpack.packb([code, *values])
+
+
+def read_server_frame(data):
+    """클라이언트 쪽 해석: 서버 compact 프레임 → {field: value}"""
+    code, *values = msgpack.unpackb(data)
+    message_type, fields = next(
+        (message_type, fields) for message_type, (schema_code, fields) in SERVER_MESSAGES.items()
+        if schema_code == code
+    )
+    return message_type, dict(zip(fields, values))
+
+
+class ClientMessageTests(SimpleTestCase):
+    def test_round_trip(self):
+        messages = [
+            {'type': 'location_update', 'lat': 37.5665, 'lng': 126.978, 'accuracy': 5.0, 'speed': 2.5},
+            {'type': 'paintball', 'target_h3_id': ORIGIN_H3, 'paintball_type': 'super'},
+            {'type': 'exchange_paintball'},
+            {'type': 'sync_ownerships', 'since_version': 12},
+            {'type': 'location_batch', 'points': [[37.5665, 126.978, 1767225600000]]},
+        ]
+        for message in messages:
+            with self.subTest(type=message['type']):
+                self.assertEqual(decode_message(client_frame(message)), message)
+
+    def test_integer_h3_id_becomes_string(self):
+        decoded = decode_message(msgpack.packb([2, h3.string_to_h3(ORIGIN_H3), 'normal']))
+
+        self.assertEqual(decoded['target_h3_id'], ORIGIN_H3)
+        self.assertIsInstance(decoded['target_h3_id'], str)
+
+    def test_missing_optional_fields_are_dropped(self):
+        self.assertEqual(
+            decode_message(msgpack.packb([1, 37.5, 127.0, None, None])),
+            {'type': 'location_update', 'lat': 37.5, 'lng': 127.0},
+        )
+
+    def test_generic_frame(self):
+        message = {'type': 'start_recording', 'extra': 1}
+        self.assertEqual(decode_message(msgpack.packb([0, message])), message)
+
+    def test_malformed_frames(self):
+        for data in (b'\xc1', msgpack.packb([]), msgpack.packb({'type': 'x'}), msgpack.packb([99]),
+                     msgpack.packb([0, 'not a map'])):
+            with self.subTest(data=data):
+                with self.assertRaises(ProtocolError):
+                    decode_message(data)
+
+
+class ServerMessageTests(SimpleTestCase):
+    def test_hexes_claimed_uses_integer_cells_and_epoch_ms(self):
+        payload = {
+            'type': 'hexes_claimed', 'participant_id': 'p', 'team': 'A',
+            'h3_ids': RING_H3, 'timestamp': TIMESTAMP, 'version': 7,
+        }
+
+        message_type, fields = read_server_frame(encode_message(payload))
+
+        self.assertEqual(message_type, 'hexes_claimed')
+        self.assertEqual([h3.h3_to_string(cell) for cell in fields['h3_ids']], RING_H3)
+        self.assertEqual(fields['timestamp'], int(datetime.fromisoformat(TIMESTAMP).timestamp() * 1000))
+        self.assertEqual((fields['participant_id'], fields['team'], fields['version']), ('p', 'A', 7))
+
+    def test_nested_cells_round_trip(self):
+        snapshot = {'type': 'ownership_snapshot', 'version': 3, 'teams': {'A': RING_H3[:2], 'B': [ORIGIN_H3]}}
+        delta = {'type': 'ownership_delta', 'since_version': 1, 'version': 3,
+                 'changes': [[ORIGIN_H3, 'B', 'u'], [RING_H3[0], None, None]]}
+
+        _, snapshot_fields = read_server_frame(encode_message(snapshot))
+        _, delta_fields = read_server_frame(encode_message(delta))
+
+        self.assertEqual(
+            {team: [h3.h3_to_string(cell) for cell in cells] for team, cells in snapshot_fields['teams'].items()},
+            snapshot['teams'],
+        )
+        self.assertEqual(
+            [[h3.h3_to_string(cell), team, user_id] for cell, team, user_id in delta_fields['changes']],
+            delta['changes'],
+        )
+
+    def test_message_without_schema_is_generic(self):
+        payload = {'type': 'error', 'message': '페인트볼이 부족합니다.'}
+
+        self.assertEqual(msgpack.unpackb(encode_message(payload)), [0, payload])
+
+
+class CompactEventTests(SimpleTestCase):
+    def test_group_event_carries_json_only(self):
+        event = events.group_event({'type': 'score_update', 'team_a_count': 1, 'team_b_count': 2,
+                                    'timestamp': TIMESTAMP}, version=3)
+
+        self.assertNotIn('bytes', event)
+        self.assertEqual((event['type'], event['version']), ('score_update', 3))
+
+    def test_event_bytes_built_once_per_event(self):
+        payload = {'type': 'score_update', 'team_a_count': 4, 'team_b_count': 5, 'timestamp': TIMESTAMP}
+        event = events.group_event(payload)
+
+        first = events.event_bytes(dict(event))
+        second = events.event_bytes(dict(event))
+
+        self.assertIs(first, second)
+        self.assertEqual(first, encode_message(payload))
+
+    def test_negotiation(self):
+        self.assertEqual(negotiate_protocol({'subprotocols': [SUBPROTOCOL_MSGPACK]}),
+                         (PROTOCOL_MSGPACK, SUBPROTOCOL_MSGPACK))
+        self.assertEqual(negotiate_protocol({'query_string': b'protocol=msgpack'}), (PROTOCOL_MSGPACK, None))
+        self.assertEqual(negotiate_protocol({}), (PROTOCOL_JSON, None))
+        with override_settings(REALTIME_COMPACT_PROTOCOL=False):
+            self.assertEqual(negotiate_protocol({'subprotocols': [SUBPROTOCOL_MSGPACK]}), (PROTOCOL_JSON, None))
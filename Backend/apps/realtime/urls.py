@@ -0,0 +1,9 @@
+"""
+Realtime URLs
+"""
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('metrics', views.metrics, name='realtime-metrics'),
+]
@@ -0,0 +1,146 @@
+"""
+WebSocket 인증 사용자 캐시
+모바일 클라이언트는 재연결이 잦으므로 handshake마다 User를 DB에서 조회하지 않도록 캐시
+- 1단계: 프로세스 메모리 LRU (user_id, 토큰 jti) → 적중 시 thread pool 전환 없음
+- 2단계: Django cache (Redis) user_id → 프로세스 간 공유
+사용자 정보가 바뀌면 signals에서 invalidate() (다른 프로세스의 메모리 캐시는 TTL로 만료)
+User 전체(비밀번호 hash 등)를 캐시에 두지 않도록 consumer가 쓰는 필드만 dict로 저장하고 CachedUser로 복원
+"""
+from collections import OrderedDict
+import logging
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from channels.db import database_sync_to_async
+from apps.accounts.models import User
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'realtime:ws_user:v2:'
+CACHED_FIELDS = ('id', 'username', 'is_active')
+
+
+class CachedUser:
+    """
+    WebSocket scope['user']용 가벼운 사용자 (consumer는 id/is_authenticated만 사용)
+    DB 행이 필요하면 id로 다시 조회
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id, username, is_active=True):
+        self.id = id
+        self.username = username
+        self.is_active = is_active
+
+    @property
+    def pk(self):
+        return self.id
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(uuid.UUID(data['id']), data['username'], data['is_active'])
+
+    def __eq__(self, other):
+        return getattr(other, 'is_authenticated', False) and getattr(other, 'pk', None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return self.username
+
+
+class UserCache:
+    """handshake용 사용자 캐시 (TTL + LRU, CachedUser)"""
+
+    def __init__(self, maxsize=None, ttl=None):
+        if maxsize is None:
+            maxsize = settings.WS_USER_CACHE_SIZE
+        if ttl is None:
+            ttl = settings.WS_USER_CACHE_TTL_SEC
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (user_id, jti) -> (expires_at, CachedUser)
+        self._lock = threading.Lock()
+
+    async def get(self, user_id, jti=None):
+        """
+        Args:
+            user_id: 토큰의 user_id
+            jti: 토큰 id (없으면 user_id만으로 캐시)
+
+        Returns:
+            CachedUser, 없거나 비활성 사용자면 None
+        """
+        key = (str(user_id), jti)
+        user = self._get_local(key)
+        if user is not None:
+            return user
+
+        user = await self._load(str(user_id))
+        if user is not None:
+            self._remember(key, user)
+        return user
+
+    def invalidate(self, user_id):
+        """사용자 정보 변경/삭제 시 호출"""
+        user_id = str(user_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+        try:
+            cache.delete(CACHE_KEY_PREFIX + user_id)
+        except Exception as e:
+            logger.warning("WS user cache delete failed: user=%s error=%s", user_id, e)
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def _remember(self, key, user):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @database_sync_to_async
+    def _load(self, user_id):
+        """Redis → DB 순서로 조회 (한 번의 thread pool 전환 안에서 처리)"""
+        try:
+            data = cache.get(CACHE_KEY_PREFIX + user_id)
+        except Exception as e:
+            logger.warning("WS user cache read failed: user=%s error=%s", user_id, e)
+            data = None
+
+        if data is None:
+            try:
+                row = User.objects.values(*CACHED_FIELDS).get(id=user_id)
+            except (User.DoesNotExist, ValidationError, ValueError):
+                return None
+            data = {**row, 'id': str(row['id'])}
+            try:
+                cache.set(CACHE_KEY_PREFIX + user_id, data, timeout=self.ttl)
+            except Exception as e:
+                logger.warning("WS user cache write failed: user=%s error=%s", user_id, e)
+
+        # 비활성 사용자는 인증하지 않음 (REST 인증과 같게)
+        if not data['is_active']:
+            return None
+        return CachedUser.from_dict(data)
+
+
+user_cache = UserCache()
@@ -0,0 +1,25 @@
+"""
+Realtime HTTP views
+"""
+import hmac
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint (이 ASGI 프로세스의 realtime metrics)
+    REALTIME_METRICS_TOKEN이 있으면 Authorization: Bearer <token> 필요, 없으면 DEBUG에서만 공개
+    """
+    from apps.realtime.metrics import render
+
+    if not settings.REALTIME_METRICS_ENABLED:
+        raise Http404
+    token = settings.REALTIME_METRICS_TOKEN
+    if token:
+        expected = f'Bearer {token}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
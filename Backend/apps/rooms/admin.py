@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import GameArea, Room, Participant, RunningRecord
+from .models import GameArea, Room, Participant, HexOwnership, RunningRecord
 
 @admin.register(GameArea)
 class GameAreaAdmin(admin.ModelAdmin):
@@ -26,6 +26,12 @@ class ParticipantAdmin(admin.ModelAdmin):
     list_filter = ('team', 'is_host', 'is_recording')
     search_fields = ('user__username', 'room__name')
 
+@admin.register(HexOwnership)
+class HexOwnershipAdmin(admin.ModelAdmin):
+    list_display = ('h3_id', 'room', 'team', 'user', 'claimed_by', 'claimed_at')
+    list_filter = ('team', 'claimed_by')
+    search_fields = ('h3_id', 'room__name', 'user__username')
+
 @admin.register(RunningRecord)
 class RunningRecordAdmin(admin.ModelAdmin):
     list_display = ('user', 'room', 'distance_meters', 'duration_seconds', 'started_at')
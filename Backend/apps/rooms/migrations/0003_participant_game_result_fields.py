@@ -0,0 +1,30 @@
+"""
+게임 결과 필드 (Participant 모델에는 있었지만 마이그레이션이 없던 필드)
+- hexes_claimed, is_mvp, rating_change: 게임 종료 처리(RankingService)에서 기록
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0002_alter_room_dates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participant',
+            name='hexes_claimed',
+            field=models.IntegerField(default=0, help_text='점령한 땅 수'),
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='is_mvp',
+            field=models.BooleanField(default=False, help_text='MVP 여부'),
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='rating_change',
+            field=models.IntegerField(default=0, help_text='레이팅 변동'),
+        ),
+    ]
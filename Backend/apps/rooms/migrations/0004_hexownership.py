@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+
+
+def copy_json_ownerships(apps, schema_editor):
+    """Room.current_hex_ownerships JSON을 HexOwnership 행으로 복사"""
+    Room = apps.get_model('rooms', 'Room')
+    HexOwnership = apps.get_model('rooms', 'HexOwnership')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    
+    user_ids = set(str(pk) for pk in User.objects.values_list('id', flat=True))
+    
+    for room in Room.objects.exclude(current_hex_ownerships={}).iterator():
+        rows = []
+        for h3_id, data in (room.current_hex_ownerships or {}).items():
+            if data.get('team') not in ('A', 'B'):
+                continue
+            user_id = data.get('user_id')
+            claimed_at = parse_datetime(data.get('claimed_at') or '') or room.updated_at or timezone.now()
+            rows.append(HexOwnership(
+                room_id=room.id,
+                h3_id=h3_id,
+                team=data['team'],
+                user_id=user_id if user_id and str(user_id) in user_ids else None,
+                claimed_by=data.get('claimed_by', ''),
+                claimed_at=claimed_at,
+            ))
+        HexOwnership.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('rooms', '0003_participant_game_result_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HexOwnership',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('h3_id', models.CharField(help_text='H3 ID', max_length=20)),
+                ('team', models.CharField(choices=[('A', 'A팀'), ('B', 'B팀')], help_text='점령 팀', max_length=1)),
+                ('claimed_by', models.CharField(blank=True, default='', help_text='점령 방식 (loop: 루프 자동 점령)', max_length=20)),
+                ('claimed_at', models.DateTimeField(help_text='점령 시간')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hex_ownerships', to='rooms.room')),
+                ('user', models.ForeignKey(blank=True, help_text='점령한 사용자', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hex_ownerships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'hex_ownerships',
+                'indexes': [models.Index(fields=['room', 'team'], name='hex_ownersh_room_id_59f85d_idx')],
+                'unique_together': {('room', 'h3_id')},
+            },
+        ),
+        migrations.RunPython(copy_json_ownerships, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='room',
+            name='current_hex_ownerships',
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_hex_counts(apps, schema_editor):
+    """HexOwnership 행 기준으로 팀/참가자 점령 수 집계 채우기"""
+    Room = apps.get_model('rooms', 'Room')
+    Participant = apps.get_model('rooms', 'Participant')
+    HexOwnership = apps.get_model('rooms', 'HexOwnership')
+
+    team_counts = HexOwnership.objects.values('room_id', 'team').annotate(count=Count('id'))
+    for row in team_counts:
+        field = 'team_a_hex_count' if row['team'] == 'A' else 'team_b_hex_count'
+        Room.objects.filter(id=row['room_id']).update(**{field: row['count']})
+
+    user_counts = (
+        HexOwnership.objects.filter(user__isnull=False)
+        .values('room_id', 'user_id')
+        .annotate(count=Count('id'))
+    )
+    for row in user_counts:
+        Participant.objects.filter(room_id=row['room_id'], user_id=row['user_id']).update(
+            hexes_claimed=row['count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0004_hexownership'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='team_a_hex_count',
+            field=models.IntegerField(default=0, help_text='A팀 점령 hex 수'),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='team_b_hex_count',
+            field=models.IntegerField(default=0, help_text='B팀 점령 hex 수'),
+        ),
+        migrations.AlterField(
+            model_name='participant',
+            name='hexes_claimed',
+            field=models.IntegerField(default=0, help_text='점령한 땅 수 (게임 중 실시간 갱신)'),
+        ),
+        migrations.RunPython(backfill_hex_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:41
+
+from django.db import migrations, models
+
+
+def backfill_ownership_versions(apps, schema_editor):
+    """기존 점령 hex는 모두 버전 1로 시작 (점령이 있는 방의 ownership_version = 1)"""
+    Room = apps.get_model('rooms', 'Room')
+    HexOwnership = apps.get_model('rooms', 'HexOwnership')
+
+    HexOwnership.objects.update(version=1)
+    room_ids = HexOwnership.objects.values_list('room_id', flat=True).distinct()
+    Room.objects.filter(id__in=room_ids).update(ownership_version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0005_room_team_hex_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hexownership',
+            name='version',
+            field=models.BigIntegerField(default=0, help_text='마지막 변경 시점의 방 ownership_version'),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='ownership_version',
+            field=models.BigIntegerField(default=0, help_text='hex 점령 변경 버전'),
+        ),
+        migrations.AddIndex(
+            model_name='hexownership',
+            index=models.Index(fields=['room', 'version'], name='hex_ownersh_room_id_a86f8b_idx'),
+        ),
+        migrations.RunPython(backfill_ownership_versions, migrations.RunPython.noop),
+    ]
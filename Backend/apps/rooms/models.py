@@ -69,6 +69,12 @@ class Room(models.Model):
         ('B', 'B팀'),
     ]
     
+    # 팀별 점령 hex 수 필드
+    TEAM_HEX_COUNT_FIELDS = {
+        'A': 'team_a_hex_count',
+        'B': 'team_b_hex_count',
+    }
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=200, help_text='방 이름')
     creator = models.ForeignKey(
@@ -106,12 +112,21 @@ class Room(models.Model):
         """게임 구역의 H3 해상도 반환 (하위 호환성)"""
         return self.game_area.h3_resolution if self.game_area else 8
     
-    # 현재 Hex 점령 상태 (실시간 업데이트)
-    current_hex_ownerships = models.JSONField(
-        default=dict, 
-        blank=True,
-        help_text='현재 hex 점령 상태 {h3_id: {team: "A"|"B", user_id, claimed_at}}'
-    )
+    @property
+    def current_hex_ownerships(self):
+        """
+        현재 hex 점령 상태 {h3_id: {team: "A"|"B", user_id, claimed_at, version}}
+        점령 저장소에서 필요할 때 생성 (serializer 하위 호환, 진행 중인 방은 Redis 저장소일 수 있음)
+        """
+        from .ownership import create_ownership_reader
+        return create_ownership_reader(self).load()
+    
+    # 팀별 점령 hex 수 (HexOwnership 변경 시 같은 트랜잭션에서 함께 갱신)
+    team_a_hex_count = models.IntegerField(default=0, help_text='A팀 점령 hex 수')
+    team_b_hex_count = models.IntegerField(default=0, help_text='B팀 점령 hex 수')
+    
+    # hex 점령이 바뀔 때마다 증가 (재연결 클라이언트가 since_version 이후 변경분만 받음)
+    ownership_version = models.BigIntegerField(default=0, help_text='hex 점령 변경 버전')
     
     # 방 상태
     status = models.CharField(
@@ -209,9 +224,9 @@ class Room(models.Model):
         return self.current_participants_count >= self.total_participants
     
     def get_team_hex_count(self, team):
-        """특정 팀의 점령한 hex 개수"""
-        return sum(1 for hex_data in self.current_hex_ownerships.values() 
-                   if hex_data.get('team') == team)
+        """특정 팀의 점령한 hex 개수 (점령 시 갱신되는 집계 필드)"""
+        field = self.TEAM_HEX_COUNT_FIELDS.get(team)
+        return getattr(self, field) if field else 0
     
     def determine_winner(self):
         """승리 팀 결정"""
@@ -260,7 +275,7 @@ class Participant(models.Model):
     paintball_gauge = models.IntegerField(default=0, help_text='페인트볼 게이지 (0-100)')
 
     # 게임 결과 통계
-    hexes_claimed = models.IntegerField(default=0, help_text='점령한 땅 수')
+    hexes_claimed = models.IntegerField(default=0, help_text='점령한 땅 수 (게임 중 실시간 갱신)')
     rating_change = models.IntegerField(default=0, help_text='레이팅 변동')
     is_mvp = models.BooleanField(default=False, help_text='MVP 여부')
     
@@ -318,39 +333,56 @@ class Participant(models.Model):
     
     def __str__(self):
         return f"{self.user.username} in {self.room.name} (Team {self.team})"
+
+
+class HexOwnership(models.Model):
+    """
+    Hex 점령 상태 (hex 하나당 한 행)
+    - 점령 시 해당 hex만 저장 (방 전체 점령 상태를 다시 쓰지 않음)
+    """
+    TEAM_CHOICES = [
+        ('A', 'A팀'),
+        ('B', 'B팀'),
+    ]
     
-    def add_gauge(self, amount):
-        """게이지 추가 (100이 차면 페인트볼 +1)"""
-        self.paintball_gauge += amount
-        while self.paintball_gauge >= 100:
-            self.paintball_gauge -= 100
-            self.paintball_count += 1
-        self.save(update_fields=['paintball_gauge', 'paintball_count'])
-    
-    def use_paintball(self):
-        """페인트볼 사용"""
-        if self.paintball_count > 0:
-            self.paintball_count -= 1
-            self.save(update_fields=['paintball_count'])
-            return True
-        return False
-    
-    def use_super_paintball(self):
-        """슈퍼 페인트볼 사용"""
-        if self.super_paintball_count > 0:
-            self.super_paintball_count -= 1
-            self.save(update_fields=['super_paintball_count'])
-            return True
-        return False
-    
-    def exchange_paintballs_to_super(self):
-        """페인트볼 3개 → 슈퍼 페인트볼 1개 교환"""
-        if self.paintball_count >= 3:
-            self.paintball_count -= 3
-            self.super_paintball_count += 1
-            self.save(update_fields=['paintball_count', 'super_paintball_count'])
-            return True
-        return False
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='hex_ownerships')
+    h3_id = models.CharField(max_length=20, help_text='H3 ID')
+    team = models.CharField(max_length=1, choices=TEAM_CHOICES, help_text='점령 팀')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='hex_ownerships',
+        help_text='점령한 사용자'
+    )
+    claimed_by = models.CharField(max_length=20, blank=True, default='', help_text='점령 방식 (loop: 루프 자동 점령)')
+    claimed_at = models.DateTimeField(help_text='점령 시간')
+    version = models.BigIntegerField(default=0, help_text='마지막 변경 시점의 방 ownership_version')
+    
+    class Meta:
+        db_table = 'hex_ownerships'
+        unique_together = [['room', 'h3_id']]
+        indexes = [
+            models.Index(fields=['room', 'team']),
+            models.Index(fields=['room', 'version']),
+        ]
+    
+    def __str__(self):
+        return f"{self.h3_id} (Team {self.team}) in {self.room_id}"
+    
+    def as_ownership(self):
+        """current_hex_ownerships 항목 형식으로 변환"""
+        data = {
+            'team': self.team,
+            'user_id': str(self.user_id) if self.user_id else None,
+            'claimed_at': self.claimed_at.isoformat(),
+            'version': self.version,
+        }
+        if self.claimed_by:
+            data['claimed_by'] = self.claimed_by
+        return data
 
 
 class RunningRecord(models.Model):
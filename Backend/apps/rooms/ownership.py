@@ -0,0 +1,266 @@
+"""
+Hex 점령 저장소 - MVP 버전
+hex 단위 upsert / compare-and-set (방 전체 점령 상태를 다시 쓰지 않음)
+점령이 바뀌면 팀/참가자별 점령 수 집계와 방 ownership_version도 같은 트랜잭션에서 갱신
+HEX_OWNERSHIP_BACKEND='redis'이면 Redis 저장소 사용 (redis_ownership.py)
+"""
+from collections import Counter
+import logging
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import Room, Participant, HexOwnership
+
+logger = logging.getLogger(__name__)
+
+
+def create_ownership_store(room_id):
+    """설정(HEX_OWNERSHIP_BACKEND)에 맞는 방 점령 저장소"""
+    if settings.HEX_OWNERSHIP_BACKEND == 'redis':
+        from .redis_ownership import RedisHexOwnershipStore
+        return RedisHexOwnershipStore(room_id)
+    return HexOwnershipStore(room_id)
+
+
+def create_ownership_reader(room):
+    """
+    조회(REST 상세, 리더보드)용 점령 저장소
+    진행 중인 방만 설정된 저장소에서 읽음 (Redis 저장소는 게임 중 DB 집계를 갱신하지 않음)
+    그 외의 방은 DB가 최신 - Redis에 방 데이터를 채우지 않도록 DB 저장소
+    """
+    if room.status == 'active':
+        return create_ownership_store(room.id)
+    return HexOwnershipStore(room.id)
+
+
+class HexOwnershipStore:
+    """
+    방 하나의 hex 점령 상태 저장소 (HexOwnership 테이블)
+    점령 상태는 {team, user_id, claimed_at, version[, claimed_by]} dict로 주고받음
+    """
+
+    def __init__(self, room_id):
+        self.room_id = str(room_id)
+
+    def load(self):
+        """방 전체 점령 상태 {h3_id: ownership}"""
+        return {
+            ownership.h3_id: ownership.as_ownership()
+            for ownership in HexOwnership.objects.filter(room_id=self.room_id)
+        }
+
+    def get(self, h3_id):
+        """hex 하나의 점령 상태 (없으면 None)"""
+        ownership = HexOwnership.objects.filter(room_id=self.room_id, h3_id=h3_id).first()
+        return ownership.as_ownership() if ownership else None
+
+    def counts(self, room):
+        """(방 ownership_version, {team: 점령 수}) - DB 저장소는 Room 집계 필드 그대로"""
+        return (
+            room.ownership_version,
+            {team: room.get_team_hex_count(team) for team in Room.TEAM_HEX_COUNT_FIELDS},
+        )
+
+    def participant_counts(self):
+        """참가자별 점령 수 {user_id: hexes_claimed} - DB 저장소는 Participant 집계 필드 그대로"""
+        return {
+            str(user_id): hexes_claimed
+            for user_id, hexes_claimed in Participant.objects.filter(room_id=self.room_id)
+            .values_list('user_id', 'hexes_claimed')
+        }
+
+    def changes_since(self, since_version, limit):
+        """
+        since_version 이후 바뀐 hex의 현재 상태 ((room, version) 인덱스로 조회)
+
+        Args:
+            since_version: 클라이언트가 마지막으로 반영한 ownership version
+            limit: 최대 hex 수 (넘으면 전체 스냅샷이 더 작음)
+
+        Returns:
+            (현재 방 ownership_version, [[h3_id, team, user_id], ...])
+            알 수 없는 버전이거나 limit을 넘으면 변경 목록 대신 None
+        """
+        # 버전을 먼저 읽음 - 그 뒤 점령이 끼어들면 변경 목록에 더 최신 상태가 들어갈 뿐 빠지는 변경은 없음
+        version = Room.objects.filter(id=self.room_id).values_list('ownership_version', flat=True).first() or 0
+        if since_version > version:
+            return version, None
+        rows = list(
+            HexOwnership.objects.filter(room_id=self.room_id, version__gt=since_version)
+            .values_list('h3_id', 'team', 'user_id')[:limit + 1]
+        )
+        if len(rows) > limit:
+            return version, None
+        return version, [[h3_id, team, str(user_id) if user_id else None] for h3_id, team, user_id in rows]
+
+    def persist(self):
+        """게임 종료 시 호출 - DB 저장소는 점령할 때마다 저장하므로 할 일 없음"""
+
+    def compare_and_set(self, h3_id, expected, team, user_id, claimed_at, claimed_by=''):
+        """
+        현재 점령 상태가 expected와 같을 때만 새 소유자로 변경 (단일 hex upsert)
+
+        Args:
+            expected: 호출자가 알고 있는 현재 점령 상태 (미점령이면 None)
+
+        Returns:
+            변경되었으면 새 ownership version, 그 사이 다른 곳에서 바뀌었으면 None
+        """
+        if expected is None:
+            try:
+                with transaction.atomic():
+                    version = self._next_version()
+                    HexOwnership.objects.create(
+                        room_id=self.room_id,
+                        h3_id=h3_id,
+                        team=team,
+                        user_id=user_id,
+                        claimed_by=claimed_by,
+                        claimed_at=claimed_at,
+                        version=version,
+                    )
+                    self._adjust_counts(team, user_id, 1)
+            except IntegrityError:
+                return None
+            return version
+
+        with transaction.atomic():
+            version = self._next_version()
+            updated = HexOwnership.objects.filter(
+                room_id=self.room_id,
+                h3_id=h3_id,
+                team=expected.get('team'),
+                user_id=expected.get('user_id'),
+            ).update(
+                team=team,
+                user_id=user_id,
+                claimed_by=claimed_by,
+                claimed_at=claimed_at,
+                version=version,
+            )
+            if updated != 1:
+                # 버전 증가도 되돌림
+                transaction.set_rollback(True)
+                return None
+            self._adjust_counts(expected.get('team'), expected.get('user_id'), -1)
+            self._adjust_counts(team, user_id, 1)
+        return version
+
+    def claim_unowned(self, h3_ids, team, user_id, claimed_at, claimed_by=''):
+        """
+        미점령 hex들을 한 번에 점령 (이미 점령된 hex는 무시)
+        한 번에 점령된 hex들은 같은 ownership version을 가짐
+
+        Returns:
+            (실제로 점령된 h3_id 목록, ownership version) - 점령된 hex가 없으면 ([], None)
+        """
+        if not h3_ids:
+            return [], None
+
+        with transaction.atomic():
+            version = self._next_version()
+            HexOwnership.objects.bulk_create(
+                [
+                    HexOwnership(
+                        room_id=self.room_id,
+                        h3_id=h3_id,
+                        team=team,
+                        user_id=user_id,
+                        claimed_by=claimed_by,
+                        claimed_at=claimed_at,
+                        version=version,
+                    )
+                    for h3_id in h3_ids
+                ],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+            # ignore_conflicts는 삽입된 행을 알려주지 않으므로 이번 점령으로 들어간 행만 다시 조회
+            claimed = list(
+                HexOwnership.objects.filter(
+                    room_id=self.room_id,
+                    h3_id__in=h3_ids,
+                    team=team,
+                    user_id=user_id,
+                    claimed_by=claimed_by,
+                    claimed_at=claimed_at,
+                    version=version,
+                ).values_list('h3_id', flat=True)
+            )
+            if not claimed:
+                transaction.set_rollback(True)
+                return [], None
+            self._adjust_counts(team, user_id, len(claimed))
+        return claimed, version
+
+    def claim_many(self, h3_ids, team, user_id, claimed_at, claimed_by=''):
+        """
+        여러 hex를 한 트랜잭션에서 점령 (미점령 hex와 상대 팀 hex, 같은 팀 hex는 그대로 둠)
+        트랙 일괄 처리용 - 한 번에 점령된 hex들은 같은 ownership version을 가짐
+
+        Returns:
+            (실제로 점령된 h3_id 목록, ownership version) - 점령된 hex가 없으면 ([], None)
+        """
+        h3_ids = list(dict.fromkeys(h3_ids))
+        if not h3_ids:
+            return [], None
+
+        with transaction.atomic():
+            # 방 행 잠금 (다른 점령 저장도 모두 _next_version부터 시작하므로 이후 조회/삽입은 충돌 없음)
+            version = self._next_version()
+            existing = {
+                row.h3_id: row
+                for row in HexOwnership.objects.filter(room_id=self.room_id, h3_id__in=h3_ids)
+            }
+            flipped = [row for row in existing.values() if row.team != team]
+            created = [h3_id for h3_id in h3_ids if h3_id not in existing]
+            if not flipped and not created:
+                transaction.set_rollback(True)
+                return [], None
+
+            if flipped:
+                HexOwnership.objects.filter(id__in=[row.id for row in flipped]).update(
+                    team=team,
+                    user_id=user_id,
+                    claimed_by=claimed_by,
+                    claimed_at=claimed_at,
+                    version=version,
+                )
+                previous_owners = Counter((row.team, row.user_id) for row in flipped)
+                for (previous_team, previous_user_id), count in previous_owners.items():
+                    self._adjust_counts(previous_team, previous_user_id, -count)
+            HexOwnership.objects.bulk_create(
+                [
+                    HexOwnership(
+                        room_id=self.room_id,
+                        h3_id=h3_id,
+                        team=team,
+                        user_id=user_id,
+                        claimed_by=claimed_by,
+                        claimed_at=claimed_at,
+                        version=version,
+                    )
+                    for h3_id in created
+                ],
+                batch_size=1000,
+            )
+            claimed = set(created) | {row.h3_id for row in flipped}
+            self._adjust_counts(team, user_id, len(claimed))
+        return [h3_id for h3_id in h3_ids if h3_id in claimed], version
+
+    def _next_version(self):
+        """방 ownership_version 증가 후 새 값 (트랜잭션 안에서 호출 - 방 행 잠금으로 순서 보장)"""
+        Room.objects.filter(id=self.room_id).update(ownership_version=F('ownership_version') + 1)
+        return Room.objects.filter(id=self.room_id).values_list('ownership_version', flat=True).get()
+
+    def _adjust_counts(self, team, user_id, delta):
+        """팀(Room)/참가자(Participant) 점령 수 증감"""
+        if not delta:
+            return
+        field = Room.TEAM_HEX_COUNT_FIELDS.get(team)
+        if field:
+            Room.objects.filter(id=self.room_id).update(**{field: F(field) + delta})
+        if user_id:
+            Participant.objects.filter(room_id=self.room_id, user_id=user_id).update(
+                hexes_claimed=F('hexes_claimed') + delta
+            )
@@ -0,0 +1,502 @@
+"""
+Redis hex 점령 저장소
+방마다 Redis hash에 점령 상태를 두고 Lua 스크립트로 compare-and-set
+(현재 소유자 확인, 새 소유자 저장, 팀/사용자 점령 수, 방 버전 증가, 변경 stream 기록을 한 번의 왕복으로 처리)
+게임 종료 시 persist()로 HexOwnership 테이블과 Room/Participant 집계에 반영
+
+Keys (room 단위):
+- hexmap:own:{room_id}:owners   hash  h3_id -> ownership JSON
+- hexmap:own:{room_id}:meta     hash  version, team:A, team:B, user:{user_id}, seeded
+- hexmap:own:{room_id}:changes  stream (h3_ids, version, team, user_id)
+- hexmap:own:{room_id}:closed   string  persist 이후 설정 - 점령 스크립트가 거부하고 다시 채우지 않음
+- hexmap:own:{room_id}:owners:persist, meta:persist  persist 중인 스냅샷 (DB 반영 후 삭제)
+
+점령 스크립트는 closed/seeded를 직접 확인하므로 점령 한 번은 Redis 왕복 한 번
+(DB에서 채우지 않은 방이면 NOT_SEEDED를 돌려받아 채운 뒤 다시 실행)
+"""
+import json
+import logging
+import threading
+import redis
+from django.conf import settings
+from django.db import transaction
+from .models import Room, Participant, HexOwnership
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'hexmap:own:'
+
+# closed 표시 유지 시간 - 그 뒤에는 방이 finished 상태라 다시 채우지 않음
+CLOSED_TTL_SEC = 7 * 24 * 60 * 60
+
+# 점령 스크립트 상태 코드 (version 자리에 반환)
+CONFLICT = -1
+CLOSED = -2
+NOT_SEEDED = -3
+
+# KEYS: owners, meta, changes, closed
+# ARGV: h3_id, expected_team ('' = 미점령), expected_user_id, team, user_id, claimed_at, claimed_by, stream_maxlen
+# 반환: 새 version, 현재 소유자가 expected와 다르면 -1 (closed -2, 채우기 전 -3)
+COMPARE_AND_SET_SCRIPT = """
+if redis.call('EXISTS', KEYS[4]) == 1 then return -2 end
+if redis.call('HEXISTS', KEYS[2], 'seeded') == 0 then return -3 end
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current then
+    local owner = cjson.decode(current)
+    local owner_user = owner['user_id']
+    if type(owner_user) ~= 'string' then owner_user = '' end
+    if ARGV[2] == '' or owner['team'] ~= ARGV[2] or owner_user ~= ARGV[3] then
+        return -1
+    end
+    redis.call('HINCRBY', KEYS[2], 'team:' .. owner['team'], -1)
+    if owner_user ~= '' then
+        redis.call('HINCRBY', KEYS[2], 'user:' .. owner_user, -1)
+    end
+elseif ARGV[2] ~= '' then
+    return -1
+end
+
+local version = redis.call('HINCRBY', KEYS[2], 'version', 1)
+local ownership = {team = ARGV[4], claimed_at = ARGV[6], version = version}
+if ARGV[5] ~= '' then ownership['user_id'] = ARGV[5] end
+if ARGV[7] ~= '' then ownership['claimed_by'] = ARGV[7] end
+redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(ownership))
+redis.call('HINCRBY', KEYS[2], 'team:' .. ARGV[4], 1)
+if ARGV[5] ~= '' then
+    redis.call('HINCRBY', KEYS[2], 'user:' .. ARGV[5], 1)
+end
+redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[8], '*',
+    'h3_ids', ARGV[1], 'version', version, 'team', ARGV[4], 'user_id', ARGV[5])
+return version
+"""
+
+# KEYS: owners, meta, changes, closed
+# ARGV: team, user_id, claimed_at, claimed_by, stream_maxlen, h3_id...
+# 반환: {version, 점령된 h3_id...} (점령된 hex가 없으면 {0}, closed {-2}, 채우기 전 {-3})
+CLAIM_UNOWNED_SCRIPT = """
+if redis.call('EXISTS', KEYS[4]) == 1 then return {-2} end
+if redis.call('HEXISTS', KEYS[2], 'seeded') == 0 then return {-3} end
+local unowned = {}
+for i = 6, #ARGV do
+    if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 0 then
+        table.insert(unowned, ARGV[i])
+    end
+end
+if #unowned == 0 then
+    return {0}
+end
+
+local version = redis.call('HINCRBY', KEYS[2], 'version', 1)
+local ownership = {team = ARGV[1], claimed_at = ARGV[3], version = version}
+if ARGV[2] ~= '' then ownership['user_id'] = ARGV[2] end
+if ARGV[4] ~= '' then ownership['claimed_by'] = ARGV[4] end
+local encoded = cjson.encode(ownership)
+for _, h3_id in ipairs(unowned) do
+    redis.call('HSET', KEYS[1], h3_id, encoded)
+end
+redis.call('HINCRBY', KEYS[2], 'team:' .. ARGV[1], #unowned)
+if ARGV[2] ~= '' then
+    redis.call('HINCRBY', KEYS[2], 'user:' .. ARGV[2], #unowned)
+end
+redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[5], '*',
+    'h3_ids', table.concat(unowned, ','), 'version', version, 'team', ARGV[1], 'user_id', ARGV[2])
+
+local result = {version}
+for _, h3_id in ipairs(unowned) do
+    table.insert(result, h3_id)
+end
+return result
+"""
+
+# KEYS: owners, meta, changes, closed
+# ARGV: team, user_id, claimed_at, claimed_by, stream_maxlen, h3_id...
+# 미점령 hex와 상대 팀 hex를 점령 (같은 팀 hex는 그대로), 반환: {version, 점령된 h3_id...} (없으면 {0}, closed {-2}, 채우기 전 {-3})
+CLAIM_MANY_SCRIPT = """
+if redis.call('EXISTS', KEYS[4]) == 1 then return {-2} end
+if redis.call('HEXISTS', KEYS[2], 'seeded') == 0 then return {-3} end
+local claimed = {}
+for i = 6, #ARGV do
+    local current = redis.call('HGET', KEYS[1], ARGV[i])
+    if current then
+        local owner = cjson.decode(current)
+        if owner['team'] ~= ARGV[1] then
+            redis.call('HINCRBY', KEYS[2], 'team:' .. owner['team'], -1)
+            if type(owner['user_id']) == 'string' then
+                redis.call('HINCRBY', KEYS[2], 'user:' .. owner['user_id'], -1)
+            end
+            table.insert(claimed, ARGV[i])
+        end
+    else
+        table.insert(claimed, ARGV[i])
+    end
+end
+if #claimed == 0 then
+    return {0}
+end
+
+local version = redis.call('HINCRBY', KEYS[2], 'version', 1)
+local ownership = {team = ARGV[1], claimed_at = ARGV[3], version = version}
+if ARGV[2] ~= '' then ownership['user_id'] = ARGV[2] end
+if ARGV[4] ~= '' then ownership['claimed_by'] = ARGV[4] end
+local encoded = cjson.encode(ownership)
+for _, h3_id in ipairs(claimed) do
+    redis.call('HSET', KEYS[1], h3_id, encoded)
+end
+redis.call('HINCRBY', KEYS[2], 'team:' .. ARGV[1], #claimed)
+if ARGV[2] ~= '' then
+    redis.call('HINCRBY', KEYS[2], 'user:' .. ARGV[2], #claimed)
+end
+redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[5], '*',
+    'h3_ids', table.concat(claimed, ','), 'version', version, 'team', ARGV[1], 'user_id', ARGV[2])
+
+local result = {version}
+for _, h3_id in ipairs(claimed) do
+    table.insert(result, h3_id)
+end
+return result
+"""
+
+# KEYS: owners, meta, changes, closed, owners:persist, meta:persist
+# ARGV: closed_ttl
+# 방을 닫고 점령 상태를 persist 키로 옮김 (그 뒤의 점령은 거부됨)
+# 반환: 1 = persist 키에 옮겨진 상태가 있음, 0 = 채운 적 없음 (DB가 최신)
+CLOSE_SCRIPT = """
+redis.call('SET', KEYS[4], 1, 'EX', ARGV[1])
+if redis.call('EXISTS', KEYS[6]) == 1 then
+    -- 이전 persist가 DB에 반영하기 전에 실패함
+    return 1
+end
+if redis.call('HEXISTS', KEYS[2], 'seeded') == 0 then
+    redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+    return 0
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[5])
+end
+redis.call('RENAME', KEYS[2], KEYS[6])
+redis.call('DEL', KEYS[3])
+return 1
+"""
+
+_client = None
+_scripts = {}
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """점령 저장소용 Redis 연결 (프로세스당 하나, 연결 풀 공유)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client = redis.Redis.from_url(settings.HEX_OWNERSHIP_REDIS_URL, decode_responses=True)
+                _scripts['compare_and_set'] = client.register_script(COMPARE_AND_SET_SCRIPT)
+                _scripts['claim_unowned'] = client.register_script(CLAIM_UNOWNED_SCRIPT)
+                _scripts['claim_many'] = client.register_script(CLAIM_MANY_SCRIPT)
+                _scripts['close'] = client.register_script(CLOSE_SCRIPT)
+                _client = client
+    return _client
+
+
+class RedisHexOwnershipStore:
+    """
+    방 하나의 hex 점령 상태 저장소 (Redis)
+    HexOwnershipStore와 같은 인터페이스 - 점령 상태는 {team, user_id, claimed_at, version[, claimed_by]} dict
+    Redis에 방 데이터가 없으면 처음 접근 시 DB(HexOwnership, Room 집계)에서 채움
+    persist()로 닫힌 방은 다시 채우지 않음 - 점령은 거부(conflict와 같게 처리), 조회는 DB 저장소로 위임
+    """
+
+    def __init__(self, room_id):
+        self.room_id = str(room_id)
+        prefix = f'{KEY_PREFIX}{self.room_id}:'
+        self.owners_key = prefix + 'owners'
+        self.meta_key = prefix + 'meta'
+        self.changes_key = prefix + 'changes'
+        self.closed_key = prefix + 'closed'
+        self.owners_persist_key = self.owners_key + ':persist'
+        self.meta_persist_key = self.meta_key + ':persist'
+
+    @property
+    def keys(self):
+        return [self.owners_key, self.meta_key, self.changes_key, self.closed_key]
+
+    def load(self):
+        """방 전체 점령 상태 {h3_id: ownership}"""
+        found, owners = self._read('hgetall', self.owners_key)
+        if not found:
+            return self._db_store().load()
+        return {h3_id: json.loads(value) for h3_id, value in owners.items()}
+
+    def get(self, h3_id):
+        """hex 하나의 점령 상태 (없으면 None)"""
+        found, value = self._read('hget', self.owners_key, h3_id)
+        if not found:
+            return self._db_store().get(h3_id)
+        return json.loads(value) if value else None
+
+    def counts(self, room):
+        """(방 ownership_version, {team: 점령 수})"""
+        found, meta = self._read('hgetall', self.meta_key)
+        if not found:
+            return self._db_store().counts(room)
+        return (
+            int(meta.get('version', 0)),
+            {team: int(meta.get(f'team:{team}', 0)) for team in Room.TEAM_HEX_COUNT_FIELDS},
+        )
+
+    def participant_counts(self):
+        """참가자별 점령 수 {user_id: hexes_claimed} (점령한 적 없는 참가자는 없음)"""
+        found, meta = self._read('hgetall', self.meta_key)
+        if not found:
+            return self._db_store().participant_counts()
+        return {
+            key[len('user:'):]: int(value)
+            for key, value in meta.items()
+            if key.startswith('user:')
+        }
+
+    def changes_since(self, since_version, limit):
+        """
+        since_version 이후 바뀐 hex의 현재 상태 (변경 stream + owners hash)
+        stream은 OWNERSHIP_CHANGELOG_SIZE로 잘리고 채운 시점 이전 변경은 없으므로,
+        since_version 바로 다음 변경부터 stream에 남아 있을 때만 변경 목록을 만듦
+
+        Returns:
+            (현재 ownership version, [[h3_id, team, user_id], ...])
+            알 수 없는 버전이거나 limit을 넘으면 변경 목록 대신 None
+        """
+        found, (version, entries) = self._read_many(
+            ('hget', self.meta_key, 'version'),
+            ('xrange', self.changes_key),
+        )
+        if not found:
+            return self._db_store().changes_since(since_version, limit)
+        version = int(version or 0)
+        if since_version > version:
+            return version, None
+        if since_version == version:
+            return version, []
+        if not entries or int(entries[0][1]['version']) > since_version + 1:
+            return version, None
+
+        changed = {}
+        for _, fields in entries:
+            if int(fields['version']) > since_version:
+                changed.update(dict.fromkeys(fields['h3_ids'].split(',')))
+                if len(changed) > limit:
+                    return version, None
+        h3_ids = list(changed)
+        # 버전 이후의 점령이 끼어들어도 더 최신 상태가 들어갈 뿐 빠지는 변경은 없음
+        values = get_redis().hmget(self.owners_key, h3_ids) if h3_ids else []
+        changes = []
+        for h3_id, value in zip(h3_ids, values):
+            ownership = json.loads(value) if value else {}
+            changes.append([h3_id, ownership.get('team'), ownership.get('user_id')])
+        return version, changes
+
+    def _read(self, command, *args):
+        """
+        closed/seeded 확인과 조회를 한 번의 왕복(MULTI)으로 실행
+
+        Returns:
+            (Redis에 방 상태가 있는지, 조회 결과) - 닫혔거나 채울 수 없는 방이면 (False, None)
+        """
+        found, (value,) = self._read_many((command, *args))
+        return found, value
+
+    def _read_many(self, *commands):
+        """
+        _read와 같지만 여러 조회를 한 번에 - (Redis에 방 상태가 있는지, 조회 결과 list)
+        """
+        client = get_redis()
+        for _ in range(2):
+            with client.pipeline() as pipe:
+                pipe.exists(self.closed_key)
+                pipe.hexists(self.meta_key, 'seeded')
+                for command, *args in commands:
+                    getattr(pipe, command)(*args)
+                closed, seeded, *values = pipe.execute()
+            if closed:
+                return False, [None] * len(commands)
+            if seeded:
+                return True, values
+            if not self._seed():
+                return False, [None] * len(commands)
+        return False, [None] * len(commands)
+
+    def _db_store(self):
+        from .ownership import HexOwnershipStore
+        return HexOwnershipStore(self.room_id)
+
+    def compare_and_set(self, h3_id, expected, team, user_id, claimed_at, claimed_by=''):
+        """
+        현재 점령 상태가 expected와 같을 때만 새 소유자로 변경 (Lua 스크립트 한 번)
+
+        Returns:
+            변경되었으면 새 ownership version, 그 사이 다른 곳에서 바뀌었거나 닫힌 방이면 None
+        """
+        version = self._run_script('compare_and_set', [
+            h3_id,
+            expected.get('team') if expected else '',
+            (expected.get('user_id') or '') if expected else '',
+            team,
+            user_id or '',
+            claimed_at.isoformat(),
+            claimed_by,
+            settings.OWNERSHIP_CHANGELOG_SIZE,
+        ])
+        return version if version >= 0 else None
+
+    def claim_unowned(self, h3_ids, team, user_id, claimed_at, claimed_by=''):
+        """
+        미점령 hex들을 한 번에 점령 (이미 점령된 hex는 무시, 같은 version)
+
+        Returns:
+            (실제로 점령된 h3_id 목록, ownership version) - 점령된 hex가 없으면 ([], None)
+        """
+        return self._run_claim_script('claim_unowned', h3_ids, team, user_id, claimed_at, claimed_by)
+
+    def claim_many(self, h3_ids, team, user_id, claimed_at, claimed_by=''):
+        """
+        여러 hex를 한 번에 점령 (미점령 hex와 상대 팀 hex, 같은 팀 hex는 그대로 둠)
+
+        Returns:
+            (실제로 점령된 h3_id 목록, ownership version) - 점령된 hex가 없으면 ([], None)
+        """
+        h3_ids = list(dict.fromkeys(h3_ids))
+        return self._run_claim_script('claim_many', h3_ids, team, user_id, claimed_at, claimed_by)
+
+    def _run_claim_script(self, name, h3_ids, team, user_id, claimed_at, claimed_by):
+        if not h3_ids:
+            return [], None
+        result = self._run_script(name, [
+            team,
+            user_id or '',
+            claimed_at.isoformat(),
+            claimed_by,
+            settings.OWNERSHIP_CHANGELOG_SIZE,
+            *h3_ids,
+        ])
+        version, claimed = result[0], result[1:]
+        if version < 0 or not claimed:
+            return [], None
+        return claimed, version
+
+    def _run_script(self, name, args):
+        """점령 스크립트 실행 - 채우기 전인 방이면 DB에서 채운 뒤 한 번 더 실행"""
+        get_redis()
+        result = _scripts[name](keys=self.keys, args=args)
+        status = result[0] if isinstance(result, list) else result
+        if status == NOT_SEEDED:
+            if self._seed():
+                result = _scripts[name](keys=self.keys, args=args)
+                status = result[0] if isinstance(result, list) else result
+            else:
+                status = CLOSED
+                result = [CLOSED] if isinstance(result, list) else CLOSED
+        if status == CLOSED:
+            logger.warning("Claim on closed room rejected: room=%s script=%s", self.room_id, name)
+        return result
+
+    def persist(self):
+        """
+        게임 종료 시 Redis 점령 상태를 DB에 반영하고 Redis 데이터 삭제
+        (HexOwnership 행, Room 팀 집계/버전, Participant.hexes_claimed)
+
+        먼저 방을 닫고 점령 상태를 persist 키로 RENAME (스크립트 한 번) - 그 사이 들어온 점령은
+        반영되었거나 거부되었으므로 읽은 뒤 잃어버리는 점령이 없음. DB 반영에 실패하면 persist 키가
+        남아 다음 persist()에서 다시 반영
+        """
+        client = get_redis()
+        if not _scripts['close'](
+            keys=[*self.keys, self.owners_persist_key, self.meta_persist_key],
+            args=[CLOSED_TTL_SEC],
+        ):
+            return
+        with client.pipeline() as pipe:
+            pipe.hgetall(self.owners_persist_key)
+            pipe.hgetall(self.meta_persist_key)
+            owners, meta = pipe.execute()
+        ownerships = {h3_id: json.loads(value) for h3_id, value in owners.items()}
+
+        with transaction.atomic():
+            HexOwnership.objects.filter(room_id=self.room_id).delete()
+            HexOwnership.objects.bulk_create(
+                [
+                    HexOwnership(
+                        room_id=self.room_id,
+                        h3_id=h3_id,
+                        team=ownership['team'],
+                        user_id=ownership.get('user_id'),
+                        claimed_by=ownership.get('claimed_by', ''),
+                        claimed_at=ownership['claimed_at'],
+                        version=ownership.get('version', 0),
+                    )
+                    for h3_id, ownership in ownerships.items()
+                ],
+                batch_size=1000,
+            )
+            Room.objects.filter(id=self.room_id).update(
+                ownership_version=int(meta.get('version', 0)),
+                **{
+                    field: int(meta.get(f'team:{team}', 0))
+                    for team, field in Room.TEAM_HEX_COUNT_FIELDS.items()
+                },
+            )
+            for participant in Participant.objects.filter(room_id=self.room_id):
+                hexes_claimed = int(meta.get(f'user:{participant.user_id}', 0))
+                if participant.hexes_claimed != hexes_claimed:
+                    participant.hexes_claimed = hexes_claimed
+                    participant.save(update_fields=['hexes_claimed'])
+
+        client.delete(self.owners_persist_key, self.meta_persist_key)
+        logger.info(
+            "Redis ownerships persisted: room=%s hexes=%d version=%s",
+            self.room_id,
+            len(ownerships),
+            meta.get('version'),
+        )
+
+    def _seed(self):
+        """
+        Redis에 방 데이터가 없으면 DB 점령 상태로 채움 (여러 프로세스가 동시에 불러도 한 번만)
+
+        Returns:
+            Redis에 방 상태가 있으면 True, 닫혔거나 끝난 방이라 채우지 않았으면 False
+        """
+        client = get_redis()
+        room = Room.objects.filter(id=self.room_id).first()
+        if room is None or room.status == 'finished':
+            return False
+        rows = list(HexOwnership.objects.filter(room_id=self.room_id))
+        user_counts = {}
+        for row in rows:
+            if row.user_id:
+                user_counts[str(row.user_id)] = user_counts.get(str(row.user_id), 0) + 1
+        meta = {
+            'seeded': 1,
+            'version': room.ownership_version,
+            **{f'team:{team}': room.get_team_hex_count(team) for team in Room.TEAM_HEX_COUNT_FIELDS},
+            **{f'user:{user_id}': count for user_id, count in user_counts.items()},
+        }
+
+        with client.pipeline() as pipe:
+            try:
+                pipe.watch(self.meta_key, self.closed_key)
+                if pipe.exists(self.closed_key):
+                    return False
+                if pipe.hexists(self.meta_key, 'seeded'):
+                    return True
+                pipe.multi()
+                if rows:
+                    pipe.hset(
+                        self.owners_key,
+                        mapping={row.h3_id: json.dumps(row.as_ownership()) for row in rows},
+                    )
+                pipe.hset(self.meta_key, mapping=meta)
+                pipe.execute()
+            except redis.WatchError:
+                # 다른 프로세스가 먼저 채웠거나 방이 닫힘
+                return not client.exists(self.closed_key)
+        logger.info("Redis ownerships seeded from DB: room=%s hexes=%d", self.room_id, len(rows))
+        return True
@@ -3,6 +3,7 @@ Room serializers - MVP 버전
 """
 from rest_framework import serializers
 from .models import GameArea, Room, Participant, RunningRecord
+from .ownership import HexOwnershipStore, create_ownership_reader
 from apps.accounts.serializers import UserSerializer
 
 
@@ -69,7 +70,7 @@ class RoomDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'creator', 'total_participants', 'current_participants',
             'team_a_count', 'team_b_count', 'start_date', 'end_date',
-            'status', 'invite_code', 'game_area', 'current_hex_ownerships',
+            'status', 'invite_code', 'game_area', 'current_hex_ownerships', 'ownership_version',
             'mvp', 'winner_team', 'participants', 'created_at', 'updated_at'
         ]
     
@@ -81,6 +82,18 @@ class RoomDetailSerializer(serializers.ModelSerializer):
     
     def get_team_b_count(self, obj):
         return obj.participants.filter(team='B').count()
+    
+    def to_representation(self, instance):
+        """점령 버전/참가자 점령 수는 점령 저장소 기준 (Redis 저장소는 게임 중 DB 집계를 갱신하지 않음)"""
+        data = super().to_representation(instance)
+        store = create_ownership_reader(instance)
+        if isinstance(store, HexOwnershipStore):
+            return data
+        data['ownership_version'], _ = store.counts(instance)
+        hex_counts = store.participant_counts()
+        for participant in data['participants']:
+            participant['hexes_claimed'] = hex_counts.get(str(participant['user']['id']), 0)
+        return data
 
 
 class RoomCreateSerializer(serializers.ModelSerializer):
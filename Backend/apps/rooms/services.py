@@ -0,0 +1,359 @@
+"""
+Room 도메인 서비스
+WebSocket consumer와 REST view가 함께 쓰는 게임 처리 로직
+"""
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+import logging
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from apps.hexmap.area_cells import get_area_cells
+from apps.hexmap.bounds import get_area_bounds
+from apps.hexmap.compute import ComputeTimeout, compute_pool
+from apps.hexmap.h3_utils import compact_h3_ids, h3_str_to_int
+from apps.hexmap.loop_detector import LoopDetector, detect_loop_in_region
+from apps.hexmap.team_graph import TeamGraph
+from apps.hexmap.track import TrackError, process_track
+from apps.realtime.metrics import CLAIMS, LOOPS
+from .models import Participant, RunningRecord
+from .ownership import create_ownership_store
+
+logger = logging.getLogger(__name__)
+
+# 같은 팀 땅에 머물렀을 때 게이지 (consumer 실시간 점령과 같은 값)
+SAME_TEAM_GAUGE = 60
+
+# 게이지가 이만큼 차면 페인트볼 1개
+GAUGE_PER_PAINTBALL = 100
+
+# 슈퍼 페인트볼 1개 교환에 필요한 페인트볼 수
+PAINTBALLS_PER_SUPER = 3
+
+INVENTORY_FIELDS = ('paintball_gauge', 'paintball_count', 'super_paintball_count')
+
+
+def loop_complete_payload(participant, h3_resolution, claimed_h3_ids, version, claimed_at):
+    """루프 내부 자동 점령 브로드캐스트 (consumer와 REST가 같은 형식으로 전송, 고리 hex는 보내지 않음)"""
+    return {
+        'type': 'loop_complete',
+        'participant_id': str(participant.id),
+        'team': participant.team,
+        'h3_resolution': h3_resolution,
+        'claimed_cells': compact_h3_ids(claimed_h3_ids),
+        'claimed_count': len(claimed_h3_ids),
+        'version': version,
+        'timestamp': claimed_at.isoformat()
+    }
+
+
+class InventoryService:
+    """
+    참가자 게이지/페인트볼 변경
+    - 변경마다 조건부 UPDATE 한 문장 (F() 증감), 변경 후 값은 같은 트랜잭션에서 조회
+    - 메모리에 로드해 둔 값으로 저장하지 않으므로 출석 보상/페인트볼 사용이 동시에 일어나도 증감이 사라지지 않음
+    - 조건이 맞지 않으면(개수 부족) 아무것도 바꾸지 않음
+    - 변경 후 DB 값을 participant 객체에도 반영
+    """
+
+    def __init__(self, participant):
+        self.participant = participant
+
+    def add_gauge(self, amount):
+        """게이지 추가 (100이 찰 때마다 페인트볼 +1), 반환값: 변경 후 값 dict"""
+        gauge = F('paintball_gauge') + amount
+        return self._update(
+            paintball_gauge=gauge % GAUGE_PER_PAINTBALL,
+            paintball_count=F('paintball_count') + gauge / GAUGE_PER_PAINTBALL,
+        )
+
+    def add_paintballs(self, count):
+        """페인트볼 지급 (출석 보상), 반환값: 변경 후 값 dict"""
+        return self._update(paintball_count=F('paintball_count') + count)
+
+    def use_paintball(self):
+        """페인트볼 1개 사용, 반환값: 성공 여부"""
+        return self._update(
+            Q(paintball_count__gt=0),
+            paintball_count=F('paintball_count') - 1,
+        ) is not None
+
+    def use_super_paintball(self):
+        """슈퍼 페인트볼 1개 사용, 반환값: 성공 여부"""
+        return self._update(
+            Q(super_paintball_count__gt=0),
+            super_paintball_count=F('super_paintball_count') - 1,
+        ) is not None
+
+    def exchange_paintballs_to_super(self):
+        """페인트볼 3개 → 슈퍼 페인트볼 1개 교환, 반환값: 성공 여부"""
+        return self._update(
+            Q(paintball_count__gte=PAINTBALLS_PER_SUPER),
+            paintball_count=F('paintball_count') - PAINTBALLS_PER_SUPER,
+            super_paintball_count=F('super_paintball_count') + 1,
+        ) is not None
+
+    def refund_paintball(self, paintball_type):
+        """사용한 페인트볼 되돌리기 (페인트볼 점령 저장 실패), 반환값: 변경 후 값 dict"""
+        field = 'super_paintball_count' if paintball_type == 'super' else 'paintball_count'
+        return self._update(**{field: F(field) + 1})
+
+    # async 버전 (consumer) - 같은 UPDATE를 DB thread에서 실행 (consumer와 같이 실행 전후로 오래된 DB 연결 정리)
+
+    async def aadd_gauge(self, amount):
+        return await database_sync_to_async(self.add_gauge)(amount)
+
+    async def aadd_paintballs(self, count):
+        return await database_sync_to_async(self.add_paintballs)(count)
+
+    async def ause_paintball(self):
+        return await database_sync_to_async(self.use_paintball)()
+
+    async def ause_super_paintball(self):
+        return await database_sync_to_async(self.use_super_paintball)()
+
+    async def aexchange_paintballs_to_super(self):
+        return await database_sync_to_async(self.exchange_paintballs_to_super)()
+
+    async def arefund_paintball(self, paintball_type):
+        return await database_sync_to_async(self.refund_paintball)(paintball_type)
+
+    def _update(self, condition=Q(), **values):
+        """
+        조건이 맞을 때만 UPDATE 후 같은 트랜잭션에서 변경된 행을 다시 읽음
+        (UPDATE가 잡은 행 잠금이 commit까지 유지되므로 읽은 값은 이 UPDATE의 결과)
+
+        Returns:
+            변경 후 {paintball_gauge, paintball_count, super_paintball_count}, 조건이 맞지 않으면 None
+        """
+        with transaction.atomic():
+            updated = Participant.objects.filter(condition, id=self.participant.id).update(**values)
+            if not updated:
+                return None
+            row = Participant.objects.select_for_update().filter(
+                id=self.participant.id
+            ).values_list(*INVENTORY_FIELDS).get()
+
+        inventory = dict(zip(INVENTORY_FIELDS, row))
+        for field, value in inventory.items():
+            setattr(self.participant, field, value)
+        return inventory
+
+
+class TrackIngestService:
+    """
+    끊겼던 동안의 GPS 트랙을 한 번에 반영
+    - 트랙 전체를 numpy로 처리 (H3 변환, 거리, 점령 조건)
+    - 점령은 저장소 claim_many 한 번 (같은 version), 게이지/위치 갱신과 함께 한 트랜잭션
+    - 점령한 hex로 막힌 루프 내부도 채움 (WebSocket/REST 어느 경로로 보내도 같은 결과)
+    - 기록 중이 아니면 점령하지 않고 거리/위치만 계산
+    - 클라이언트 timestamp는 검증 후 사용: 유한하지 않거나 미래이거나 게임/기록 시작, 마지막 저장 위치보다
+      이른 점, 직전 점에서 TRACK_MAX_SPEED_MPS보다 빨라야 닿는 점은 제외 (조작한 트랙으로 체류 조건을 채우지 못하도록)
+    """
+
+    def __init__(self, room, participant, team_cells=None):
+        """
+        Args:
+            team_cells: 점령 전 팀 cell(정수) 집합 - 방 상태가 있으면 넘겨서 저장소를 다시 읽지 않음
+        """
+        self.room = room
+        self.participant = participant
+        self.team_cells = team_cells
+        self.store = create_ownership_store(room.id)
+
+    def ingest(self, points):
+        """
+        Args:
+            points: [{lat, lng, timestamp}, ...] 또는 [[lat, lng, timestamp(ms)], ...]
+
+        Returns:
+            {sample_count, rejected_count, distance_meters, claimed_h3_ids, version, gauge_added, loop_fills}
+            rejected_count: 형식/시간/속도 검증에서 제외된 점 수
+            loop_fills: [{h3_ids, version, claimed_at}, ...] 루프 내부로 자동 점령된 hex (점령 순서)
+
+        Raises:
+            TrackError: points 형식 오류 또는 TRACK_BATCH_MAX_POINTS 초과
+        """
+        if isinstance(points, (list, tuple)) and len(points) > settings.TRACK_BATCH_MAX_POINTS:
+            raise TrackError(f'Too many points (max {settings.TRACK_BATCH_MAX_POINTS})')
+
+        not_before, origin = self._track_start()
+        not_after = timezone.now().timestamp() + settings.TRACK_MAX_CLOCK_SKEW_SEC
+
+        # 트랙 전체 H3 변환/점령 조건 계산은 compute 프로세스에서 (DB thread가 GIL을 오래 잡지 않도록)
+        try:
+            track = compute_pool.call(
+                process_track,
+                points,
+                self.room.h3_resolution,
+                settings.H3_CLAIM_MIN_SAMPLES,
+                settings.H3_CLAIM_MIN_DWELL_SEC,
+                not_before,
+                not_after,
+                settings.TRACK_MAX_SPEED_MPS,
+                origin,
+            )
+        except ComputeTimeout:
+            raise TrackError('Track processing timed out')
+        result = {
+            'sample_count': track['sample_count'],
+            'rejected_count': track['rejected_count'],
+            'distance_meters': track['distance_meters'],
+            'claimed_h3_ids': [],
+            'version': None,
+            'gauge_added': 0,
+            'loop_fills': [],
+        }
+        if not track['sample_count']:
+            return result
+
+        participant = self.participant
+        # 같은 hex 연속 점령은 무시 (consumer의 last_claimed_h3_id 규칙), 게임 구역 밖 hex 제외
+        claims = []
+        if participant.is_recording:
+            for h3_id in track['claims']:
+                if not claims or claims[-1] != h3_id:
+                    claims.append(h3_id)
+            inside = set(self._filter_in_bounds(set(claims)))
+            claims = [h3_id for h3_id in claims if h3_id in inside]
+
+        with transaction.atomic():
+            if claims:
+                claimed_h3_ids, version = self.store.claim_many(
+                    claims, participant.team, str(participant.user_id), timezone.now()
+                )
+                # 점령되지 않은 방문(이미 우리 팀 땅, 같은 트랙에서 다시 방문)은 게이지로
+                remaining = Counter(claims)
+                remaining.subtract(claimed_h3_ids)
+                gauge = SAME_TEAM_GAUGE * sum(remaining.values())
+                if gauge:
+                    InventoryService(participant).add_gauge(gauge)
+                result.update(claimed_h3_ids=claimed_h3_ids, version=version, gauge_added=gauge)
+            self._update_last_location(track['last'])
+
+        if result['claimed_h3_ids']:
+            CLAIMS.inc(len(result['claimed_h3_ids']), source='track')
+            result['loop_fills'] = self._fill_loops(result['claimed_h3_ids'])
+        logger.info(
+            "Track ingested: room=%s participant=%s samples=%d rejected=%d distance=%.1f claimed=%d loop_fills=%d",
+            self.room.id,
+            participant.id,
+            track['sample_count'],
+            track['rejected_count'],
+            track['distance_meters'],
+            len(result['claimed_h3_ids']),
+            len(result['loop_fills']),
+        )
+        return result
+
+    def _track_start(self):
+        """
+        트랙에서 받아들일 가장 이른 시각과 그 직전 위치 (DB 기준, 메모리의 participant 값은 오래됐을 수 있음)
+
+        Returns:
+            (not_before epoch seconds, origin (timestamp, lat, lng) 또는 None)
+        """
+        last_at, last_lat, last_lng = Participant.objects.filter(id=self.participant.id).values_list(
+            'last_location_at', 'last_lat', 'last_lng'
+        ).get()
+        starts = [self.room.start_date]
+        if self.participant.is_recording:
+            starts.append(
+                RunningRecord.objects.filter(participant_id=self.participant.id, ended_at__isnull=True)
+                .order_by('-started_at')
+                .values_list('started_at', flat=True)
+                .first()
+            )
+        origin = None
+        if last_at is not None:
+            starts.append(last_at)
+            if last_lat is not None and last_lng is not None:
+                origin = (last_at.timestamp(), float(last_lat), float(last_lng))
+        not_before = max(start for start in starts if start is not None)
+        return not_before.timestamp(), origin
+
+    def _fill_loops(self, claimed_h3_ids):
+        """
+        새로 점령한 hex마다 루프 감지 → 내부 미점령 hex 점령 (consumer 실시간 점령과 같은 규칙)
+
+        Returns:
+            [{h3_ids, version, claimed_at}, ...]
+        """
+        participant = self.participant
+        team = participant.team
+        team_cells = self.team_cells
+        if team_cells is None:
+            team_cells = [
+                h3_str_to_int(h3_id) for h3_id, ownership in self.store.load().items()
+                if ownership.get('team') == team
+            ]
+        graph = TeamGraph(team_cells)
+        for h3_id in claimed_h3_ids:
+            graph.add(h3_str_to_int(h3_id))
+
+        detector = LoopDetector(str(self.room.id))
+        fills = []
+        for h3_id in claimed_h3_ids:
+            cell = h3_str_to_int(h3_id)
+            # 팀 이웃이 한 묶음뿐이면 새로 막히는 영역이 없음
+            if not graph.may_enclose(cell):
+                continue
+            region = detector.region_cells(graph, h3_id)
+            try:
+                loop_result = compute_pool.call(
+                    detect_loop_in_region, region, cell, detector.max_radius, detector.max_interior
+                )
+            except ComputeTimeout:
+                LOOPS.inc(result='timeout')
+                logger.warning("Loop detection skipped (timeout): room=%s h3_id=%s", self.room.id, h3_id)
+                continue
+            LOOPS.inc(result='completed' if loop_result else 'none')
+            if not loop_result:
+                continue
+
+            to_claim = self._filter_in_bounds(
+                [interior for interior in loop_result['interior_h3_ids'] if h3_str_to_int(interior) not in graph]
+            )
+            if not to_claim:
+                continue
+            claimed_at = timezone.now()
+            filled, version = self.store.claim_unowned(
+                to_claim, team, str(participant.user_id), claimed_at, claimed_by='loop'
+            )
+            if not filled:
+                continue
+            for filled_h3_id in filled:
+                graph.add(h3_str_to_int(filled_h3_id))
+            CLAIMS.inc(len(filled), source='loop')
+            fills.append({'h3_ids': filled, 'version': version, 'claimed_at': claimed_at})
+        return fills
+
+    def _filter_in_bounds(self, h3_ids):
+        """게임 구역 안의 hex만 (RoomState.filter_in_bounds와 같은 규칙)"""
+        game_area = self.room.game_area
+        area_cells = get_area_cells(game_area)
+        if area_cells is not None:
+            return area_cells.filter_h3(h3_ids)
+        area_bounds = get_area_bounds(game_area)
+        if area_bounds is None:
+            return list(h3_ids)
+        return area_bounds.filter_h3(h3_ids)
+
+    def _update_last_location(self, last):
+        """트랙 마지막 점이 저장된 위치보다 최신일 때만 반영 (지난 구간 재전송으로 위치가 되돌아가지 않도록)"""
+        timestamp = datetime.fromtimestamp(last['timestamp'], tz=dt_timezone.utc)
+        updated = Participant.objects.filter(id=self.participant.id).exclude(
+            last_location_at__gte=timestamp
+        ).update(
+            last_lat=last['lat'],
+            last_lng=last['lng'],
+            last_h3_id=last['h3_id'],
+            last_location_at=timestamp,
+        )
+        if updated:
+            self.participant.last_lat = last['lat']
+            self.participant.last_lng = last['lng']
+            self.participant.last_h3_id = last['h3_id']
+            self.participant.last_location_at = timestamp
@@ -0,0 +1,20 @@
+"""
+Rooms signals
+GameArea 수정/삭제 시 미리 계산된 구역 cell 집합 갱신
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.hexmap.area_cells import area_cells_cache
+from .models import GameArea
+
+
+@receiver(post_save, sender=GameArea)
+def refresh_game_area_cells(sender, instance, **kwargs):
+    """구역 경계/해상도가 바뀌었을 수 있으므로 커밋 후 다시 polyfill"""
+    transaction.on_commit(lambda: area_cells_cache.refresh(instance))
+
+
+@receiver(post_delete, sender=GameArea)
+def forget_game_area_cells(sender, instance, **kwargs):
+    area_cells_cache.forget(instance.id)
@@ -0,0 +1,61 @@
+"""
+테스트용 게임 생성 (서울시청 주변 게임 구역, H3 해상도 9)
+"""
+from datetime import timedelta
+import h3
+from django.utils import timezone
+from apps.accounts.models import User
+from apps.rooms.models import GameArea, Room, Participant
+
+CENTER = (37.5665, 126.9780)
+RESOLUTION = 9
+AREA_RING = [[126.95, 37.55], [127.0, 37.55], [127.0, 37.58], [126.95, 37.58], [126.95, 37.55]]
+
+# 중심 hex와 둘러싼 6개 hex (순서대로 이어짐)
+ORIGIN_H3 = h3.geo_to_h3(*CENTER, RESOLUTION)
+RING_H3 = h3.hex_ring(ORIGIN_H3, 1)
+
+
+def ordered_ring(origin=ORIGIN_H3):
+    """origin을 둘러싼 hex들을 이웃끼리 이어지는 순서로 (트랙/루프 테스트용)"""
+    ring = list(h3.hex_ring(origin, 1))
+    ordered = [ring.pop()]
+    while ring:
+        next_h3 = next(h3_id for h3_id in ring if h3.h3_indexes_are_neighbors(ordered[-1], h3_id))
+        ring.remove(next_h3)
+        ordered.append(next_h3)
+    return ordered
+
+
+def create_game(teams=('A', 'B'), status='active', **participant_fields):
+    """
+    게임 구역, 방, 팀별 참가자 생성
+
+    Returns:
+        (room, [participant, ...]) - participant 순서는 teams 순서
+    """
+    area = GameArea.objects.create(
+        name='시청 광장',
+        city='서울',
+        bounds={'type': 'Polygon', 'coordinates': [AREA_RING]},
+        h3_resolution=RESOLUTION,
+    )
+    users = [
+        User.objects.create_user(username=f'runner{i}', email=f'runner{i}@example.com', password='pw')
+        for i in range(len(teams))
+    ]
+    now = timezone.now()
+    room = Room.objects.create(
+        name='테스트 방',
+        creator=users[0],
+        total_participants=len(teams),
+        start_date=now,
+        end_date=now + timedelta(hours=1),
+        game_area=area,
+        status=status,
+    )
+    participants = [
+        Participant.objects.create(room=room, user=user, team=team, is_host=(i == 0), **participant_fields)
+        for i, (user, team) in enumerate(zip(users, teams))
+    ]
+    return room, participants
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+from .factories import ORIGIN_H3, RING_H3
+
+
+class HexOwnershipMigrationTests(TransactionTestCase):
+    """Room.current_hex_ownerships JSON → HexOwnership 행 복사와 집계/버전 backfill (0004~0006)"""
+
+    migrate_from = [('accounts', '0003_user_rating_fields'), ('rooms', '0003_participant_game_result_fields')]
+    migrate_to = [('rooms', '0006_ownership_version')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+        User = apps.get_model('accounts', 'User')
+        GameArea = apps.get_model('rooms', 'GameArea')
+        Room = apps.get_model('rooms', 'Room')
+        Participant = apps.get_model('rooms', 'Participant')
+
+        self.runner_a = User.objects.create(username='runner0', email='runner0@example.com')
+        self.runner_b = User.objects.create(username='runner1', email='runner1@example.com')
+        area = GameArea.objects.create(name='시청 광장', city='서울')
+        now = timezone.now()
+        ring = sorted(RING_H3)
+        self.claimed_at = now - timedelta(minutes=5)
+        ownerships = {
+            ORIGIN_H3: {'team': 'A', 'user_id': str(self.runner_a.id), 'claimed_at': self.claimed_at.isoformat()},
+            ring[0]: {'team': 'A', 'user_id': str(self.runner_a.id), 'claimed_by': 'loop'},
+            ring[1]: {'team': 'B', 'user_id': str(self.runner_b.id)},
+            # 탈퇴한 사용자, 알 수 없는 팀
+            ring[2]: {'team': 'B', 'user_id': '00000000-0000-0000-0000-000000000000'},
+            ring[3]: {'team': 'C', 'user_id': str(self.runner_b.id)},
+        }
+        self.room = Room.objects.create(
+            name='테스트 방', creator=self.runner_a, start_date=now, end_date=now + timedelta(hours=1),
+            game_area=area, invite_code='MIGRATE1', status='active', current_hex_ownerships=ownerships,
+        )
+        self.empty_room = Room.objects.create(
+            name='빈 방', creator=self.runner_a, start_date=now, end_date=now + timedelta(hours=1),
+            game_area=area, invite_code='MIGRATE2',
+        )
+        for user, team in ((self.runner_a, 'A'), (self.runner_b, 'B')):
+            Participant.objects.create(room=self.room, user=user, team=team)
+        self.ring = ring
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        self.apps = executor.loader.project_state(self.migrate_to).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_ownerships_copied_to_rows(self):
+        HexOwnership = self.apps.get_model('rooms', 'HexOwnership')
+
+        rows = {row.h3_id: row for row in HexOwnership.objects.filter(room_id=self.room.id)}
+
+        self.assertEqual(set(rows), {ORIGIN_H3, *self.ring[:3]})
+        self.assertEqual(rows[ORIGIN_H3].team, 'A')
+        self.assertEqual(rows[ORIGIN_H3].user_id, self.runner_a.id)
+        self.assertEqual(rows[ORIGIN_H3].claimed_at, self.claimed_at)
+        self.assertEqual(rows[self.ring[0]].claimed_by, 'loop')
+        self.assertIsNone(rows[self.ring[2]].user_id)
+        self.assertTrue(all(row.version == 1 for row in rows.values()))
+
+    def test_counts_and_versions_backfilled(self):
+        Room = self.apps.get_model('rooms', 'Room')
+        Participant = self.apps.get_model('rooms', 'Participant')
+
+        room = Room.objects.get(id=self.room.id)
+        self.assertEqual((room.team_a_hex_count, room.team_b_hex_count, room.ownership_version), (2, 2, 1))
+        self.assertEqual(
+            dict(Participant.objects.filter(room_id=self.room.id).values_list('user_id', 'hexes_claimed')),
+            {self.runner_a.id: 2, self.runner_b.id: 1},
+        )
+        empty_room = Room.objects.get(id=self.empty_room.id)
+        self.assertEqual((empty_room.team_a_hex_count, empty_room.ownership_version), (0, 0))
@@ -0,0 +1,150 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.rooms.models import Room, Participant
+from apps.rooms.ownership import HexOwnershipStore, create_ownership_reader
+from apps.rooms.redis_ownership import RedisHexOwnershipStore
+from .factories import ORIGIN_H3, ordered_ring, create_game
+
+
+class HexOwnershipStoreTests(TestCase):
+    def setUp(self):
+        self.room, (self.runner_a, self.runner_b) = create_game()
+        self.store = HexOwnershipStore(self.room.id)
+        self.ring = ordered_ring()
+        self.now = timezone.now()
+
+    def claim(self, h3_id, expected, participant):
+        return self.store.compare_and_set(
+            h3_id, expected, participant.team, str(participant.user_id), self.now
+        )
+
+    def assert_counts(self, version, team_a, team_b, hexes_a, hexes_b):
+        room = Room.objects.get(id=self.room.id)
+        self.assertEqual(room.ownership_version, version)
+        self.assertEqual((room.team_a_hex_count, room.team_b_hex_count), (team_a, team_b))
+        self.assertEqual(Participant.objects.get(id=self.runner_a.id).hexes_claimed, hexes_a)
+        self.assertEqual(Participant.objects.get(id=self.runner_b.id).hexes_claimed, hexes_b)
+
+    def test_compare_and_set_claims_unowned_hex(self):
+        version = self.claim(ORIGIN_H3, None, self.runner_a)
+
+        self.assertEqual(version, 1)
+        ownership = self.store.get(ORIGIN_H3)
+        self.assertEqual(ownership['team'], 'A')
+        self.assertEqual(ownership['user_id'], str(self.runner_a.user_id))
+        self.assertEqual(ownership['version'], 1)
+        self.assert_counts(1, 1, 0, 1, 0)
+
+    def test_compare_and_set_flips_when_expected_matches(self):
+        self.claim(ORIGIN_H3, None, self.runner_a)
+
+        version = self.claim(ORIGIN_H3, self.store.get(ORIGIN_H3), self.runner_b)
+
+        self.assertEqual(version, 2)
+        self.assertEqual(self.store.get(ORIGIN_H3)['team'], 'B')
+        self.assert_counts(2, 0, 1, 0, 1)
+
+    def test_compare_and_set_conflict_changes_nothing(self):
+        self.claim(ORIGIN_H3, None, self.runner_a)
+
+        # 미점령으로 알고 있었지만 그 사이 점령됨
+        self.assertIsNone(self.claim(ORIGIN_H3, None, self.runner_b))
+        # 알고 있던 소유자가 현재 소유자와 다름
+        stale = {'team': 'B', 'user_id': str(self.runner_b.user_id)}
+        self.assertIsNone(self.claim(ORIGIN_H3, stale, self.runner_b))
+
+        self.assertEqual(self.store.get(ORIGIN_H3)['team'], 'A')
+        self.assert_counts(1, 1, 0, 1, 0)
+
+    def test_claim_unowned_skips_owned_hexes(self):
+        self.claim(self.ring[0], None, self.runner_b)
+
+        claimed, version = self.store.claim_unowned(
+            self.ring[:3], 'A', str(self.runner_a.user_id), self.now, claimed_by='loop'
+        )
+
+        self.assertEqual(sorted(claimed), sorted(self.ring[1:3]))
+        self.assertEqual(version, 2)
+        for h3_id in self.ring[1:3]:
+            ownership = self.store.get(h3_id)
+            self.assertEqual((ownership['team'], ownership['version']), ('A', 2))
+            self.assertEqual(ownership['claimed_by'], 'loop')
+        self.assertEqual(self.store.get(self.ring[0])['team'], 'B')
+        self.assert_counts(2, 2, 1, 2, 1)
+
+    def test_claim_unowned_without_unowned_hexes_keeps_version(self):
+        self.claim(ORIGIN_H3, None, self.runner_b)
+
+        result = self.store.claim_unowned([ORIGIN_H3], 'A', str(self.runner_a.user_id), self.now)
+
+        self.assertEqual(result, ([], None))
+        self.assert_counts(1, 0, 1, 0, 1)
+
+    def test_claim_many_flips_enemy_and_keeps_own_team(self):
+        self.claim(self.ring[0], None, self.runner_a)
+        self.claim(self.ring[1], None, self.runner_b)
+
+        claimed, version = self.store.claim_many(
+            [self.ring[0], self.ring[1], self.ring[2], self.ring[2]],
+            'A', str(self.runner_a.user_id), self.now,
+        )
+
+        self.assertEqual(claimed, [self.ring[1], self.ring[2]])
+        self.assertEqual(version, 3)
+        self.assertEqual(self.store.get(self.ring[0])['version'], 1)
+        self.assertEqual(self.store.get(self.ring[1])['team'], 'A')
+        self.assert_counts(3, 3, 0, 3, 0)
+        self.assertEqual(len(self.store.load()), 3)
+
+    def test_claim_many_without_changes_keeps_version(self):
+        self.claim(ORIGIN_H3, None, self.runner_a)
+
+        result = self.store.claim_many([ORIGIN_H3], 'A', str(self.runner_a.user_id), self.now)
+
+        self.assertEqual(result, ([], None))
+        self.assert_counts(1, 1, 0, 1, 0)
+
+    def test_counts_reads_room_aggregates(self):
+        self.claim(ORIGIN_H3, None, self.runner_b)
+
+        room = Room.objects.get(id=self.room.id)
+        self.assertEqual(self.store.counts(room), (1, {'A': 0, 'B': 1}))
+
+    def test_changes_since_returns_current_state_of_changed_hexes(self):
+        self.claim(ORIGIN_H3, None, self.runner_a)
+        self.store.claim_unowned(self.ring[:2], 'A', str(self.runner_a.user_id), self.now)
+        self.claim(ORIGIN_H3, self.store.get(ORIGIN_H3), self.runner_b)
+
+        version, changes = self.store.changes_since(1, limit=10)
+
+        self.assertEqual(version, 3)
+        self.assertCountEqual(changes, [
+            [ORIGIN_H3, 'B', str(self.runner_b.user_id)],
+            [self.ring[0], 'A', str(self.runner_a.user_id)],
+            [self.ring[1], 'A', str(self.runner_a.user_id)],
+        ])
+        self.assertEqual(self.store.changes_since(3, limit=10), (3, []))
+
+    def test_changes_since_falls_back_to_snapshot(self):
+        self.store.claim_unowned(self.ring, 'A', str(self.runner_a.user_id), self.now)
+
+        # 변경이 limit보다 많거나 아직 없는 버전
+        self.assertEqual(self.store.changes_since(0, limit=len(self.ring) - 1), (1, None))
+        self.assertEqual(self.store.changes_since(5, limit=100), (1, None))
+
+    def test_participant_counts(self):
+        self.store.claim_unowned(self.ring[:3], 'A', str(self.runner_a.user_id), self.now)
+        self.claim(ORIGIN_H3, None, self.runner_b)
+
+        self.assertEqual(self.store.participant_counts(), {
+            str(self.runner_a.user_id): 3,
+            str(self.runner_b.user_id): 1,
+        })
+
+    @override_settings(HEX_OWNERSHIP_BACKEND='redis')
+    def test_reader_uses_configured_store_only_while_active(self):
+        self.assertIsInstance(create_ownership_reader(self.room), RedisHexOwnershipStore)
+        for status in ('ready', 'finished'):
+            with self.subTest(status=status):
+                self.room.status = status
+                self.assertIsInstance(create_ownership_reader(self.room), HexOwnershipStore)
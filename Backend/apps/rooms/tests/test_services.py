@@ -0,0 +1,127 @@
+from datetime import timedelta
+import h3
+from django.test import TestCase
+from django.utils import timezone
+from apps.rooms.models import Participant, Room
+from apps.rooms.services import InventoryService, TrackIngestService
+from .factories import CENTER, ORIGIN_H3, RESOLUTION, create_game
+
+
+class InventoryServiceTests(TestCase):
+    def setUp(self):
+        _, (self.participant, _) = create_game()
+
+    def set_inventory(self, **fields):
+        Participant.objects.filter(id=self.participant.id).update(**fields)
+        self.participant.refresh_from_db()
+
+    def stored(self):
+        return Participant.objects.values(
+            'paintball_gauge', 'paintball_count', 'super_paintball_count'
+        ).get(id=self.participant.id)
+
+    def test_add_gauge_rolls_over_into_paintballs(self):
+        self.set_inventory(paintball_gauge=90, paintball_count=1)
+
+        inventory = InventoryService(self.participant).add_gauge(250)
+
+        expected = {'paintball_gauge': 40, 'paintball_count': 4, 'super_paintball_count': 0}
+        self.assertEqual(inventory, expected)
+        self.assertEqual(self.stored(), expected)
+        self.assertEqual(self.participant.paintball_count, 4)
+
+    def test_add_gauge_keeps_concurrent_changes(self):
+        stale = Participant.objects.get(id=self.participant.id)
+        # 다른 요청이 그 사이 페인트볼을 지급
+        InventoryService(self.participant).add_paintballs(2)
+
+        InventoryService(stale).add_gauge(100)
+
+        self.assertEqual(self.stored()['paintball_count'], 3)
+        self.assertEqual(stale.paintball_count, 3)
+
+    def test_use_paintball_requires_stock(self):
+        service = InventoryService(self.participant)
+
+        self.assertFalse(service.use_paintball())
+        self.assertFalse(service.use_super_paintball())
+
+        self.set_inventory(paintball_count=1, super_paintball_count=1)
+        self.assertTrue(service.use_paintball())
+        self.assertTrue(service.use_super_paintball())
+        self.assertFalse(service.use_paintball())
+        self.assertEqual(self.stored(), {'paintball_gauge': 0, 'paintball_count': 0, 'super_paintball_count': 0})
+
+    def test_exchange_requires_three_paintballs(self):
+        self.set_inventory(paintball_count=2)
+        service = InventoryService(self.participant)
+
+        self.assertFalse(service.exchange_paintballs_to_super())
+        self.assertEqual(self.stored()['paintball_count'], 2)
+
+        self.set_inventory(paintball_count=4)
+        self.assertTrue(service.exchange_paintballs_to_super())
+        self.assertEqual(self.stored(), {'paintball_gauge': 0, 'paintball_count': 1, 'super_paintball_count': 1})
+        self.assertEqual(self.participant.super_paintball_count, 1)
+
+    def test_refund_paintball_by_type(self):
+        service = InventoryService(self.participant)
+
+        service.refund_paintball('normal')
+        service.refund_paintball('super')
+
+        self.assertEqual(self.stored(), {'paintball_gauge': 0, 'paintball_count': 1, 'super_paintball_count': 1})
+
+
+class TrackIngestServiceTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        room, (self.participant, _) = create_game(is_recording=True)
+        Room.objects.filter(id=room.id).update(start_date=self.now - timedelta(hours=1))
+        self.room = Room.objects.select_related('game_area').get(id=room.id)
+        # 30분 전 시청 hex에서 마지막 위치 저장
+        lat, lng = h3.h3_to_geo(ORIGIN_H3)
+        Participant.objects.filter(id=self.participant.id).update(
+            last_lat=lat, last_lng=lng, last_h3_id=ORIGIN_H3, last_location_at=self.now - timedelta(minutes=30)
+        )
+
+    def points(self, h3_id, start, count=5):
+        lat, lng = h3.h3_to_geo(h3_id)
+        return [
+            {'lat': lat, 'lng': lng, 'timestamp': (start + timedelta(seconds=i)).isoformat()}
+            for i in range(count)
+        ]
+
+    def ingest(self, points):
+        return TrackIngestService(self.room, self.participant).ingest(points)
+
+    def test_claims_valid_track(self):
+        result = self.ingest(self.points(ORIGIN_H3, self.now - timedelta(minutes=10)))
+
+        self.assertEqual(result['claimed_h3_ids'], [ORIGIN_H3])
+        self.assertEqual(result['rejected_count'], 0)
+
+    def test_rejects_points_outside_allowed_time(self):
+        for start in (
+            self.now - timedelta(minutes=40),  # 마지막 저장 위치보다 이전
+            self.now - timedelta(hours=2),  # 게임 시작 전
+            self.now + timedelta(minutes=5),  # 미래
+        ):
+            with self.subTest(start=start):
+                result = self.ingest(self.points(ORIGIN_H3, start))
+
+                self.assertEqual(result['claimed_h3_ids'], [])
+                self.assertEqual((result['sample_count'], result['rejected_count']), (0, 5))
+
+    def test_rejects_jump_from_last_location(self):
+        # 게임 구역 안, 약 1.8km 서쪽
+        far_h3 = h3.geo_to_h3(CENTER[0], CENTER[1] - 0.02, RESOLUTION)
+
+        result = self.ingest(self.points(far_h3, self.now - timedelta(minutes=30) + timedelta(seconds=1)))
+
+        self.assertEqual(result['claimed_h3_ids'], [])
+        self.assertEqual(result['rejected_count'], 5)
+        # 10분 뒤라면 닿을 수 있는 거리
+        result = self.ingest(self.points(far_h3, self.now - timedelta(minutes=20)))
+
+        self.assertEqual(result['claimed_h3_ids'], [far_h3])
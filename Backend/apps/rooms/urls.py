@@ -8,6 +8,7 @@ urlpatterns = [
     # 게임 구역 API
     path('game-areas/', views.GameAreaListView.as_view(), name='game-area-list'),
     path('game-areas/<uuid:id>/', views.GameAreaDetailView.as_view(), name='game-area-detail'),
+    path('game-areas/<uuid:id>/cells/', views.game_area_cells, name='game-area-cells'),
     
     # 방 API
     path('rooms/', views.RoomListCreateView.as_view(), name='room-list-create'),
@@ -19,6 +20,7 @@ urlpatterns = [
     path('rooms/<uuid:id>/start/', views.start_room, name='room-start'),
     path('rooms/<uuid:id>/invite/', views.invite_to_room, name='room-invite'),
     path('rooms/<uuid:id>/attendance/', views.attendance_status, name='room-attendance'),
+    path('rooms/<uuid:id>/track/', views.ingest_track, name='room-track'),
     
     # 러닝 기록 API
     path('records/', views.RunningRecordListView.as_view(), name='record-list'),
@@ -47,6 +47,36 @@ class GameAreaDetailView(generics.RetrieveAPIView):
     lookup_field = 'id'
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def game_area_cells(request, id):
+    """
+    게임 구역의 플레이 가능한 hex 목록 (미리 계산된 cell 집합)
+    GET /api/game-areas/{id}/cells/
+    - cells는 h3 compact 형식 (클라이언트에서 h3_resolution으로 uncompact)
+    """
+    from apps.hexmap.area_cells import get_area_cells
+    
+    try:
+        game_area = GameArea.objects.get(id=id, is_active=True)
+    except GameArea.DoesNotExist:
+        return Response({'error': 'NOT_FOUND', 'message': '게임 구역을 찾을 수 없습니다.'}, 
+                       status=status.HTTP_404_NOT_FOUND)
+    
+    area_cells = get_area_cells(game_area)
+    if area_cells is None:
+        return Response({'error': 'CELLS_UNAVAILABLE', 'message': '게임 구역의 hex 목록을 만들 수 없습니다.'}, 
+                       status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    
+    return Response({
+        'game_area_id': str(game_area.id),
+        'h3_resolution': area_cells.resolution,
+        'version': area_cells.version,
+        'cell_count': len(area_cells),
+        'cells': area_cells.compacted(),
+    })
+
+
 # ==================== 방 API ====================
 
 class RoomListCreateView(generics.ListCreateAPIView):
@@ -228,17 +258,18 @@ def join_room(request):
     # WebSocket으로 방 업데이트 브로드캐스트
     from channels.layers import get_channel_layer
     from asgiref.sync import async_to_sync
+    from apps.realtime.events import group_event
     channel_layer = get_channel_layer()
     if channel_layer:
         async_to_sync(channel_layer.group_send)(
             f'room_{room.id}',
-            {
+            group_event({
                 'type': 'room_updated',
                 'event': 'participant_joined',
                 'room_id': str(room.id),
                 'participant': ParticipantSerializer(participant).data,
                 'room': RoomDetailSerializer(room, context={'request': request}).data,
-            }
+            })
         )
     
     return Response({
@@ -298,17 +329,18 @@ def leave_room(request, id):
     # WebSocket으로 방 업데이트 브로드캐스트
     from channels.layers import get_channel_layer
     from asgiref.sync import async_to_sync
+    from apps.realtime.events import group_event
     channel_layer = get_channel_layer()
     if channel_layer:
         async_to_sync(channel_layer.group_send)(
             f'room_{room.id}',
-            {
+            group_event({
                 'type': 'room_updated',
                 'event': 'participant_left',
                 'room_id': str(room.id),
                 'user_id': str(participant_user_id),
                 'room': RoomDetailSerializer(room, context={'request': request}).data,
-            }
+            })
         )
     
     return Response({'message': '방에서 나갔습니다.'})
@@ -366,17 +398,18 @@ def change_team(request, id):
     # WebSocket으로 방 업데이트 브로드캐스트
     from channels.layers import get_channel_layer
     from asgiref.sync import async_to_sync
+    from apps.realtime.events import group_event
     channel_layer = get_channel_layer()
     if channel_layer:
         async_to_sync(channel_layer.group_send)(
             f'room_{room.id}',
-            {
+            group_event({
                 'type': 'room_updated',
                 'event': 'participant_changed_team',
                 'room_id': str(room.id),
                 'participant': ParticipantSerializer(participant).data,
                 'room': RoomDetailSerializer(room, context={'request': request}).data,
-            }
+            })
         )
     
     return Response({
@@ -431,16 +464,17 @@ def start_room(request, id):
     # WebSocket으로 게임 시작 브로드캐스트
     from channels.layers import get_channel_layer
     from asgiref.sync import async_to_sync
+    from apps.realtime.events import group_event
     channel_layer = get_channel_layer()
     if channel_layer:
         async_to_sync(channel_layer.group_send)(
             f'room_{room.id}',
-            {
+            group_event({
                 'type': 'room_updated',
                 'event': 'game_started',
                 'room_id': str(room.id),
                 'room': RoomDetailSerializer(room, context={'request': request}).data,
-            }
+            })
         )
     
     # 게임 종료 태스크를 방 생성 시 설정된 end_date 시간에 실행하도록 예약
@@ -562,6 +596,107 @@ def attendance_status(request, id):
     })
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def ingest_track(request, id):
+    """
+    끊겼던 동안의 GPS 트랙 일괄 전송
+    POST /api/rooms/{id}/track/
+    
+    Request body: {"points": [{"lat", "lng", "timestamp"}, ...]}
+    - 트랙 전체를 한 번에 계산 (H3 변환, 거리, 점령 조건), 점령은 한 트랜잭션으로 저장
+    - 점령한 hex로 막힌 루프 내부도 채움 (WebSocket location_batch와 같은 서비스)
+    - 거리는 진행 중인 러닝 기록에 누적
+    """
+    from django.db.models import F
+    from apps.hexmap.track import TrackError
+    from .ownership import create_ownership_store
+    from .services import TrackIngestService, loop_complete_payload
+    
+    try:
+        room = Room.objects.select_related('game_area').get(id=id)
+    except Room.DoesNotExist:
+        return Response({'error': 'NOT_FOUND', 'message': '방을 찾을 수 없습니다.'}, 
+                       status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        participant = Participant.objects.get(room=room, user=request.user)
+    except Participant.DoesNotExist:
+        return Response({'error': 'NOT_MEMBER', 'message': '방의 멤버가 아닙니다.'}, 
+                       status=status.HTTP_403_FORBIDDEN)
+    
+    if room.status != 'active':
+        return Response({'error': 'ROOM_NOT_ACTIVE', 'message': '진행 중인 게임이 아닙니다.'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        result = TrackIngestService(room, participant).ingest(request.data.get('points'))
+    except TrackError as e:
+        return Response({'error': 'INVALID_TRACK', 'message': str(e)}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    if participant.is_recording and result['distance_meters'] > 0:
+        RunningRecord.objects.filter(participant=participant, ended_at__isnull=True).update(
+            distance_meters=F('distance_meters') + result['distance_meters']
+        )
+    
+    if result['claimed_h3_ids']:
+        # 점령 브로드캐스트 (방 명령 큐 밖에서 저장했으므로 consumer들은 모르는 version을 보고 점령 상태를 다시 로드)
+        from channels.layers import get_channel_layer
+        from asgiref.sync import async_to_sync
+        from apps.realtime.events import group_event
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            room.refresh_from_db()
+            _, team_counts = create_ownership_store(room.id).counts(room)
+            now = timezone.now().isoformat()
+            async_to_sync(channel_layer.group_send)(
+                f'room_{room.id}',
+                group_event({
+                    'type': 'hexes_claimed',
+                    'participant_id': str(participant.id),
+                    'team': participant.team,
+                    'h3_ids': result['claimed_h3_ids'],
+                    'version': result['version'],
+                    'timestamp': now
+                }, version=result['version'])
+            )
+            for fill in result['loop_fills']:
+                async_to_sync(channel_layer.group_send)(
+                    f'room_{room.id}',
+                    group_event(
+                        loop_complete_payload(
+                            participant, room.h3_resolution, fill['h3_ids'], fill['version'], fill['claimed_at']
+                        ),
+                        version=fill['version']
+                    )
+                )
+            async_to_sync(channel_layer.group_send)(
+                f'room_{room.id}',
+                group_event({
+                    'type': 'score_update',
+                    'team_a_count': team_counts.get('A', 0),
+                    'team_b_count': team_counts.get('B', 0),
+                    'timestamp': now
+                })
+            )
+    if result['claimed_h3_ids'] or result['gauge_added']:
+        # WebSocket consumer의 캐시된 방 상태 무효화 (참가자 점령 수/게이지)
+        from apps.realtime.room_state import notify_room_state_changed
+        notify_room_state_changed(room.id)
+    
+    return Response({
+        'sample_count': result['sample_count'],
+        'rejected_count': result['rejected_count'],
+        'distance_meters': round(result['distance_meters'], 2),
+        'claimed_count': len(result['claimed_h3_ids']),
+        'claimed_h3_ids': result['claimed_h3_ids'],
+        'version': result['version'],
+        'paintball_gauge': participant.paintball_gauge,
+        'paintball_count': participant.paintball_count,
+    })
+
+
 # ==================== 러닝 기록 API ====================
 
 @api_view(['POST'])
@@ -592,6 +727,10 @@ def start_record(request):
             participant.is_recording = True
             participant.save(update_fields=['is_recording'])
             
+            # WebSocket consumer의 캐시된 방 상태 무효화
+            from apps.realtime.room_state import notify_room_state_changed
+            notify_room_state_changed(room.id)
+            
         except Room.DoesNotExist:
             return Response({'error': 'NOT_FOUND', 'message': '방을 찾을 수 없습니다.'}, 
                            status=status.HTTP_404_NOT_FOUND)
@@ -654,6 +793,10 @@ def stop_record(request, id):
     if record.participant:
         record.participant.is_recording = False
         record.participant.save(update_fields=['is_recording'])
+        
+        # WebSocket consumer의 캐시된 방 상태 무효화
+        from apps.realtime.room_state import notify_room_state_changed
+        notify_room_state_changed(record.participant.room_id)
     
     return Response(RunningRecordSerializer(record).data)
 
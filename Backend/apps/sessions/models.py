@@ -8,5 +8,5 @@ Session 개념이 Room에 병합되었습니다.
 # - Session → Room (병합)
 # - Team → Participant.team (A/B 문자열로 단순화)
 # - Participant → rooms.Participant
-# - HexOwnership → Room.current_hex_ownerships (JSONField)
+# - HexOwnership → rooms.HexOwnership (Room.current_hex_ownerships로 조회)
 # - EventLog, PlayerStats, ChatMessage → 제거 (MVP에서 불필요)
@@ -160,6 +160,25 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache Configuration (hex claim 검증 상태, 게임 구역 cell 집합 등 프로세스 간 공유)
+# CACHE_REDIS_URL 또는 REDIS_HOST가 설정되어 있으면 Redis(DB 1), 아니면 프로세스 메모리 (Redis 없는 로컬 실행용, 프로세스 간 공유 안 됨)
+_cache_redis_url = os.environ.get('CACHE_REDIS_URL')
+if not _cache_redis_url and os.environ.get('REDIS_HOST'):
+    _cache_redis_url = f"redis://{os.environ['REDIS_HOST']}:{os.environ.get('REDIS_PORT', '6379')}/1"
+if _cache_redis_url:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': _cache_redis_url,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Celery Configuration
 _celery_redis_host = os.environ.get('REDIS_HOST', 'localhost')
 _celery_redis_port = os.environ.get('REDIS_PORT', '6379')
@@ -178,6 +197,34 @@ H3_DEFAULT_RESOLUTION = int(os.environ.get('H3_DEFAULT_RESOLUTION', 8))
 H3_CLAIM_MIN_SAMPLES = int(os.environ.get('H3_CLAIM_MIN_SAMPLES', 5))  # 최소 5개 샘플 (1초 간격 = 4초 span)
 H3_CLAIM_MIN_DWELL_SEC = int(os.environ.get('H3_CLAIM_MIN_DWELL_SEC', 4))  # 4초 체류 시 점령
 H3_GPS_ERROR_RADIUS_M = float(os.environ.get('H3_GPS_ERROR_RADIUS_M', 25.0))
+H3_CLAIM_VALIDATOR_BACKEND = os.environ.get('H3_CLAIM_VALIDATOR_BACKEND', 'memory')  # memory: consumer 메모리 ring buffer, cache: 샘플마다 cache 저장
+H3_CLAIM_PERSIST_INTERVAL_SEC = float(os.environ.get('H3_CLAIM_PERSIST_INTERVAL_SEC', 30))  # memory 모드 샘플 주기 저장 (0이면 연결 종료 시에만)
+TRACK_BATCH_MAX_POINTS = int(os.environ.get('TRACK_BATCH_MAX_POINTS', 3600))  # 트랙 일괄 전송 최대 점 수 (1초 간격 1시간)
+TRACK_MAX_SPEED_MPS = float(os.environ.get('TRACK_MAX_SPEED_MPS', 14.0))  # 트랙 구간 최대 속도 (넘으면 그 점 제외, 시속 약 50km)
+TRACK_MAX_CLOCK_SKEW_SEC = float(os.environ.get('TRACK_MAX_CLOCK_SKEW_SEC', 5))  # 서버 시각보다 이만큼 넘게 미래인 점은 제외
+H3_LOOP_MAX_RADIUS = int(os.environ.get('H3_LOOP_MAX_RADIUS', 15))  # 루프 내부 탐색 반경 (hex 거리, 이보다 큰 영역은 내부로 보지 않음)
+H3_LOOP_MAX_INTERIOR = int(os.environ.get('H3_LOOP_MAX_INTERIOR', 1000))  # 루프 내부 최대 hex 수 (넘으면 내부로 보지 않음, 한 번에 채우는 양 제한)
+H3_BOUNDS_CACHE_SIZE = int(os.environ.get('H3_BOUNDS_CACHE_SIZE', 128))  # GameArea 경계(prepared polygon) LRU 캐시 크기
+H3_AREA_CELLS_MAX = int(os.environ.get('H3_AREA_CELLS_MAX', 200000))  # 미리 계산할 구역 cell 수 상한 (넘으면 polygon 검사)
+HEXMAP_COMPUTE_WORKERS = int(os.environ.get('HEXMAP_COMPUTE_WORKERS', 2))  # 루프 탐색/트랙 처리용 프로세스 수 (0이면 호출한 곳에서 바로 실행)
+HEXMAP_COMPUTE_TIMEOUT_SEC = float(os.environ.get('HEXMAP_COMPUTE_TIMEOUT_SEC', 2))  # 계산 작업 제한 시간 (넘으면 루프 채우기/트랙 처리 생략)
+
+# Realtime Configuration
+LOCATION_FLUSH_INTERVAL_SEC = float(os.environ.get('LOCATION_FLUSH_INTERVAL_SEC', 10))  # 위치 write-behind 주기 (0이면 즉시 저장)
+LOCATION_BROADCAST_INTERVAL_MS = int(os.environ.get('LOCATION_BROADCAST_INTERVAL_MS', 500))  # 위치 브로드캐스트 묶음 주기 (0이면 샘플마다 participant_location 전송)
+REALTIME_JSON_ENCODER = os.environ.get('REALTIME_JSON_ENCODER', 'json')  # 브로드캐스트 직렬화 ('json' 또는 'orjson')
+REALTIME_COMPACT_PROTOCOL = os.environ.get('REALTIME_COMPACT_PROTOCOL', 'True').lower() == 'true'  # msgpack 프로토콜 허용 (프레임은 compact 클라이언트에게 보낼 때 이벤트별 1회 생성)
+OWNERSHIP_CHANGELOG_SIZE = int(os.environ.get('OWNERSHIP_CHANGELOG_SIZE', 5000))  # 방별 점령 변경 로그 크기 (Redis 변경 stream, 다른 프로세스 점령 감지)
+OWNERSHIP_DELTA_MAX_HEXES = int(os.environ.get('OWNERSHIP_DELTA_MAX_HEXES', 5000))  # since_version 동기화 변경분 최대 hex 수 (넘으면 전체 스냅샷)
+WS_USER_CACHE_SIZE = int(os.environ.get('WS_USER_CACHE_SIZE', 1024))  # WebSocket 인증 사용자 메모리 캐시 크기
+WS_USER_CACHE_TTL_SEC = int(os.environ.get('WS_USER_CACHE_TTL_SEC', 60))  # WebSocket 인증 사용자 캐시 유지 시간
+REALTIME_METRICS_ENABLED = os.environ.get('REALTIME_METRICS_ENABLED', 'True').lower() == 'true'  # consumer 지연시간/처리량 집계 (/metrics)
+REALTIME_METRICS_TOKEN = os.environ.get('REALTIME_METRICS_TOKEN', '')  # /metrics Bearer 토큰 (비어 있으면 DEBUG에서만 공개)
+HEX_OWNERSHIP_BACKEND = os.environ.get('HEX_OWNERSHIP_BACKEND', 'db')  # hex 점령 저장소 ('db' 또는 'redis' - Lua 스크립트 CAS, 게임 종료 시 DB 반영)
+HEX_OWNERSHIP_REDIS_URL = os.environ.get(
+    'HEX_OWNERSHIP_REDIS_URL',
+    f"redis://{os.environ.get('REDIS_HOST', 'localhost')}:{os.environ.get('REDIS_PORT', '6379')}/2",
+)  # Redis 점령 저장소 (캐시/Celery와 다른 DB)
 
 # Game Configuration
 GAME_REVISIT_EFFICIENCY = {
@@ -0,0 +1,36 @@
+"""
+Test settings
+python manage.py test apps --settings=config.settings.test
+(PostgreSQL/Redis 없이 실행 - SQLite, in-memory channel layer, 로컬 메모리 캐시)
+"""
+from .base import *
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# 계산은 호출한 곳에서 바로 실행 (테스트마다 worker 프로세스를 띄우지 않음)
+HEXMAP_COMPUTE_WORKERS = 0
+HEX_OWNERSHIP_BACKEND = 'db'
+
+# 실패 경로를 일부러 실행하는 테스트가 많으므로 apps 로그는 ERROR만 출력
+LOGGING['loggers']['apps']['level'] = 'ERROR'
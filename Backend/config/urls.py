@@ -20,6 +20,9 @@ urlpatterns = [
 
     # 랭킹 API
     path('api/', include('apps.ranking.urls')),
+
+    # 실시간 metrics (Prometheus)
+    path('', include('apps.realtime.urls')),
 ]
 
 if settings.DEBUG:
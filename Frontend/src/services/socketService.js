@@ -1,3 +1,4 @@
+import { uncompactCells } from 'h3-js';
 import { tokenService } from './api';
 
 // API_BASE_URL에서 WebSocket URL 생성
@@ -44,6 +45,28 @@ class SocketService {
                 const data = JSON.parse(event.data);
                 console.log('WebSocket Message:', data);
                 this.emit(data.type, data);
+                // 서버가 tick 단위로 묶어 보낸 위치는 참가자별 participant_location으로 풀어서 전달
+                if (data.type === 'participants_snapshot') {
+                    (data.participants || []).forEach((location) => {
+                        this.emit('participant_location', { type: 'participant_location', ...location });
+                    });
+                }
+                // 트랙 일괄 점령 / 루프 채우기는 hex별 hex_claimed로 풀어서 전달 (루프는 compact 집합)
+                if (data.type === 'hexes_claimed' || data.type === 'loop_complete') {
+                    const h3Ids = data.type === 'loop_complete'
+                        ? uncompactCells(data.claimed_cells || [], data.h3_resolution)
+                        : (data.h3_ids || []);
+                    h3Ids.forEach((h3Id) => {
+                        this.emit('hex_claimed', {
+                            type: 'hex_claimed',
+                            participant_id: data.participant_id,
+                            team: data.team,
+                            h3_id: h3Id,
+                            version: data.version,
+                            timestamp: data.timestamp,
+                        });
+                    });
+                }
             } catch (e) {
                 console.error('메시지 파싱 에러:', e);
             }
@@ -89,6 +112,11 @@ class SocketService {
         this.send('location_update', { lat, lng });
     }
 
+    // 끊겼던 동안의 위치 일괄 전송 (points: [{ lat, lng, timestamp }])
+    sendLocationBatch(points) {
+        this.send('location_batch', { points });
+    }
+
     // 페인트볼 사용
     usePaintball(targetH3Id, type = 'normal') {
         this.send('paintball', {